@@ -0,0 +1,163 @@
+"""
+Compressiebenchmark voor de historian: ruwe records (16 bytes per sample)
+tegenover gecomprimeerde blokken (delta-of-delta-tijden, XOR-floats, RLE-bits).
+
+Zonder argument is de invoer synthetisch: een nagebootst signaal met het patroon
+van core/modbus_test_server.py (elke seconde loopt `value` op, mod 100), gelezen
+met een scan van 100 ms met wat jitter op de tijdstempels. Naast de registers en
+bits die de testserver laat bewegen zijn er registers die de hele tijd 0 blijven.
+Dat is geen opname van de simulator zelf; de cijfers zijn daardoor een schatting.
+
+Voor een meting op echte data: draai de editor in runtime tegen de testserver
+met de historian-opslag aan, en geef daarna de historiemap van het project mee
+(en de partitieduur als die niet de standaard is). De samples worden dan uit die
+opname gelezen.
+
+Vooraf wordt gecontroleerd dat een onderbroken compressie (blok geschreven,
+chunk nog niet verwijderd) geen dubbele samples oplevert.
+
+Gebruik (vanuit de projectmap):
+    python -m benchmarks.historian_compressie
+    python -m benchmarks.historian_compressie <project>_historie [partitie_s]
+"""
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from project.historian_codec import BlokEncoder, decodeer_blok
+from project.historian_opslag import RECORD, STANDAARD_PARTITIE, HistorianOpslag
+
+SCAN = 0.1  # seconden
+DUUR = 3600  # seconden opname (één partitie)
+JITTER = 0.001  # standaardafwijking van de tijdstempels in seconden
+
+
+def simulator_opname(duur=DUUR, scan=SCAN, seed=1):
+    """Synthetische opname per tag die de testserver nabootst: naam -> (is_bit, [(tijd, waarde), ...])."""
+    random.seed(seed)
+    tags = {f"HR{i}": (False, []) for i in range(3)}
+    tags.update({f"IR{i}": (False, []) for i in range(2)})
+    tags.update({f"CO{i}": (True, []) for i in range(8)})
+    tags.update({f"DI{i}": (True, []) for i in range(2)})
+    tags.update({f"HR{i}": (False, []) for i in range(10, 20)})  # niet gebruikt door de server: 0
+
+    start = 1_700_000_000.0
+    for stap in range(int(duur / scan)):
+        tijd = start + stap * scan + random.gauss(0.0, JITTER)
+        value = int(stap * scan) % 100
+        waarden = {
+            "HR0": value, "HR1": value + 1, "HR2": value + 3,
+            "IR0": value * 2, "IR1": value * 2 + 1,
+            "DI0": (value + 1) % 2, "DI1": value % 2,
+        }
+        for i in range(8):
+            waarden[f"CO{i}"] = (value >> i) & 1
+        for naam, (_, samples) in tags.items():
+            samples.append((tijd, float(waarden.get(naam, 0))))
+    return tags
+
+
+def lees_opname(map_pad, partitie=STANDAARD_PARTITIE):
+    """Opname uit een historiemap (HistorianOpslag): naam -> (is_bit, [(tijd, waarde), ...])."""
+    opslag = HistorianOpslag(map_pad, partitie=partitie, comprimeren=False)
+    try:
+        tags = {}
+        for naam in opslag.tags:
+            partities = opslag.chunks(naam)
+            if not partities:
+                continue
+            tijden, waarden = opslag.bereik(naam, partities[0] * partitie, (partities[-1] + 1) * partitie)
+            samples = list(zip(tijden, waarden))
+            tags[naam] = (all(w == 0.0 or w == 1.0 for _, w in samples), samples)
+        return tags
+    finally:
+        opslag.stop()
+
+
+def controleer_onderbroken_compressie(aantal=50):
+    """
+    Een chunk die na een onderbroken compressie naast haar blok bleef staan, mag bij
+    de volgende compressie geen dubbele samples opleveren (blok: tijden op 1 ms,
+    chunk: ruwe tijden).
+    """
+    map_pad = tempfile.mkdtemp()
+    opslag = HistorianOpslag(map_pad, partitie=100)
+    try:
+        nummer = opslag.tag_nummer("tag")
+        opslag._schrijf([(1.0 + i * SCAN + random.gauss(0.0, JITTER), nummer, float(i)) for i in range(aantal)])
+        chunk_pad = opslag._chunk_pad(nummer, 0)
+        with open(chunk_pad, "rb") as f:
+            ruw = f.read()
+        opslag._comprimeer(chunk_pad)
+        with open(chunk_pad, "wb") as f:
+            f.write(ruw)  # proces stopte tussen het vervangen van het blok en het verwijderen van de chunk
+        assert len(opslag.bereik("tag", 0, 1000)[0]) == aantal
+
+        opslag._laatste_tijd.clear()  # zoals na een herstart
+        opslag._schrijf([(150.0, nummer, 1.0)])  # nieuwe partitie: de oude chunk wordt opnieuw gecomprimeerd
+        tijden, _ = opslag.bereik("tag", 0, 1000)
+        assert len(tijden) == aantal + 1, len(tijden)
+    finally:
+        opslag.stop()
+        shutil.rmtree(map_pad)
+
+
+def main():
+    controleer_onderbroken_compressie()
+    if len(sys.argv) > 1:
+        partitie = float(sys.argv[2]) if len(sys.argv) > 2 else STANDAARD_PARTITIE
+        tags = lees_opname(sys.argv[1], partitie)
+        print(f"Opname uit {sys.argv[1]}: {sum(len(s) for _, s in tags.values())} samples, "
+              f"{len(tags)} tags, ruw {RECORD.size} bytes/sample")
+    else:
+        tags = simulator_opname()
+        print(f"Synthetisch signaal (geen opname): {int(DUUR / SCAN)} samples per tag, "
+              f"scan {int(SCAN * 1000)} ms, ruw {RECORD.size} bytes/sample")
+
+    groepen = {"registers (bewegend)": [], "registers (constant)": [], "bits": []}
+    for naam, (is_bit, samples) in tags.items():
+        if not samples:
+            continue
+        if is_bit:
+            groepen["bits"].append((naam, is_bit, samples))
+        elif len({w for _, w in samples}) == 1:
+            groepen["registers (constant)"].append((naam, is_bit, samples))
+        else:
+            groepen["registers (bewegend)"].append((naam, is_bit, samples))
+    groepen = {groep: leden for groep, leden in groepen.items() if leden}
+
+    print(f"{'groep':<22} | {'tags':>4} | {'bytes/sample':>12} | {'factor':>7} | {'coderen':>12} | {'decoderen':>12}")
+    totaal_bytes = totaal_samples = 0
+    for groep, leden in groepen.items():
+        bytes_groep = samples_groep = 0
+        codeer_tijd = decodeer_tijd = 0.0
+        for naam, is_bit, samples in leden:
+            t0 = time.perf_counter()
+            encoder = BlokEncoder(bits=is_bit)
+            for tijd, waarde in samples:
+                encoder.voeg_toe(tijd, waarde)
+            blok = encoder.bytes()
+            t1 = time.perf_counter()
+            gedecodeerd = list(decodeer_blok(blok))
+            t2 = time.perf_counter()
+            assert [w for _, w in gedecodeerd] == [w for _, w in samples], naam
+
+            codeer_tijd += t1 - t0
+            decodeer_tijd += t2 - t1
+            bytes_groep += len(blok)
+            samples_groep += len(samples)
+
+        per_sample = bytes_groep / samples_groep
+        print(f"{groep:<22} | {len(leden):>4} | {per_sample:>12.3f} | {RECORD.size / per_sample:>6.1f}x | "
+              f"{samples_groep / codeer_tijd / 1e6:>7.2f} M/s | {samples_groep / decodeer_tijd / 1e6:>7.2f} M/s")
+        totaal_bytes += bytes_groep
+        totaal_samples += samples_groep
+
+    per_sample = totaal_bytes / totaal_samples
+    print(f"{'totaal':<22} | {sum(len(leden) for leden in groepen.values()):>4} | {per_sample:>12.3f} | {RECORD.size / per_sample:>6.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
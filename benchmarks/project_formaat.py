@@ -0,0 +1,105 @@
+"""
+Benchmark van het projectformaat: JSON (indent=4) tegenover het binaire formaat
+met secties (project/project_binair.py), bij 1k, 10k en 100k objecten.
+
+Gemeten worden de bestandsgrootte, het volledig openen en het lezen van alleen
+variabelen en communicatie (zonder de objecten te decoderen). Elke meting
+controleert ook dat de omzetting JSON -> binair -> dict verliesvrij is; vooraf
+worden een paar randgevallen van de tabelcodering gecontroleerd (lege dicts).
+
+Gebruik (vanuit de projectmap):
+    python -m benchmarks.project_formaat
+"""
+import os
+import random
+import tempfile
+import time
+
+from project.project_binair import codeer_tabel, decodeer_tabel, project_naar_bytes
+from project.project_data import nieuw_project, openen_project, lees_secties, project_bytes
+
+AANTALLEN = (1_000, 10_000, 100_000)
+HERHALINGEN = 3
+
+
+def voorbeeld_object(i, variabele):
+    """Een object zoals to_dict het maakt, met de soorten uit de editor door elkaar."""
+    x, y = round(random.uniform(0, 4000), 2), round(random.uniform(0, 3000), 2)
+    soort = i % 6
+    if soort == 0:
+        return {"type": "scadaimageobject", "x": x, "y": y, "pad_aan": "graphics/lamp_on.png",
+                "pad_uit": "graphics/lamp_off.png", "status": False, "breedte": 50, "hoogte": 50,
+                "schaal": 1.0, "variabele": variabele, "naam": f"lamp{i}"}
+    if soort == 1:
+        return {"type": "displayobject", "x": x, "y": y, "variabele": variabele, "kleur": "black",
+                "lettertype": "Arial", "grootte": 12, "naam": f"display{i}"}
+    if soort == 2:
+        return {"type": "scadameter", "x": x, "y": y, "breedte": 50, "hoogte": 100, "variabele": variabele,
+                "min_waarde": 0, "max_waarde": 100, "schaal": 1.0, "naam": f"meter{i}"}
+    if soort == 3:
+        return {"type": "tekst", "tekst": f"Pomp {i}", "x": x, "y": y, "kleur": "#0000ff",
+                "lettertype": "Arial", "grootte": 16}
+    if soort == 4:
+        return {"type": "scadaslider", "x": x, "y": y, "breedte": 40, "hoogte": 150, "variabele": variabele,
+                "min_waarde": 0, "max_waarde": 100, "schaal": 1.0, "naam": f"slider{i}"}
+    return {"type": "scadatrend", "x": x, "y": y, "breedte": 300, "hoogte": 150,
+            "pennen": [{"variabele": variabele, "kleur": "#1f77b4"}], "venster_s": 60.0, "min_waarde": 0,
+            "max_waarde": 100, "max_punten": 10000, "schaal": 1.0, "naam": f"trend{i}"}
+
+
+def voorbeeld_project(aantal, seed=1):
+    random.seed(seed)
+    project_data = nieuw_project("Benchmark")
+    types = ["coil", "discrete_input", "holding_register", "input_register"]
+    project_data["variabelen"] = [
+        {"naam": f"tag{i}", "type": types[i % 4], "adres": str(i), "waarde": 0, "beschrijving": "",
+         "apparaat": "PLC1", "unit_id": None, "scanklasse": "normaal", "deadband": 0.0}
+        for i in range(max(1, aantal // 4))
+    ]
+    namen = [var["naam"] for var in project_data["variabelen"]]
+    project_data["objecten"] = [voorbeeld_object(i, random.choice(namen)) for i in range(aantal)]
+    return project_data
+
+
+def beste_tijd(functie):
+    beste = float("inf")
+    for _ in range(HERHALINGEN):
+        t0 = time.perf_counter()
+        functie()
+        beste = min(beste, time.perf_counter() - t0)
+    return beste
+
+
+def controleer_tabel_randgevallen():
+    """Tabellen met lege dicts en meerdere schema's moeten ongewijzigd terugkomen."""
+    for rijen in ([{}], [{}, {}], [{"a": 1}, {}, {"b": 2}, {}], [{"a": 1}, {"b": [1, 2]}, {"a": None}]):
+        assert decodeer_tabel(codeer_tabel(rijen)) == rijen, rijen
+
+
+def main():
+    controleer_tabel_randgevallen()
+    print(f"{'objecten':>9} | {'JSON':>9} | {'binair':>9} | {'factor':>6} | "
+          f"{'open JSON':>10} | {'open binair':>11} | {'alleen var+comm':>15}")
+    with tempfile.TemporaryDirectory() as map_pad:
+        for aantal in AANTALLEN:
+            project_data = voorbeeld_project(aantal)
+            json_pad = os.path.join(map_pad, f"p{aantal}.scada")
+            binair_pad = os.path.join(map_pad, f"p{aantal}_bin.scada")
+            with open(json_pad, "wb") as f:
+                f.write(project_bytes(project_data))
+            with open(binair_pad, "wb") as f:
+                f.write(project_naar_bytes(project_data))
+            assert openen_project(binair_pad) == openen_project(json_pad), aantal
+
+            json_grootte = os.path.getsize(json_pad)
+            binair_grootte = os.path.getsize(binair_pad)
+            t_json = beste_tijd(lambda: openen_project(json_pad))
+            t_binair = beste_tijd(lambda: openen_project(binair_pad))
+            t_lui = beste_tijd(lambda: lees_secties(binair_pad, ("variabelen", "communicatie")))
+            print(f"{aantal:>9} | {json_grootte / 1024:>6.0f} kB | {binair_grootte / 1024:>6.0f} kB | "
+                  f"{json_grootte / binair_grootte:>5.1f}x | {t_json * 1000:>7.1f} ms | "
+                  f"{t_binair * 1000:>8.1f} ms | {t_lui * 1000:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
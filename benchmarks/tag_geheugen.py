@@ -0,0 +1,84 @@
+"""
+Geheugenbenchmark: oude variabelen (object met __dict__, waarde als Python-object,
+indexen in dicts) tegenover de nieuwe Variabele (__slots__-view op een
+kolomsgewijze TagStore) in een VariabelenLijst.
+
+Gebruik (vanuit de projectmap):
+    python -m benchmarks.tag_geheugen
+"""
+import gc
+import time
+import tracemalloc
+
+from core.variabele_object import Variabele, VariabelenLijst
+
+AANTALLEN = [1_000, 10_000, 100_000]
+
+
+class OudeVariabele:
+    """De oorspronkelijke layout: gewoon object met een __dict__."""
+
+    def __init__(self, naam, type, adres, waarde, beschrijving="", apparaat="", unit_id=None,
+                 scanklasse="100ms", deadband=0.0):
+        self._lijst = None
+        self.tag_id = None
+        self.naam = naam
+        self.type = type
+        self.adres = adres
+        self.waarde = waarde
+        self.beschrijving = beschrijving
+        self.apparaat = apparaat
+        self.unit_id = unit_id
+        self.scanklasse = scanklasse
+        self.deadband = deadband
+
+
+def maak_oud(aantal):
+    lijst = [OudeVariabele(f"tag{i}", "holding_register", str(i % 65536), 0) for i in range(aantal)]
+    # Dezelfde indexen als de oude VariabelenLijst: naam -> var, id -> var, naam -> id
+    per_naam, per_id, ids_per_naam = {}, {}, {}
+    for tag_id, var in enumerate(lijst, start=1):
+        var.tag_id = tag_id
+        per_naam[var.naam] = var
+        per_id[tag_id] = var
+        ids_per_naam[var.naam] = tag_id
+    for i, var in enumerate(lijst):
+        var.waarde = i * 0.5  # gelezen waarden zijn losse float-objecten
+    return lijst, per_naam, per_id, ids_per_naam
+
+
+def maak_nieuw(aantal):
+    lijst = VariabelenLijst(Variabele(f"tag{i}", "holding_register", str(i % 65536), 0) for i in range(aantal))
+    for i, var in enumerate(lijst):
+        var.waarde = i * 0.5
+    return lijst
+
+
+def meet(maker, aantal):
+    gc.collect()
+    tracemalloc.start()
+    begin = time.perf_counter()
+    lijst = maker(aantal)
+    duur = time.perf_counter() - begin
+    geheugen, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    begin = time.perf_counter()
+    gc.collect()
+    gc_duur = time.perf_counter() - begin
+    del lijst
+    return geheugen, duur, gc_duur
+
+
+def main():
+    print(f"{'aantal':>8} | {'layout':<6} | {'geheugen':>10} | {'bytes/tag':>9} | {'opbouw':>8} | {'gc':>8}")
+    for aantal in AANTALLEN:
+        for naam, maker in (("oud", maak_oud), ("nieuw", maak_nieuw)):
+            geheugen, duur, gc_duur = meet(maker, aantal)
+            print(f"{aantal:>8} | {naam:<6} | {geheugen / 1024:>8.0f} kB | {geheugen / aantal:>9.0f} | "
+                  f"{duur * 1000:>6.1f} ms | {gc_duur * 1000:>6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
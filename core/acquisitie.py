@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+from core.communicatie import CommunicatieManager
+from core.communicatie_async import AsyncCommunicatieManager
+from core.scanplanner import ScanPlanner
+
+MAX_WACHTTIJD = 0.5  # s; ook zonder periodieke scanklassen regelmatig op stop controleren
+
+
+class AcquisitieWorker(QThread):
+    """
+    Draait de Modbus-scanlus in een eigen thread.
+
+    De worker is eigenaar van de communicatie manager (en dus van de clients).
+    Welke blokken per cyclus gelezen worden bepaalt de ScanPlanner aan de hand
+    van de scanklassen van de variabelen. Na elke cyclus gaat de batch met
+    blokresultaten (koppelingen, data, bron_tijd) via het signaal `waarden_gelezen`
+    naar de GUI-thread; alleen daar worden de variabelen bijgewerkt.
+
+    Met `acquisitie.modus == "async"` draait de scan op een asyncio-eventloop
+    en worden de blokken van alle apparaten gelijktijdig gelezen.
+    """
+    waarden_gelezen = Signal(object)
+    verbindingen_gewijzigd = Signal(object)  # {apparaat: "verbonden" | "gedegradeerd" | "uit"}
+
+    def __init__(self, instellingen, parent=None):
+        super().__init__(parent)
+        cfg = (instellingen or {}).get("acquisitie", {})
+        self.async_modus = cfg.get("modus", "sync") == "async"
+        if self.async_modus:
+            self.comm_manager = AsyncCommunicatieManager(instellingen,
+                                                         max_gelijktijdig=cfg.get("max_gelijktijdig", 4))
+        else:
+            self.comm_manager = CommunicatieManager(instellingen)
+        self.planner = ScanPlanner(instellingen)
+        self._stop_event = threading.Event()
+        self._wekker = threading.Event()
+        self._gezondheid = {}
+
+    def zet_leesplan(self, variabelen):
+        """Bouwt nieuwe leesplannen; de scanlus pakt ze bij de volgende cyclus op."""
+        self.planner.zet_variabelen(variabelen)
+        self._wekker.set()
+
+    def vraag_aan(self):
+        """Leest de variabelen met scanklasse "op_aanvraag" zo snel mogelijk één keer."""
+        self.planner.vraag_aan()
+        self._wekker.set()
+
+    def stop(self):
+        """Vraagt de scanlus te stoppen zonder op de thread te wachten."""
+        self._stop_event.set()
+        self._wekker.set()
+
+    def statistiek(self):
+        """Jitter en overruns per scanklasse."""
+        return {klasse: stat.to_dict() for klasse, stat in self.planner.statistiek.items()}
+
+    def _meld_gezondheid(self):
+        gezondheid = self.comm_manager.gezondheid()
+        if gezondheid != self._gezondheid:
+            self._gezondheid = gezondheid
+            self.verbindingen_gewijzigd.emit(gezondheid)
+
+    def _wachttijd(self):
+        wacht = self.planner.tijd_tot_volgende(time.monotonic())
+        return MAX_WACHTTIJD if wacht is None else min(wacht, MAX_WACHTTIJD)
+
+    def run(self):
+        if self.async_modus:
+            asyncio.run(self._run_async())
+            return
+
+        self.comm_manager.start()
+        try:
+            while not self._stop_event.is_set():
+                self._wekker.clear()
+                blokken = self.planner.verschuldigde_blokken(time.monotonic())
+                if blokken:
+                    batch = self.comm_manager.voer_leesplan_uit(blokken)
+                    if batch:
+                        self.waarden_gelezen.emit(batch)
+                    self._meld_gezondheid()
+                self._wekker.wait(self._wachttijd())
+        finally:
+            self.comm_manager.stop()
+
+    async def _run_async(self):
+        await self.comm_manager.start()
+        try:
+            while not self._stop_event.is_set():
+                self._wekker.clear()
+                blokken = self.planner.verschuldigde_blokken(time.monotonic())
+                if blokken:
+                    batch = await self.comm_manager.voer_leesplan_uit(blokken)
+                    if batch:
+                        self.waarden_gelezen.emit(batch)
+                    self._meld_gezondheid()
+                await asyncio.to_thread(self._wekker.wait, self._wachttijd())
+        finally:
+            await self.comm_manager.stop()
@@ -1,7 +1,92 @@
+import random
+import time
+
 from PySide6.QtWidgets import (
-    QDialog, QFormLayout, QLineEdit, QSpinBox,
-    QDialogButtonBox, QVBoxLayout, QGroupBox
+    QDialog, QFormLayout, QSpinBox, QDialogButtonBox, QVBoxLayout, QHBoxLayout,
+    QGroupBox, QComboBox, QTableWidget, QTableWidgetItem, QHeaderView, QPushButton, QMessageBox
 )
+from pymodbus.client import ModbusTcpClient, ModbusSerialClient
+from pymodbus.pdu import ExceptionResponse
+
+from core.invoer import OngeldigeInvoer, lees_getal
+
+MAX_REGISTERS = 125  # protocollimiet voor FC 3/4
+MAX_BITS = 2000  # protocollimiet voor FC 1/2
+STANDAARD_MAX_GAT = 8  # ongebruikte adressen die binnen één leesblok mogen vallen
+
+APPARAAT_KOLOMMEN = ["naam", "protocol", "host", "poort", "com_port", "baudrate",
+                     "unit_id", "timeout", "max_registers", "max_bits"]
+
+
+class Apparaat:
+    """Eén Modbus-apparaat (verbinding) uit de apparatentabel."""
+
+    def __init__(self, naam="PLC1", protocol="tcp", host="127.0.0.1", poort=502, com_port="COM1",
+                 baudrate=9600, unit_id=1, timeout=2, max_registers=MAX_REGISTERS, max_bits=MAX_BITS):
+        self.naam = naam
+        self.protocol = protocol  # "tcp" of "rtu"
+        self.host = host
+        self.poort = poort
+        self.com_port = com_port
+        self.baudrate = baudrate
+        self.unit_id = unit_id  # standaard unit ID; een variabele kan een eigen unit ID opgeven
+        self.timeout = timeout
+        self.max_registers = max_registers
+        self.max_bits = max_bits
+
+    def verbinding_sleutel(self):
+        """Apparaten op hetzelfde eindpunt (bv. één gateway, of één COM-poort) delen een client."""
+        if self.protocol == "rtu":
+            return ("rtu", self.com_port)
+        return ("tcp", self.host, self.poort)
+
+    def maak_client(self):
+        if self.protocol == "rtu":
+            return ModbusSerialClient(method='rtu', port=self.com_port, baudrate=self.baudrate,
+                                      timeout=self.timeout)
+        return ModbusTcpClient(host=self.host, port=self.poort, timeout=self.timeout)
+
+    def to_dict(self):
+        return {kolom: getattr(self, kolom) for kolom in APPARAAT_KOLOMMEN}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            naam=str(data.get("naam", "PLC1")),
+            protocol=data.get("protocol", "tcp"),
+            host=data.get("host", "127.0.0.1"),
+            poort=lees_getal(data, "poort", int, 502),
+            com_port=data.get("com_port", "COM1"),
+            baudrate=lees_getal(data, "baudrate", int, 9600),
+            unit_id=lees_getal(data, "unit_id", int, 1),
+            timeout=lees_getal(data, "timeout", float, 2),
+            max_registers=min(lees_getal(data, "max_registers", int, MAX_REGISTERS), MAX_REGISTERS),
+            max_bits=min(lees_getal(data, "max_bits", int, MAX_BITS), MAX_BITS)
+        )
+
+
+def apparaten_uit_instellingen(instellingen):
+    """
+    Geeft de apparatentabel uit de communicatie-instellingen terug.
+
+    Oudere projecten hebben nog één "Modbus TCP"- en één "Modbus RTU"-blok; die
+    worden omgezet naar apparaten met de namen "tcp" en "rtu".
+    """
+    instellingen = instellingen or {}
+    if "apparaten" in instellingen:
+        return [Apparaat.from_dict(data) for data in instellingen["apparaten"]]
+
+    apparaten = []
+    if instellingen.get("Modbus TCP", {}).get("actief", False):
+        cfg = instellingen["Modbus TCP"]["instellingen"]
+        apparaten.append(Apparaat(naam="tcp", protocol="tcp", host=cfg["ip"], poort=cfg["poort"],
+                                  timeout=cfg["timeout"]))
+    if instellingen.get("Modbus RTU", {}).get("actief", False):
+        cfg = instellingen["Modbus RTU"]["instellingen"]
+        apparaten.append(Apparaat(naam="rtu", protocol="rtu", com_port=cfg["com_port"],
+                                  baudrate=cfg["baudrate"], timeout=cfg["timeout"]))
+    return apparaten
+
 
 
 class CommunicatieDialoog(QDialog):
@@ -12,48 +97,58 @@ class CommunicatieDialoog(QDialog):
 
         self.main_layout = QVBoxLayout(self)
 
-        # ============ TCP Instellingen ============
-        self.tcp_group = QGroupBox("Modbus TCP")
-        self.tcp_group.setCheckable(True)
-        self.tcp_group.setChecked(self.instellingen_obj.get("Modbus TCP", {}).get("actief", False))
-
-        tcp_form = QFormLayout()
-        self.tcp_ip = QLineEdit(
-            self.instellingen_obj.get("Modbus TCP", {}).get("instellingen", {}).get("ip", "127.0.0.1"))
-        self.tcp_port = QSpinBox()
-        self.tcp_port.setMaximum(65535)
-        self.tcp_port.setValue(self.instellingen_obj.get("Modbus TCP", {}).get("instellingen", {}).get("poort", 502))
-        self.tcp_timeout = QSpinBox()
-        self.tcp_timeout.setMaximum(60)
-        self.tcp_timeout.setValue(self.instellingen_obj.get("Modbus TCP", {}).get("instellingen", {}).get("timeout", 2))
-
-        tcp_form.addRow("IP-adres", self.tcp_ip)
-        tcp_form.addRow("Poort", self.tcp_port)
-        tcp_form.addRow("Timeout (s)", self.tcp_timeout)
-        self.tcp_group.setLayout(tcp_form)
-        self.main_layout.addWidget(self.tcp_group)
-
-        # ============ RTU Instellingen ============
-        self.rtu_group = QGroupBox("Modbus RTU")
-        self.rtu_group.setCheckable(True)
-        self.rtu_group.setChecked(self.instellingen_obj.get("Modbus RTU", {}).get("actief", False))
-
-        rtu_form = QFormLayout()
-        self.rtu_com = QLineEdit(
-            self.instellingen_obj.get("Modbus RTU", {}).get("instellingen", {}).get("com_port", "COM1"))
-        self.rtu_baud = QSpinBox()
-        self.rtu_baud.setMaximum(115200)
-        self.rtu_baud.setValue(
-            self.instellingen_obj.get("Modbus RTU", {}).get("instellingen", {}).get("baudrate", 9600))
-        self.rtu_timeout = QSpinBox()
-        self.rtu_timeout.setMaximum(60)
-        self.rtu_timeout.setValue(self.instellingen_obj.get("Modbus RTU", {}).get("instellingen", {}).get("timeout", 2))
-
-        rtu_form.addRow("COM-poort", self.rtu_com)
-        rtu_form.addRow("Baudrate", self.rtu_baud)
-        rtu_form.addRow("Timeout (s)", self.rtu_timeout)
-        self.rtu_group.setLayout(rtu_form)
-        self.main_layout.addWidget(self.rtu_group)
+        # ============ Apparaten ============
+        self.apparaten_group = QGroupBox("Apparaten")
+        apparaten_layout = QVBoxLayout()
+
+        self.apparaten_tabel = QTableWidget(0, len(APPARAAT_KOLOMMEN))
+        self.apparaten_tabel.setHorizontalHeaderLabels(APPARAAT_KOLOMMEN)
+        self.apparaten_tabel.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.apparaten_tabel.verticalHeader().setVisible(False)
+        apparaten_layout.addWidget(self.apparaten_tabel)
+
+        knop_layout = QHBoxLayout()
+        self.apparaat_toevoegen = QPushButton("➕")
+        self.apparaat_verwijderen = QPushButton("➖")
+        self.apparaat_toevoegen.clicked.connect(lambda: self.voeg_apparaat_rij_toe(Apparaat(
+            naam=f"PLC{self.apparaten_tabel.rowCount() + 1}")))
+        self.apparaat_verwijderen.clicked.connect(self.verwijder_apparaat_rij)
+        knop_layout.addWidget(self.apparaat_toevoegen)
+        knop_layout.addWidget(self.apparaat_verwijderen)
+        knop_layout.addStretch()
+        apparaten_layout.addLayout(knop_layout)
+
+        self.apparaten_group.setLayout(apparaten_layout)
+        self.main_layout.addWidget(self.apparaten_group)
+
+        for apparaat in apparaten_uit_instellingen(self.instellingen_obj):
+            self.voeg_apparaat_rij_toe(apparaat)
+
+        # ============ Leesplan ============
+        self.plan_group = QGroupBox("Leesplan")
+        plan_form = QFormLayout()
+        self.plan_max_gat = QSpinBox()
+        self.plan_max_gat.setMaximum(124)
+        self.plan_max_gat.setValue(self.instellingen_obj.get("leesplan", {}).get("max_gat", STANDAARD_MAX_GAT))
+
+        plan_form.addRow("Max. gat (adressen)", self.plan_max_gat)
+        self.plan_group.setLayout(plan_form)
+        self.main_layout.addWidget(self.plan_group)
+
+        # ============ Acquisitie ============
+        self.acq_group = QGroupBox("Acquisitie")
+        acq_form = QFormLayout()
+        self.acq_modus = QComboBox()
+        self.acq_modus.addItems(["sync", "async"])
+        self.acq_modus.setCurrentText(self.instellingen_obj.get("acquisitie", {}).get("modus", "sync"))
+        self.acq_max_gelijktijdig = QSpinBox()
+        self.acq_max_gelijktijdig.setRange(1, 64)
+        self.acq_max_gelijktijdig.setValue(self.instellingen_obj.get("acquisitie", {}).get("max_gelijktijdig", 4))
+
+        acq_form.addRow("Modus", self.acq_modus)
+        acq_form.addRow("Max. gelijktijdig per apparaat", self.acq_max_gelijktijdig)
+        self.acq_group.setLayout(acq_form)
+        self.main_layout.addWidget(self.acq_group)
 
         # ============ Buttons ============
         self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -61,23 +156,53 @@ class CommunicatieDialoog(QDialog):
         self.buttons.rejected.connect(self.reject)
         self.main_layout.addWidget(self.buttons)
 
-    def on_accept(self):
-        self.instellingen_obj["Modbus TCP"] = {
-            "actief": self.tcp_group.isChecked(),
-            "instellingen": {
-                "ip": self.tcp_ip.text(),
-                "poort": self.tcp_port.value(),
-                "timeout": self.tcp_timeout.value()
-            }
-        }
+    def voeg_apparaat_rij_toe(self, apparaat):
+        rij = self.apparaten_tabel.rowCount()
+        self.apparaten_tabel.insertRow(rij)
+        for kolom, kolomnaam in enumerate(APPARAAT_KOLOMMEN):
+            waarde = str(getattr(apparaat, kolomnaam))
+            if kolomnaam == "protocol":
+                combo = QComboBox()
+                combo.addItems(["tcp", "rtu"])
+                combo.setCurrentText(waarde)
+                self.apparaten_tabel.setCellWidget(rij, kolom, combo)
+            else:
+                self.apparaten_tabel.setItem(rij, kolom, QTableWidgetItem(waarde))
+
+    def verwijder_apparaat_rij(self):
+        rij = self.apparaten_tabel.currentRow()
+        if rij >= 0:
+            self.apparaten_tabel.removeRow(rij)
 
-        self.instellingen_obj["Modbus RTU"] = {
-            "actief": self.rtu_group.isChecked(),
-            "instellingen": {
-                "com_port": self.rtu_com.text(),
-                "baudrate": self.rtu_baud.value(),
-                "timeout": self.rtu_timeout.value()
-            }
+    def on_accept(self):
+        apparaten = []
+        for rij in range(self.apparaten_tabel.rowCount()):
+            waarden = {}
+            for kolom, kolomnaam in enumerate(APPARAAT_KOLOMMEN):
+                if kolomnaam == "protocol":
+                    waarden[kolomnaam] = self.apparaten_tabel.cellWidget(rij, kolom).currentText()
+                else:
+                    item = self.apparaten_tabel.item(rij, kolom)
+                    waarden[kolomnaam] = item.text() if item else ""
+            try:
+                apparaten.append(Apparaat.from_dict(waarden).to_dict())
+            except OngeldigeInvoer as e:
+                # Niets van de instellingen aanpassen; de gebruiker kan de cel verbeteren
+                self.apparaten_tabel.setCurrentCell(rij, APPARAAT_KOLOMMEN.index(e.veld))
+                QMessageBox.warning(self, "Ongeldige invoer", f"Apparaat op rij {rij + 1}: {e}")
+                return
+
+        # De apparatentabel vervangt de oude enkele TCP/RTU-instellingen
+        self.instellingen_obj["apparaten"] = apparaten
+        self.instellingen_obj.pop("Modbus TCP", None)
+        self.instellingen_obj.pop("Modbus RTU", None)
+
+        leesplan = self.instellingen_obj.setdefault("leesplan", {})
+        leesplan["max_gat"] = self.plan_max_gat.value()
+
+        self.instellingen_obj["acquisitie"] = {
+            "modus": self.acq_modus.currentText(),
+            "max_gelijktijdig": self.acq_max_gelijktijdig.value()
         }
 
         self.accept()
@@ -87,21 +212,15 @@ class CommunicatieInstellingen:
     def __init__(self, instellingen=None):
         if instellingen is None:
             instellingen = {
-                "Modbus TCP": {
-                    "actief": False,
-                    "instellingen": {
-                        "ip": "127.0.0.1",
-                        "poort": 5020,
-                        "timeout": 2
-                    }
+                "apparaten": [
+                    Apparaat(naam="PLC1", host="127.0.0.1", poort=5020).to_dict()
+                ],
+                "leesplan": {
+                    "max_gat": STANDAARD_MAX_GAT
                 },
-                "Modbus RTU": {
-                    "actief": False,
-                    "instellingen": {
-                        "com_port": "COM1",
-                        "baudrate": 9600,
-                        "timeout": 2
-                    }
+                "acquisitie": {
+                    "modus": "sync",
+                    "max_gelijktijdig": 4
                 }
             }
         self.instellingen = instellingen
@@ -114,54 +233,215 @@ class CommunicatieInstellingen:
         return cls(instellingen=data)
 
 
-#   Communicatie manager klasse
+#   Verbindingsbewaking: gezondheid per verbinding met exponentiële backoff
 
-from pymodbus.client import ModbusTcpClient, ModbusSerialClient
+VERBONDEN = "verbonden"
+GEDEGRADEERD = "gedegradeerd"
+UIT = "uit"
+
+
+class VerbindingsBewaker:
+    """
+    Houdt de gezondheid van één verbinding bij.
+
+    Na een fout is de verbinding "gedegradeerd"; na `fouten_tot_uit` fouten op rij
+    gaat ze "uit". Een verbinding die uit is wordt pas weer geprobeerd na een
+    wachttijd die bij elke mislukte poging verdubbelt (met jitter, tot `max_wacht`).
+    Tot dat moment falen leesopdrachten direct, zonder op een timeout te wachten.
+    """
+
+    def __init__(self, min_wacht=0.5, max_wacht=30.0, fouten_tot_uit=3):
+        self.min_wacht = min_wacht
+        self.max_wacht = max_wacht
+        self.fouten_tot_uit = fouten_tot_uit
+        self.status = UIT
+        self.fouten = 0  # opeenvolgende fouten
+        self.pogingen = 0  # opeenvolgende mislukte verbindingspogingen
+        self.volgende_poging = 0.0  # time.monotonic()-tijdstip
 
+    def mag_proberen(self, nu):
+        return self.status != UIT or nu >= self.volgende_poging
+
+    def succes(self):
+        self.status = VERBONDEN
+        self.fouten = 0
+        self.pogingen = 0
+
+    def fout(self, nu):
+        self.fouten += 1
+        if self.status == UIT or self.fouten >= self.fouten_tot_uit:
+            self.status = UIT
+            wacht = min(self.max_wacht, self.min_wacht * 2 ** self.pogingen)
+            self.volgende_poging = nu + wacht / 2 + random.uniform(0, wacht / 2)
+            self.pogingen += 1
+        else:
+            self.status = GEDEGRADEERD
+
+
+#   Leesplan: bundelt losse variabelen tot blokleesopdrachten
+
+FUNCTIECODES = {
+    "coil": 1,
+    "discrete_input": 2,
+    "holding_register": 3,
+    "input_register": 4,
+}
+
+
+class LeesBlok:
+    """Eén Modbus-leesopdracht die meerdere variabelen tegelijk bedient."""
+
+    def __init__(self, functiecode, slave_id, start, aantal, koppelingen, apparaat=None):
+        self.apparaat = apparaat  # naam van het apparaat waarover het blok gelezen wordt
+        self.functiecode = functiecode
+        self.slave_id = slave_id
+        self.start = start
+        self.aantal = aantal
+        self.koppelingen = koppelingen  # lijst van (offset, variabele)
+
+    def is_bits(self):
+        return self.functiecode in (1, 2)
+
+    def __repr__(self):
+        return (f"LeesBlok(apparaat={self.apparaat}, fc={self.functiecode}, slave={self.slave_id}, "
+                f"start={self.start}, aantal={self.aantal}, variabelen={len(self.koppelingen)})")
+
+
+def maak_leesplan(variabelen, apparaten, max_gat=0):
+    """
+    Groepeert variabelen per apparaat, unit ID en functiecode en voegt
+    aaneengesloten (of bijna aaneengesloten) adressen samen tot zo groot
+    mogelijke blokken.
+
+    Args:
+        variabelen (iterable): Variabelen met `type`, `adres`, `apparaat` en `unit_id`.
+        apparaten (list[Apparaat]): De apparatentabel; het eerste apparaat is de standaard
+            voor variabelen zonder apparaat.
+        max_gat (int): Aantal ongebruikte adressen dat binnen één blok mag vallen.
+
+    Returns:
+        list[LeesBlok]: Het leesplan, gesorteerd op apparaat, unit ID, functiecode en startadres.
+    """
+    per_naam = {apparaat.naam: apparaat for apparaat in apparaten}
+    standaard = apparaten[0] if apparaten else None
+
+    groepen = {}
+    for var in variabelen:
+        functiecode = FUNCTIECODES.get(var.type)
+        if functiecode is None:
+            continue
+        try:
+            adres = int(var.adres)
+        except (TypeError, ValueError):
+            print(f"Ongeldig adres voor {var.naam}: {var.adres}")
+            continue
+        apparaat = per_naam.get(var.apparaat) if var.apparaat else standaard
+        if apparaat is None:
+            print(f"Onbekend apparaat voor {var.naam}: {var.apparaat}")
+            continue
+        unit_id = var.unit_id if var.unit_id is not None else apparaat.unit_id
+        groepen.setdefault((apparaat.naam, unit_id, functiecode), []).append((adres, var))
+
+    plan = []
+    for (naam, unit_id, functiecode), items in sorted(groepen.items(), key=lambda g: g[0]):
+        items.sort(key=lambda item: item[0])
+        apparaat = per_naam[naam]
+        limiet = apparaat.max_bits if functiecode in (1, 2) else apparaat.max_registers
+
+        start = einde = None
+        koppelingen = []
+        for adres, var in items:
+            if start is not None and (adres - einde - 1 > max_gat or adres - start + 1 > limiet):
+                plan.append(LeesBlok(functiecode, unit_id, start, einde - start + 1, koppelingen, naam))
+                start = None
+            if start is None:
+                start = einde = adres
+                koppelingen = []
+            einde = max(einde, adres)
+            koppelingen.append((adres - start, var))
+        if start is not None:
+            plan.append(LeesBlok(functiecode, unit_id, start, einde - start + 1, koppelingen, naam))
+    return plan
+
+
+#   Communicatie manager klasse
 
 class CommunicatieManager:
+    """
+    Beheert een pool van persistente clients, één per verbinding uit de apparatentabel.
+
+    Verbindingen worden pas bij de eerste leesopdracht opgebouwd en door een
+    VerbindingsBewaker bewaakt; een verbinding die uit is kost geen timeout
+    per scan maar wordt met exponentiële backoff opnieuw geprobeerd.
+    """
+
     def __init__(self, instellingen):
         self.instellingen = instellingen
-        self.tcp_client = None
-        self.rtu_client = None
+        self.apparaten = {}  # naam -> Apparaat
+        self.clients = {}  # verbinding_sleutel -> client
+        self.bewakers = {}  # verbinding_sleutel -> VerbindingsBewaker
         self.running = False
+        self.leesplan = []
 
     def start(self):
-        """Start communicatie op basis van actieve instellingen."""
+        """Maakt de clients aan voor alle apparaten; verbinden gebeurt bij de eerste leesopdracht."""
         if self.running:
             return  # reeds actief
 
-        if self.instellingen.get("Modbus TCP", {}).get("actief", False):
-            cfg = self.instellingen["Modbus TCP"]["instellingen"]
-            self.tcp_client = ModbusTcpClient(
-                host=cfg["ip"],
-                port=cfg["poort"],
-                timeout=cfg["timeout"]
-            )
-            self.tcp_client.connect()
-
-        if self.instellingen.get("Modbus RTU", {}).get("actief", False):
-            cfg = self.instellingen["Modbus RTU"]["instellingen"]
-            self.rtu_client = ModbusSerialClient(
-                method='rtu',
-                port=cfg["com_port"],
-                baudrate=cfg["baudrate"],
-                timeout=cfg["timeout"]
-            )
-            self.rtu_client.connect()
+        self.apparaten = {a.naam: a for a in apparaten_uit_instellingen(self.instellingen)}
+        for apparaat in self.apparaten.values():
+            sleutel = apparaat.verbinding_sleutel()
+            if sleutel not in self.clients:
+                self.clients[sleutel] = apparaat.maak_client()
+                self.bewakers[sleutel] = VerbindingsBewaker()
 
         self.running = True
 
     def stop(self):
         """Stop actieve verbindingen."""
-        if self.tcp_client:
-            self.tcp_client.close()
-            self.tcp_client = None
-        if self.rtu_client:
-            self.rtu_client.close()
-            self.rtu_client = None
+        for client in self.clients.values():
+            client.close()
+        self.clients.clear()
+        self.bewakers.clear()
         self.running = False
 
+    def gezondheid(self):
+        """Status ("verbonden", "gedegradeerd" of "uit") per apparaat."""
+        return {naam: self.bewakers[apparaat.verbinding_sleutel()].status
+                for naam, apparaat in self.apparaten.items()
+                if apparaat.verbinding_sleutel() in self.bewakers}
+
+    def zorg_voor_verbinding(self, sleutel, nu=None):
+        """Geeft True als de verbinding bruikbaar is; probeert zo nodig (volgens de backoff) te verbinden."""
+        nu = time.monotonic() if nu is None else nu
+        bewaker = self.bewakers[sleutel]
+        if bewaker.status != UIT:
+            return True
+        if not bewaker.mag_proberen(nu):
+            return False  # bekend als uit: direct falen
+        try:
+            verbonden = self.clients[sleutel].connect()
+        except Exception as e:
+            print(f"Verbinden met {sleutel} mislukt: {e}")
+            verbonden = False
+        if verbonden:
+            bewaker.succes()
+            print(f"Verbonden met {sleutel}")
+        else:
+            bewaker.fout(time.monotonic())
+        return verbonden
+
+    def meld_fout(self, sleutel):
+        """Registreert een communicatiefout; na herhaalde fouten wordt de verbinding gesloten."""
+        bewaker = self.bewakers[sleutel]
+        if bewaker.status == UIT:
+            return  # al afgehandeld; de backoff loopt
+        bewaker.fout(time.monotonic())
+        if bewaker.status == UIT:
+            print(f"Verbinding {sleutel} uit, volgende poging over "
+                  f"{bewaker.volgende_poging - time.monotonic():.1f} s")
+            self.clients[sleutel].close()
+
     def update(self):
         """Oproepen in de hoofdloop: regelt automatisch start/stop."""
         from core import project_context  # of waar je deze bewaart
@@ -171,54 +451,116 @@ class CommunicatieManager:
         elif not project_context.running and self.running:
             self.stop()
 
-    def lees_holding_register(self, adres, slave_id=1, count=1, protocol="tcp"):
+    def client_voor(self, apparaat=None):
+        """Geeft de client van een apparaat (standaard: het eerste apparaat) of None."""
+        if apparaat is None:
+            gevonden = next(iter(self.apparaten.values()), None)
+        else:
+            gevonden = self.apparaten.get(apparaat)
+        if gevonden is None:
+            return None
+        return self.clients.get(gevonden.verbinding_sleutel())
+
+    def lees_holding_register(self, adres, slave_id=1, count=1, apparaat=None):
         """Voorbeeld: lees holding registers."""
-        if protocol == "tcp" and self.tcp_client:
-            return self.tcp_client.read_holding_registers(address=adres, count=count, slave=slave_id)
-        elif protocol == "rtu" and self.rtu_client:
-            return self.rtu_client.read_holding_registers(address=adres, count=count, slave=slave_id)
+        client = self.client_voor(apparaat)
+        if client:
+            return client.read_holding_registers(address=adres, count=count, slave=slave_id)
         return None
 
-    def lees_input_register(self, adres, slave_id=1, count=1, protocol="tcp"):
+    def lees_input_register(self, adres, slave_id=1, count=1, apparaat=None):
         """Voorbeeld: lees ir."""
-        if protocol == "tcp" and self.tcp_client:
-            return self.tcp_client.read_input_registers(address=adres, count=count, slave=slave_id)
-        elif protocol == "rtu" and self.rtu_client:
-            return self.rtu_client.read_input_registers(address=adres, count=count, slave=slave_id)
+        client = self.client_voor(apparaat)
+        if client:
+            return client.read_input_registers(address=adres, count=count, slave=slave_id)
         return None
 
-    def lees_coil(self, adres, slave_id=1, count=1, protocol="tcp"):
+    def lees_coil(self, adres, slave_id=1, count=1, apparaat=None):
         """Voorbeeld: lees co."""
-        if protocol == "tcp" and self.tcp_client:
-            return self.tcp_client.read_coils(address=adres, count=count, slave=slave_id)
-        elif protocol == "rtu" and self.rtu_client:
-            return self.rtu_client.read_coils(address=adres, count=count, slave=slave_id)
+        client = self.client_voor(apparaat)
+        if client:
+            return client.read_coils(address=adres, count=count, slave=slave_id)
         return None
 
-    def lees_discrete_input(self, adres, slave_id=1, count=1, protocol="tcp"):
+    def lees_discrete_input(self, adres, slave_id=1, count=1, apparaat=None):
         """Voorbeeld: lees di."""
-        if protocol == "tcp" and self.tcp_client:
-            return self.tcp_client.read_discrete_inputs(address=adres, count=count, slave=slave_id)
-        elif protocol == "rtu" and self.rtu_client:
-            return self.rtu_client.read_discrete_inputs(address=adres, count=count, slave=slave_id)
+        client = self.client_voor(apparaat)
+        if client:
+            return client.read_discrete_inputs(address=adres, count=count, slave=slave_id)
         return None
 
-    def schrijf_coil(self, adres, waarde, slave_id=1, protocol="tcp"):
+    def schrijf_coil(self, adres, waarde, slave_id=1, apparaat=None):
         """
         Schrijf naar een coil (of meerdere coils).
 
         waarde: True / False of een lijst van bools, zoals [True, False, True]
         """
+        client = self.client_voor(apparaat)
+        if client is None:
+            return None
         if isinstance(waarde, list):
             # Schrijf meerdere coils
-            if protocol == "tcp" and self.tcp_client:
-                return self.tcp_client.write_coils(address=adres, values=waarde, slave=slave_id)
-            elif protocol == "rtu" and self.rtu_client:
-                return self.rtu_client.write_coils(address=adres, values=waarde, slave=slave_id)
-        else:
-            # Schrijf één coil
-            if protocol == "tcp" and self.tcp_client:
-                return self.tcp_client.write_coil(address=adres, value=waarde, slave=slave_id)
-            elif protocol == "rtu" and self.rtu_client:
-                return self.rtu_client.write_coil(address=adres, value=waarde, slave=slave_id)
-        return None
+            return client.write_coils(address=adres, values=waarde, slave=slave_id)
+        # Schrijf één coil
+        return client.write_coil(address=adres, value=waarde, slave=slave_id)
+
+    def maak_leesplan(self, variabelen):
+        """Stelt het leesplan samen volgens de apparatentabel en de instellingen onder "leesplan"."""
+        cfg = (self.instellingen or {}).get("leesplan", {})
+        self.leesplan = maak_leesplan(
+            variabelen,
+            apparaten_uit_instellingen(self.instellingen),
+            max_gat=cfg.get("max_gat", STANDAARD_MAX_GAT)
+        )
+        return self.leesplan
+
+    def lees_blok(self, blok):
+        """Voert één blokleesopdracht uit en geeft de ruwe waarden terug (of None bij een fout)."""
+        apparaat = self.apparaten.get(blok.apparaat)
+        if apparaat is None:
+            return None
+        sleutel = apparaat.verbinding_sleutel()
+        if not self.zorg_voor_verbinding(sleutel):
+            return None
+
+        lezers = {
+            1: self.lees_coil,
+            2: self.lees_discrete_input,
+            3: self.lees_holding_register,
+            4: self.lees_input_register,
+        }
+        try:
+            response = lezers[blok.functiecode](blok.start, slave_id=blok.slave_id, count=blok.aantal,
+                                                apparaat=blok.apparaat)
+        except Exception as e:
+            print(f"Exceptie bij {blok}: {e}")
+            self.meld_fout(sleutel)
+            return None
+        if response is None:
+            return None
+        if isinstance(response, ExceptionResponse):
+            # Het apparaat antwoordt wel; de verbinding zelf is in orde
+            print(f"Fout bij lezen van {blok}: {response}")
+            self.bewakers[sleutel].succes()
+            return None
+        if response.isError():
+            print(f"Fout bij lezen van {blok}: {response}")
+            self.meld_fout(sleutel)
+            return None
+        self.bewakers[sleutel].succes()
+        return response.bits if blok.is_bits() else response.registers
+
+    def voer_leesplan_uit(self, plan=None):
+        """
+        Leest alle blokken uit het plan en verdeelt de resultaten over de variabelen.
+
+        De variabelen zelf worden niet aangepast, zodat dit ook vanuit een andere
+        thread kan. Het resultaat is per blok een (koppelingen, data, bron_tijd)-tupel;
+        data is None als het blok niet gelezen kon worden. Zie
+        VariabelenLijst.zet_waarden.
+        """
+        batch = []
+        for blok in self.leesplan if plan is None else plan:
+            data = self.lees_blok(blok)
+            batch.append((blok.koppelingen, data, time.time()))
+        return batch
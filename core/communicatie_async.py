@@ -0,0 +1,159 @@
+#   Asynchrone communicatie manager (asyncio)
+
+import asyncio
+import time
+
+from pymodbus.client import AsyncModbusTcpClient, AsyncModbusSerialClient
+from pymodbus.pdu import ExceptionResponse
+
+from core.communicatie import maak_leesplan, apparaten_uit_instellingen, VerbindingsBewaker, UIT, \
+    STANDAARD_MAX_GAT
+
+
+def maak_async_client(apparaat):
+    if apparaat.protocol == "rtu":
+        return AsyncModbusSerialClient(port=apparaat.com_port, baudrate=apparaat.baudrate,
+                                       timeout=apparaat.timeout)
+    return AsyncModbusTcpClient(host=apparaat.host, port=apparaat.poort, timeout=apparaat.timeout)
+
+
+class AsyncCommunicatieManager:
+    """
+    Asyncio-variant van CommunicatieManager.
+
+    Alle blokken uit het leesplan worden tegelijk gestart; per verbinding begrenst
+    een semafoor het aantal openstaande verzoeken. De scantijd wordt zo bepaald
+    door het traagste gezonde apparaat in plaats van door de som van alle apparaten.
+    Net als bij CommunicatieManager bewaakt een VerbindingsBewaker elke verbinding,
+    zodat een apparaat dat uit is direct faalt en de andere niet ophoudt.
+    """
+
+    def __init__(self, instellingen, max_gelijktijdig=4):
+        self.instellingen = instellingen
+        self.max_gelijktijdig = max_gelijktijdig
+        self.apparaten = {}  # naam -> Apparaat
+        self.clients = {}  # verbinding_sleutel -> async client
+        self.semaforen = {}  # verbinding_sleutel -> asyncio.Semaphore
+        self.bewakers = {}  # verbinding_sleutel -> VerbindingsBewaker
+        self.verbind_locks = {}  # verbinding_sleutel -> asyncio.Lock
+        self.running = False
+        self.leesplan = []
+
+    async def start(self):
+        """Maakt per verbinding een async client aan; verbinden gebeurt bij de eerste leesopdracht."""
+        if self.running:
+            return
+
+        self.apparaten = {a.naam: a for a in apparaten_uit_instellingen(self.instellingen)}
+        for apparaat in self.apparaten.values():
+            sleutel = apparaat.verbinding_sleutel()
+            if sleutel in self.clients:
+                continue
+            self.clients[sleutel] = maak_async_client(apparaat)
+            # Een seriële bus kan maar één verzoek tegelijk afhandelen
+            limiet = 1 if apparaat.protocol == "rtu" else self.max_gelijktijdig
+            self.semaforen[sleutel] = asyncio.Semaphore(limiet)
+            self.bewakers[sleutel] = VerbindingsBewaker()
+            self.verbind_locks[sleutel] = asyncio.Lock()
+        self.running = True
+
+    async def stop(self):
+        """Sluit alle verbindingen."""
+        for client in self.clients.values():
+            client.close()
+        self.clients.clear()
+        self.semaforen.clear()
+        self.bewakers.clear()
+        self.verbind_locks.clear()
+        self.running = False
+
+    def gezondheid(self):
+        """Status ("verbonden", "gedegradeerd" of "uit") per apparaat."""
+        return {naam: self.bewakers[apparaat.verbinding_sleutel()].status
+                for naam, apparaat in self.apparaten.items()
+                if apparaat.verbinding_sleutel() in self.bewakers}
+
+    async def zorg_voor_verbinding(self, sleutel):
+        """Geeft True als de verbinding bruikbaar is; probeert zo nodig (volgens de backoff) te verbinden."""
+        bewaker = self.bewakers[sleutel]
+        async with self.verbind_locks[sleutel]:
+            if bewaker.status != UIT:
+                return True
+            if not bewaker.mag_proberen(time.monotonic()):
+                return False  # bekend als uit: direct falen
+            try:
+                verbonden = await self.clients[sleutel].connect()
+            except Exception as e:
+                print(f"Verbinden met {sleutel} mislukt: {e}")
+                verbonden = False
+            if verbonden:
+                bewaker.succes()
+                print(f"Verbonden met {sleutel}")
+            else:
+                bewaker.fout(time.monotonic())
+            return verbonden
+
+    def meld_fout(self, sleutel):
+        """Registreert een communicatiefout; na herhaalde fouten wordt de verbinding gesloten."""
+        bewaker = self.bewakers[sleutel]
+        if bewaker.status == UIT:
+            return  # al afgehandeld; de backoff loopt
+        bewaker.fout(time.monotonic())
+        if bewaker.status == UIT:
+            print(f"Verbinding {sleutel} uit, volgende poging over "
+                  f"{bewaker.volgende_poging - time.monotonic():.1f} s")
+            self.clients[sleutel].close()
+
+    def maak_leesplan(self, variabelen):
+        """Stelt het leesplan samen volgens de apparatentabel en de instellingen onder "leesplan"."""
+        cfg = (self.instellingen or {}).get("leesplan", {})
+        self.leesplan = maak_leesplan(
+            variabelen,
+            apparaten_uit_instellingen(self.instellingen),
+            max_gat=cfg.get("max_gat", STANDAARD_MAX_GAT)
+        )
+        return self.leesplan
+
+    async def lees_blok(self, blok):
+        """Leest één blok; geeft de ruwe waarden terug (of None bij een fout)."""
+        apparaat = self.apparaten.get(blok.apparaat)
+        if apparaat is None:
+            return None
+        sleutel = apparaat.verbinding_sleutel()
+        client = self.clients.get(sleutel)
+        if client is None or not await self.zorg_voor_verbinding(sleutel):
+            return None
+
+        lezers = {
+            1: client.read_coils,
+            2: client.read_discrete_inputs,
+            3: client.read_holding_registers,
+            4: client.read_input_registers,
+        }
+        async with self.semaforen[sleutel]:
+            try:
+                response = await lezers[blok.functiecode](blok.start, count=blok.aantal, slave=blok.slave_id)
+            except Exception as e:
+                print(f"Exceptie bij {blok}: {e}")
+                self.meld_fout(sleutel)
+                return None
+        if isinstance(response, ExceptionResponse):
+            # Het apparaat antwoordt wel; de verbinding zelf is in orde
+            print(f"Fout bij lezen van {blok}: {response}")
+            self.bewakers[sleutel].succes()
+            return None
+        if response.isError():
+            print(f"Fout bij lezen van {blok}: {response}")
+            self.meld_fout(sleutel)
+            return None
+        self.bewakers[sleutel].succes()
+        return response.bits if blok.is_bits() else response.registers
+
+    async def _lees_blok_met_tijd(self, blok):
+        data = await self.lees_blok(blok)
+        return blok.koppelingen, data, time.time()
+
+    async def voer_leesplan_uit(self, plan=None):
+        """Leest alle blokken gelijktijdig en geeft per blok (koppelingen, data, bron_tijd) terug."""
+        plan = self.leesplan if plan is None else plan
+        return list(await asyncio.gather(*(self._lees_blok_met_tijd(blok) for blok in plan)))
@@ -0,0 +1,119 @@
+#   Decimatie van tijdreeksen voor trends (min/max, gemiddelde, LTTB)
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+MINMAX = "minmax"
+GEMIDDELDE = "gemiddelde"
+LTTB = "lttb"
+METHODEN = (MINMAX, GEMIDDELDE, LTTB)
+
+
+def bucket_grenzen(tijden, t0, t1, aantal):
+    """
+    Indexen in `tijden` (oplopend) die [t0, t1] in `aantal` even brede tijdvakken verdelen.
+
+    Returns:
+        list[int]: aantal + 1 grenzen; vak i loopt van grenzen[i] tot grenzen[i + 1].
+    """
+    breedte = (t1 - t0) / aantal
+    grenzen = [bisect_left(tijden, t0 + i * breedte) for i in range(aantal)]
+    grenzen.append(bisect_right(tijden, t1))
+    return grenzen
+
+
+def min_max_buckets(tijden, waarden, t0, t1, aantal, maxima=None):
+    """
+    Per tijdvak het minimum en maximum (in tijdsvolgorde), zodat pieken zichtbaar blijven.
+
+    `tijden` en `waarden` zijn array("d")'s van gelijke lengte. Het werk per vak
+    gebeurt met min()/max()/index() op een slice, dus in C. Voor voorgeaggregeerde
+    data zijn `waarden` de minima en `maxima` de maxima per rollup-vak.
+    """
+    maxima = waarden if maxima is None else maxima
+    uit_t, uit_w = array("d"), array("d")
+    grenzen = bucket_grenzen(tijden, t0, t1, aantal)
+    for a, b in zip(grenzen, grenzen[1:]):
+        if a >= b:
+            continue
+        vak_min, vak_max = waarden[a:b], maxima[a:b]
+        laagste, hoogste = min(vak_min), max(vak_max)
+        i_min = a + vak_min.index(laagste)
+        i_max = a + vak_max.index(hoogste)
+        if i_min <= i_max:
+            punten = ((i_min, laagste), (i_max, hoogste))
+        else:
+            punten = ((i_max, hoogste), (i_min, laagste))
+        for i, waarde in punten:
+            uit_t.append(tijden[i])
+            uit_w.append(waarde)
+    return uit_t, uit_w
+
+
+def gemiddelde_buckets(tijden, waarden, t0, t1, aantal, aantallen=None):
+    """
+    Per niet-leeg tijdvak één punt: het midden van het vak en het gemiddelde.
+
+    Voor voorgeaggregeerde data zijn `waarden` de sommen en `aantallen` het aantal
+    samples per rollup-vak, zodat het gemiddelde correct gewogen wordt.
+    """
+    uit_t, uit_w = array("d"), array("d")
+    breedte = (t1 - t0) / aantal
+    grenzen = bucket_grenzen(tijden, t0, t1, aantal)
+    for i, (a, b) in enumerate(zip(grenzen, grenzen[1:])):
+        if a < b:
+            uit_t.append(t0 + (i + 0.5) * breedte)
+            n = (b - a) if aantallen is None else sum(aantallen[a:b])
+            uit_w.append(sum(waarden[a:b]) / n)
+    return uit_t, uit_w
+
+
+def lttb(tijden, waarden, aantal):
+    """
+    Largest-Triangle-Three-Buckets: kiest `aantal` punten die de vorm van de reeks behouden.
+
+    Eerste en laatste punt blijven altijd staan; uit elk tussenliggend vak komt het
+    punt dat de grootste driehoek vormt met het vorige gekozen punt en het gemiddelde
+    van het volgende vak.
+    """
+    n = len(tijden)
+    if aantal >= n or aantal < 3:
+        return array("d", tijden), array("d", waarden)
+
+    uit_t, uit_w = array("d", [tijden[0]]), array("d", [waarden[0]])
+    vak = (n - 2) / (aantal - 2)
+    a = 0
+    for i in range(aantal - 2):
+        begin = int(i * vak) + 1
+        einde = int((i + 1) * vak) + 1
+        # Gemiddelde van het volgende vak (of het laatste punt)
+        v_begin, v_einde = einde, min(int((i + 2) * vak) + 1, n)
+        lengte = v_einde - v_begin
+        gem_t = sum(tijden[v_begin:v_einde]) / lengte
+        gem_w = sum(waarden[v_begin:v_einde]) / lengte
+
+        at, aw = tijden[a], waarden[a]
+        beste, beste_opp = begin, -1.0
+        for j in range(begin, einde):
+            opp = abs((at - gem_t) * (waarden[j] - aw) - (at - tijden[j]) * (gem_w - aw))
+            if opp > beste_opp:
+                beste, beste_opp = j, opp
+        uit_t.append(tijden[beste])
+        uit_w.append(waarden[beste])
+        a = beste
+
+    uit_t.append(tijden[n - 1])
+    uit_w.append(waarden[n - 1])
+    return uit_t, uit_w
+
+
+def decimeer(tijden, waarden, t0, t1, breedte, methode=MINMAX):
+    """Brengt een reeks ruwe samples terug tot ongeveer `breedte` pixels volgens `methode`."""
+    a, b = bisect_left(tijden, t0), bisect_right(tijden, t1)
+    if b - a <= 2 * breedte:
+        return tijden[a:b], waarden[a:b]  # past al: niets weggooien
+    if methode == GEMIDDELDE:
+        return gemiddelde_buckets(tijden, waarden, t0, t1, breedte)
+    if methode == LTTB:
+        return lttb(tijden[a:b], waarden[a:b], breedte)
+    return min_max_buckets(tijden, waarden, t0, t1, breedte)
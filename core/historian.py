@@ -0,0 +1,295 @@
+#   Historian in het geheugen: een ringbuffer per tag
+
+from array import array
+
+from core.downsampling import MINMAX, GEMIDDELDE, LTTB, decimeer, min_max_buckets, gemiddelde_buckets, lttb
+
+STANDAARD_DIEPTE = 3600  # aantal samples per tag
+# (vakgrootte in seconden, aantal vakken) per rollup-niveau
+STANDAARD_ROLLUPS = ((1, 3600), (60, 1440), (3600, 720))
+
+
+class RingBuffer:
+    """
+    Vooraf gereserveerde ringbuffer met (tijd, waarde)-samples van één tag.
+
+    Tijden en waarden staan in twee array("d")-kolommen van vaste lengte. Nieuwe
+    samples overschrijven de oudste zodra de buffer vol is. Samples moeten op
+    oplopende tijd binnenkomen; dan kan er binair gezocht worden.
+    """
+
+    def __init__(self, diepte=STANDAARD_DIEPTE):
+        self.diepte = diepte
+        self.tijden = array("d", bytes(8 * diepte))
+        self.waarden = array("d", bytes(8 * diepte))
+        self.positie = 0  # index waar het volgende sample komt
+        self.aantal = 0
+
+    def __len__(self):
+        return self.aantal
+
+    def _begin(self):
+        return (self.positie - self.aantal) % self.diepte
+
+    def voeg_toe(self, tijd, waarde):
+        if self.aantal and tijd < self.tijden[(self.positie - 1) % self.diepte]:
+            return  # ouder dan het laatste sample: negeren
+        self.tijden[self.positie] = tijd
+        self.waarden[self.positie] = waarde
+        self.positie = (self.positie + 1) % self.diepte
+        if self.aantal < self.diepte:
+            self.aantal += 1
+
+    def oudste_tijd(self):
+        if not self.aantal:
+            return None
+        return self.tijden[self._begin()]
+
+    def laatste_tijd(self):
+        if not self.aantal:
+            return None
+        return self.tijden[(self.positie - 1) % self.diepte]
+
+    def _zoek(self, tijd, rechts=False):
+        """Logische index (0 = oudste sample) van het eerste sample met tijd >= `tijd` (> bij `rechts`)."""
+        begin = self._begin()
+        tijden = self.tijden
+        diepte = self.diepte
+        lo, hi = 0, self.aantal
+        while lo < hi:
+            midden = (lo + hi) // 2
+            t = tijden[(begin + midden) % diepte]
+            if t < tijd or (rechts and t == tijd):
+                lo = midden + 1
+            else:
+                hi = midden
+        return lo
+
+    def _segmenten(self, van, tot):
+        """
+        Fysieke (begin, einde)-stukken van de logische indexen van..tot.
+
+        Omdat de buffer rondloopt, zijn dat er nul, één of twee.
+        """
+        if van >= tot:
+            return []
+        a = (self._begin() + van) % self.diepte
+        lengte = tot - van
+        if a + lengte <= self.diepte:
+            return [(a, a + lengte)]
+        return [(a, self.diepte), (0, a + lengte - self.diepte)]
+
+    def _views(self, van, tot):
+        """Geeft de logische indexen van..tot als lijst van (tijden, waarden)-memoryviews."""
+        tijden = memoryview(self.tijden)
+        waarden = memoryview(self.waarden)
+        return [(tijden[a:b], waarden[a:b]) for a, b in self._segmenten(van, tot)]
+
+    def bereik(self, t0, t1):
+        """Samples met t0 <= tijd <= t1, als lijst van (tijden, waarden)-memoryviews."""
+        return self._views(self._zoek(t0), self._zoek(t1, rechts=True))
+
+    def laatste(self, seconden, nu=None):
+        """Samples van de laatste `seconden` (gerekend vanaf `nu` of het laatste sample)."""
+        if not self.aantal:
+            return []
+        nu = self.laatste_tijd() if nu is None else nu
+        return self._views(self._zoek(nu - seconden), self.aantal)
+
+
+class RollupNiveau(RingBuffer):
+    """
+    Voorgeaggregeerde vakken van `interval` seconden: begintijd, min, max, som en aantal.
+
+    Wordt bij elk sample bijgewerkt: het lopende vak houdt de aggregaten bij en
+    gaat de ring in zodra een sample in een volgend vak valt. `waarden` bevat de
+    sommen. Anders dan de ruwe buffer groeien de kolommen pas tot `diepte` als
+    er data komt, omdat een tag die kort meedraait anders een heel jaar aan
+    vakken zou reserveren.
+    """
+
+    def __init__(self, interval, diepte):
+        self.interval = interval
+        self.diepte = diepte
+        self.tijden = array("d")
+        self.waarden = array("d")  # sommen
+        self.minima = array("d")
+        self.maxima = array("d")
+        self.aantallen = array("L")
+        self.positie = 0
+        self.aantal = 0
+        self._open = None  # begintijd van het lopende vak
+        self._min = self._max = self._som = 0.0
+        self._n = 0
+
+    def voeg_toe(self, tijd, waarde):
+        begin = tijd - tijd % self.interval
+        if begin != self._open:
+            if self._open is not None:
+                if begin < self._open:
+                    return  # ouder dan het lopende vak: negeren
+                self._sluit()
+            self._open = begin
+            self._min = self._max = waarde
+            self._som = 0.0
+            self._n = 0
+        if waarde < self._min:
+            self._min = waarde
+        elif waarde > self._max:
+            self._max = waarde
+        self._som += waarde
+        self._n += 1
+
+    def _sluit(self):
+        rij = (self._open, self._som, self._min, self._max, self._n)
+        kolommen = (self.tijden, self.waarden, self.minima, self.maxima, self.aantallen)
+        if len(self.tijden) < self.diepte:
+            for kolom, waarde in zip(kolommen, rij):
+                kolom.append(waarde)
+        else:
+            for kolom, waarde in zip(kolommen, rij):
+                kolom[self.positie] = waarde
+        self.positie = (self.positie + 1) % self.diepte
+        if self.aantal < self.diepte:
+            self.aantal += 1
+
+    def oudste_tijd(self):
+        if self.aantal:
+            return self.tijden[self._begin()]
+        return self._open
+
+    def vakken(self, t0, t1):
+        """
+        Kopie van de vakken die [t0, t1] raken, inclusief het lopende vak.
+
+        Returns:
+            tuple: (tijden, minima, maxima, sommen, aantallen); tijden zijn het
+            midden van elk vak.
+        """
+        tijden, minima, maxima, sommen = array("d"), array("d"), array("d"), array("d")
+        aantallen = array("L")
+        for a, b in self._segmenten(self._zoek(t0 - self.interval, rechts=True), self._zoek(t1, rechts=True)):
+            tijden.extend(self.tijden[a:b])
+            minima.extend(self.minima[a:b])
+            maxima.extend(self.maxima[a:b])
+            sommen.extend(self.waarden[a:b])
+            aantallen.extend(self.aantallen[a:b])
+        if self._open is not None and self._open <= t1 and self._open + self.interval > t0:
+            tijden.append(self._open)
+            minima.append(self._min)
+            maxima.append(self._max)
+            sommen.append(self._som)
+            aantallen.append(self._n)
+        half = self.interval / 2
+        for i in range(len(tijden)):
+            tijden[i] += half
+        return tijden, minima, maxima, sommen, aantallen
+
+
+class Historian:
+    """
+    Houdt per tag-ID een ringbuffer bij met de gelezen waarden.
+
+    Wordt gevoed met dezelfde batches blokresultaten als VariabelenLijst.zet_waarden
+    (koppelingen, data, bron_tijd), dus met de ruwe waarden vóór de deadband.
+    Alleen numerieke waarden worden bewaard (bits als 0.0/1.0); niet gelezen
+    blokken leveren geen samples op.
+
+    De query's geven memoryviews op de buffer terug, zonder kopie. Die blijven
+    geldig zolang de samples niet door nieuwere zijn overschreven; wie ze langer
+    wil bewaren maakt er zelf een kopie van (bijv. `array("d", view)`).
+
+    Daarnaast houdt de historian per tag rollups bij (standaard per seconde, minuut
+    en uur). `opvragen` kiest daarmee voor een trend van een bepaalde breedte de
+    grofste bron die nog minstens één punt per pixel geeft.
+    """
+
+    def __init__(self, diepte=STANDAARD_DIEPTE, rollups=STANDAARD_ROLLUPS):
+        self.diepte = diepte
+        self.rollups = tuple(tuple(r) for r in rollups)
+        self.buffers = {}  # tag_id -> RingBuffer
+        self.niveaus = {}  # tag_id -> list[RollupNiveau], van fijn naar grof
+
+    def buffer(self, tag_id):
+        buffer = self.buffers.get(tag_id)
+        if buffer is None:
+            buffer = self.buffers[tag_id] = RingBuffer(self.diepte)
+            self.niveaus[tag_id] = [RollupNiveau(interval, diepte)
+                                    for interval, diepte in sorted(self.rollups)]
+        return buffer
+
+    def voeg_toe(self, tag_id, tijd, waarde):
+        if isinstance(waarde, (int, float)):
+            self.buffer(tag_id).voeg_toe(tijd, waarde)
+            for niveau in self.niveaus[tag_id]:
+                niveau.voeg_toe(tijd, waarde)
+
+    def verwerk(self, batch):
+        for koppelingen, data, bron_tijd in batch:
+            if data is None:
+                continue
+            for offset, var in koppelingen:
+                if var.tag_id is not None:
+                    self.voeg_toe(var.tag_id, bron_tijd, data[offset])
+
+    def laatste(self, tag_id, seconden, nu=None):
+        buffer = self.buffers.get(tag_id)
+        return buffer.laatste(seconden, nu) if buffer else []
+
+    def bereik(self, tag_id, t0, t1):
+        buffer = self.buffers.get(tag_id)
+        return buffer.bereik(t0, t1) if buffer else []
+
+    def opvragen(self, tag_id, t0, t1, breedte, methode=MINMAX):
+        """
+        Gedecimeerde samples van [t0, t1] voor een trend van `breedte` pixels.
+
+        Kiest de grofste bron (ruwe buffer of rollup-niveau) met vakken van hoogstens
+        één pixel die het begin van het bereik nog bevat; anders de fijnste bron die
+        het bereik wel dekt. Dekt geen enkele bron het hele bereik, dan de bron die
+        het verst teruggaat.
+
+        `breedte` mag een float zijn (zoals een pixelbreedte uit Qt); ze wordt naar
+        beneden afgerond, en bij minder dan één pixel komt er niets terug.
+
+        Returns:
+            tuple[array, array]: tijden en waarden (array("d")).
+        """
+        breedte = int(breedte)
+        buffer = self.buffers.get(tag_id)
+        if buffer is None or t1 <= t0 or breedte < 1:
+            return array("d"), array("d")
+        pixel = (t1 - t0) / breedte
+
+        bronnen = [(0.0, buffer)] + [(niveau.interval, niveau) for niveau in self.niveaus[tag_id]]
+        beschikbaar = [(interval, bron) for interval, bron in bronnen if bron.oudste_tijd() is not None]
+        if not beschikbaar:
+            return array("d"), array("d")
+        passend = [bron for interval, bron in beschikbaar if interval <= pixel and bron.oudste_tijd() <= t0]
+        dekkend = [bron for _, bron in beschikbaar if bron.oudste_tijd() <= t0]
+        if passend:
+            bron = passend[-1]  # grofste bron met vakken van hoogstens één pixel
+        elif dekkend:
+            bron = dekkend[0]  # pixel fijner dan de dekkende bronnen: de fijnste daarvan
+        else:
+            bron = min((bron for _, bron in beschikbaar), key=lambda b: b.oudste_tijd())
+
+        if bron is buffer:
+            tijden, waarden = array("d"), array("d")
+            for t, w in buffer.bereik(t0, t1):
+                tijden.frombytes(t.cast("B"))
+                waarden.frombytes(w.cast("B"))
+            return decimeer(tijden, waarden, t0, t1, breedte, methode)
+
+        niveau = bron
+        tijden, minima, maxima, sommen, aantallen = niveau.vakken(t0, t1)
+        if methode == GEMIDDELDE:
+            return gemiddelde_buckets(tijden, sommen, t0, t1, breedte, aantallen)
+        if methode == LTTB:
+            gemiddelden = array("d", (s / n for s, n in zip(sommen, aantallen)))
+            return lttb(tijden, gemiddelden, breedte)
+        return min_max_buckets(tijden, minima, t0, t1, breedte, maxima)
+
+    def wis(self):
+        self.buffers.clear()
+        self.niveaus.clear()
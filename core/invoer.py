@@ -0,0 +1,31 @@
+#   Getallen uit tabelcellen en instellingen lezen
+
+
+class OngeldigeInvoer(ValueError):
+    """Een veld bevat geen geldig getal; `veld` is de naam van de kolom/sleutel."""
+
+    def __init__(self, veld, tekst):
+        super().__init__(f"Ongeldige waarde voor '{veld}': {tekst!r}")
+        self.veld = veld
+        self.tekst = tekst
+
+
+def lees_getal(data, veld, soort=float, standaard=None):
+    """
+    Leest `data[veld]` als int of float; een komma als decimaalteken mag ook ("0,5").
+
+    Een ontbrekend of leeg veld (of "None") geeft `standaard`. Anders volgt
+    OngeldigeInvoer met de naam van het veld, zodat een dialoog de cel kan aanwijzen.
+    """
+    waarde = data.get(veld)
+    if waarde is None:
+        return standaard
+    if isinstance(waarde, (int, float)):
+        return soort(waarde)
+    tekst = str(waarde).strip()
+    if tekst in ("", "None"):
+        return standaard
+    try:
+        return soort(tekst.replace(",", ".") if soort is float else tekst)
+    except ValueError:
+        raise OngeldigeInvoer(veld, tekst) from None
@@ -0,0 +1,70 @@
+#   Register van canvasobjecttypes en het laden van objecten uit een project
+
+from PySide6.QtWidgets import QGraphicsScene
+
+from core.pixmap_cache import pixmap_cache
+
+BATCH_GROOTTE = 500  # objecten per batch bij het laden
+
+OBJECT_TYPES = {}  # "type" uit to_dict -> klasse met from_dict
+
+
+def canvas_type(type_naam):
+    """
+    Decorator: registreert een canvasklasse onder haar `type`-sleutel.
+
+    De klasse moet een `from_dict(data)` hebben en mag een statische
+    `pixmap_sleutels(data)` hebben voor het vooraf laden van afbeeldingen.
+    """
+    def registreer(cls):
+        OBJECT_TYPES[type_naam] = cls
+        return cls
+    return registreer
+
+
+def maak_object(data):
+    """Bouwt een canvasobject uit een dict (to_dict); None bij een onbekend type."""
+    cls = OBJECT_TYPES.get(data.get("type"))
+    if cls is None:
+        print(f"Onbekend objecttype bij laden: {data.get('type')!r}")
+        return None
+    obj = cls.from_dict(data)
+    if data.get("id"):
+        obj.object_id = data["id"]
+    return obj
+
+
+def laad_objecten(scene, objecten, batch_grootte=BATCH_GROOTTE):
+    """
+    Zet de objecten uit een project in één doorloop op de scène.
+
+    Per batch worden eerst de afbeeldingen van die batch parallel geladen
+    (pixmap_cache.laad_vooraf), daarna worden de objecten gebouwd en toegevoegd.
+    Tijdens het laden staat de BSP-index van de scène uit, zodat niet elk
+    toegevoegd item de boom bijwerkt; na afloop wordt hij in één keer opgebouwd.
+
+    Returns:
+        int: Het aantal geladen objecten.
+    """
+    index_methode = scene.itemIndexMethod()
+    scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+    aantal = 0
+    try:
+        for begin in range(0, len(objecten), batch_grootte):
+            batch = objecten[begin:begin + batch_grootte]
+
+            sleutels = []
+            for data in batch:
+                cls = OBJECT_TYPES.get(data.get("type"))
+                if cls is not None and hasattr(cls, "pixmap_sleutels"):
+                    sleutels.extend(cls.pixmap_sleutels(data))
+            pixmap_cache.laad_vooraf(sleutels)
+
+            for data in batch:
+                obj = maak_object(data)
+                if obj is not None:
+                    scene.addItem(obj)
+                    aantal += 1
+    finally:
+        scene.setItemIndexMethod(index_methode)
+    return aantal
@@ -1,8 +1,10 @@
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QComboBox
+    QTableWidget, QTableWidgetItem, QHeaderView, QComboBox, QMessageBox
 )
 
+from core.invoer import OngeldigeInvoer
+
 
 class ObjectTabelDialoog(QDialog):
     """
@@ -141,9 +143,12 @@ class ObjectTabelDialoog(QDialog):
         Als `object_klasse` is opgegeven, worden de rijen geconverteerd naar objecten
         via de from_dict() methode. Anders blijven het dicts.
 
-        Daarna wordt de dialoog gesloten met accept().
+        Eerst worden alle rijen omgezet; pas als dat voor elke rij lukt, wordt de
+        inhoud van `data_lijst` vervangen en de dialoog gesloten met accept(). Bij een
+        ongeldige cel blijft de lijst ongewijzigd, wordt de cel aangewezen en blijft
+        de dialoog open.
         """
-        self.data_lijst.clear()
+        nieuwe_lijst = []
         for rij in range(self.table.rowCount()):
             waarden = {}
             for kolom in range(self.aantal_kolommen):
@@ -156,8 +161,24 @@ class ObjectTabelDialoog(QDialog):
                     waarden[kolomnaam] = item.text() if item else ""
 
             if self.object_klasse:
-                self.data_lijst.append(self.object_klasse.from_dict(waarden))
+                try:
+                    nieuwe_lijst.append(self.object_klasse.from_dict(waarden))
+                except OngeldigeInvoer as e:
+                    self.toon_fout(rij, e.veld, str(e))
+                    return
+                except (ValueError, TypeError, KeyError) as e:
+                    self.toon_fout(rij, None, str(e))
+                    return
             else:
-                self.data_lijst.append(waarden)
+                nieuwe_lijst.append(waarden)
 
+        self.data_lijst.clear()
+        self.data_lijst.extend(nieuwe_lijst)
         self.accept()
+
+    def toon_fout(self, rij, kolomnaam, melding):
+        if kolomnaam in self.kolomnamen:
+            self.table.setCurrentCell(rij, self.kolomnamen.index(kolomnaam))
+        else:
+            self.table.selectRow(rij)
+        QMessageBox.warning(self, "Ongeldige invoer", f"Rij {rij + 1}: {melding}")
@@ -0,0 +1,109 @@
+#   Gedeelde cache voor geschaalde afbeeldingen
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtGui import QPixmap, QImage, Qt
+
+STANDAARD_BUDGET = 64 * 1024 * 1024  # bytes
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """
+    Procesbrede LRU-cache van geschaalde pixmaps, met een geheugenbudget.
+
+    De sleutel is (pad, breedte, hoogte, aspectmodus). Een treffer geeft dezelfde
+    QPixmap terug (impliciet gedeeld, dus zonder kopie van de pixels); een misser
+    leest en schaalt het bestand één keer. Zodra het budget op is, gaan de
+    langst niet gebruikte pixmaps eruit.
+    """
+
+    def __init__(self, budget=STANDAARD_BUDGET):
+        self.budget = budget
+        self.grootte = 0  # bytes in gebruik
+        self.hits = 0
+        self.misses = 0
+        self.verwijderd = 0
+        self.vooraf_geladen = 0
+        self._items = OrderedDict()  # sleutel -> QPixmap
+
+    def pixmap(self, pad, breedte, hoogte, aspect=Qt.IgnoreAspectRatio):
+        sleutel = (pad, breedte, hoogte, aspect)
+        pixmap = self._items.get(sleutel)
+        if pixmap is not None:
+            self.hits += 1
+            self._items.move_to_end(sleutel)
+            return pixmap
+
+        self.misses += 1
+        pixmap = QPixmap(pad)
+        if not pixmap.isNull():
+            pixmap = pixmap.scaled(breedte, hoogte, aspect)
+        self.plaats(sleutel, pixmap)
+        return pixmap
+
+    def laad_vooraf(self, sleutels, max_threads=None):
+        """
+        Laadt de afbeeldingen voor `sleutels` parallel en zet ze in de cache.
+
+        Decoderen en schalen gebeurt als QImage op een threadpool (QPixmap mag
+        alleen in de GUI-thread); het omzetten naar QPixmap gebeurt daarna hier.
+        Elke unieke sleutel wordt één keer geladen, hoe vaak ze ook voorkomt.
+
+        Returns:
+            int: Het aantal nieuw geladen afbeeldingen.
+        """
+        nieuw = [sleutel for sleutel in dict.fromkeys(sleutels) if sleutel not in self._items]
+        if not nieuw:
+            return 0
+        with ThreadPoolExecutor(max_workers=max_threads) as pool:
+            for sleutel, image in zip(nieuw, pool.map(_laad_image, nieuw)):
+                self.plaats(sleutel, QPixmap.fromImage(image) if not image.isNull() else QPixmap())
+        self.vooraf_geladen += len(nieuw)
+        return len(nieuw)
+
+    def plaats(self, sleutel, pixmap):
+        """Zet een (al geschaalde) pixmap in de cache, bijv. vanuit het vooraf laden."""
+        oud = self._items.pop(sleutel, None)
+        if oud is not None:
+            self.grootte -= pixmap_bytes(oud)
+        self._items[sleutel] = pixmap
+        self.grootte += pixmap_bytes(pixmap)
+        while self.grootte > self.budget and len(self._items) > 1:
+            _, weg = self._items.popitem(last=False)
+            self.grootte -= pixmap_bytes(weg)
+            self.verwijderd += 1
+
+    def __contains__(self, sleutel):
+        return sleutel in self._items
+
+    def wis(self):
+        self._items.clear()
+        self.grootte = 0
+
+    def statistiek(self):
+        totaal = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / totaal if totaal else 0.0,
+            "verwijderd": self.verwijderd,
+            "vooraf_geladen": self.vooraf_geladen,
+            "aantal": len(self._items),
+            "bytes": self.grootte
+        }
+
+
+def _laad_image(sleutel):
+    pad, breedte, hoogte, aspect = sleutel
+    image = QImage(pad)
+    if not image.isNull():
+        image = image.scaled(breedte, hoogte, aspect)
+    return image
+
+
+pixmap_cache = PixmapCache()
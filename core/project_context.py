@@ -1,3 +1,5 @@
 variabelen_lijst = None
 running = False
-instellingen = None
\ No newline at end of file
+instellingen = None
+historian = None
+historian_opslag = None
\ No newline at end of file
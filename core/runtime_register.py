@@ -0,0 +1,177 @@
+#   Register van de canvasobjecten en hun gekoppelde tags
+
+import uuid
+
+from PySide6.QtWidgets import QGraphicsItem
+
+from core import project_context
+
+
+def gekoppelde_tags(item):
+    """Tag-ID's van de variabelen waaraan een canvasobject gekoppeld is."""
+    if hasattr(item, "gekoppelde_variabelen"):
+        variabelen = item.gekoppelde_variabelen()
+    elif hasattr(item, "gekoppelde_variabele"):
+        variabelen = [item.gekoppelde_variabele()]
+    else:
+        return []
+    return [var.tag_id for var in variabelen if var is not None]
+
+
+class RuntimeRegister:
+    """
+    Houdt bij welke canvasobjecten in de scène staan en welke objecten bij welke tag horen.
+
+    Objecten melden zich zelf aan en af (zie RegistreerbaarObject), dus de
+    runtime-lus hoeft de scène niet door te lopen: `objecten_voor` geeft direct
+    de objecten die op een set gewijzigde tag-ID's moeten reageren. De index
+    tag-ID -> objecten wordt pas opnieuw opgebouwd als er objecten bijkomen of
+    verdwijnen, een koppeling wijzigt of de variabelenlijst structureel verandert.
+
+    Verder worden toegevoegde, gewijzigde en verwijderde objecten verzameld tot
+    `neem_wijzigingen` ze ophaalt (voor het bewerkingsjournaal).
+    """
+
+    def __init__(self):
+        self.objecten = {}  # top-level canvasobject -> None (als geordende set)
+        self.trends = {}  # objecten die elke tik bijgewerkt worden (met `tik`)
+        self._per_tag = {}  # tag_id -> list van objecten
+        self._index_sleutel = None  # (lijst, versie, koppelversie) waarvoor _per_tag klopt
+        self._koppel_versie = 0
+        self._gewijzigd = {}  # toegevoegde of gewijzigde objecten (geordende set)
+        self._verwijderd = []  # object_id's
+
+    def meld_aan(self, item):
+        self.objecten[item] = None
+        if hasattr(item, "tik"):
+            self.trends[item] = None
+        self._gewijzigd[item] = None
+        self._koppel_versie += 1
+
+    def meld_af(self, item):
+        if item in self.objecten:
+            self._verwijderd.append(item.object_id)
+        self.objecten.pop(item, None)
+        self.trends.pop(item, None)
+        self._gewijzigd.pop(item, None)
+        self._koppel_versie += 1
+
+    def object_gewijzigd(self, item):
+        self._gewijzigd[item] = None
+
+    def neem_wijzigingen(self):
+        """
+        Objecten die sinds de vorige aanroep zijn toegevoegd of gewijzigd en nog op de
+        scène staan, en de ID's van de verwijderde objecten; daarna leeg.
+        """
+        gewijzigd = [item for item in self._gewijzigd if item in self.objecten]
+        verwijderd = self._verwijderd
+        self._gewijzigd = {}
+        self._verwijderd = []
+        return gewijzigd, verwijderd
+
+    def scene_gewijzigd(self, item):
+        if item.scene() is None:
+            self.meld_af(item)
+        else:
+            self.meld_aan(item)
+
+    def herindexeer(self):
+        """Na het wijzigen van de koppeling van een object."""
+        self._koppel_versie += 1
+
+    def wis(self):
+        self.objecten.clear()
+        self.trends.clear()
+        self._per_tag.clear()
+        self._index_sleutel = None
+        self._gewijzigd.clear()
+        self._verwijderd.clear()
+
+    def _zorg_voor_index(self):
+        lijst = project_context.variabelen_lijst
+        sleutel = (id(lijst), getattr(lijst, "versie", None), self._koppel_versie)
+        if sleutel == self._index_sleutel:
+            return
+        per_tag = {}
+        for item in self.objecten:
+            if not hasattr(item, "update_runtime"):
+                continue
+            for tag_id in gekoppelde_tags(item):
+                per_tag.setdefault(tag_id, []).append(item)
+        self._per_tag = per_tag
+        self._index_sleutel = sleutel
+
+    def als_dicts(self):
+        """De objecten als dicts voor het project, in volgorde van toevoegen (= stapelvolgorde)."""
+        return [item.als_dict() for item in self.objecten]
+
+    def objecten_voor(self, tag_ids):
+        """De objecten die gekoppeld zijn aan één van `tag_ids` (elk object één keer)."""
+        self._zorg_voor_index()
+        per_tag = self._per_tag
+        gevonden = {}
+        for tag_id in tag_ids:
+            for item in per_tag.get(tag_id, ()):
+                gevonden[item] = None
+        return gevonden.keys()
+
+
+runtime_register = RuntimeRegister()
+
+
+class RegistreerbaarObject:
+    """
+    Mixin voor canvasobjecten: meldt het object aan of af bij het runtime-register
+    zodra het aan de scène wordt toegevoegd of eruit wordt gehaald.
+
+    Houdt ook het resultaat van `to_dict` vast voor het opslaan. Verplaatsen of
+    schalen wordt bij `als_dict` zelf gezien (positie en schaal zitten in de
+    cachesleutel); andere wijzigingen die in to_dict terechtkomen melden zich met
+    `markeer_gewijzigd` (of `koppeling_gewijzigd` na een instellingendialoog).
+    Elk object heeft een vaste `object_id`, die in het dict als "id" meegaat.
+
+    Moet vóór de Qt-basisklasse staan, bijv. `class X(RegistreerbaarObject, QGraphicsItemGroup)`.
+    """
+
+    _dict_cache = None  # ((x, y, schaal), dict) van de laatste to_dict
+    _object_id = None
+
+    @property
+    def object_id(self):
+        if self._object_id is None:
+            self._object_id = uuid.uuid4().hex
+        return self._object_id
+
+    @object_id.setter
+    def object_id(self, waarde):
+        self._object_id = waarde
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemSceneHasChanged:
+            if self.scene() is not None:
+                # Nodig voor ItemPositionHasChanged; zetten in __init__ zou door setFlags overschreven worden
+                self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
+            runtime_register.scene_gewijzigd(self)
+        elif change in (QGraphicsItem.ItemPositionHasChanged, QGraphicsItem.ItemScaleHasChanged):
+            runtime_register.object_gewijzigd(self)
+        return super().itemChange(change, value)
+
+    def koppeling_gewijzigd(self):
+        self.markeer_gewijzigd()
+        runtime_register.herindexeer()
+
+    def markeer_gewijzigd(self):
+        self._dict_cache = None
+        runtime_register.object_gewijzigd(self)
+
+    def als_dict(self):
+        """to_dict (met "id"), maar uit de cache zolang het object niet gewijzigd is."""
+        pos = self.pos()
+        sleutel = (pos.x(), pos.y(), self.scale())
+        cache = self._dict_cache
+        if cache is None or cache[0] != sleutel:
+            data = self.to_dict()
+            data["id"] = self.object_id
+            cache = self._dict_cache = (sleutel, data)
+        return cache[1]
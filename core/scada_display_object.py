@@ -3,10 +3,14 @@ from PySide6.QtGui import QFont, QColor
 from PySide6.QtCore import QPointF
 
 from core import project_context
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
 from core.installingen_dialoog import InstellingenDialoog
+from core.variabele_object import Koppeling
 
 
-class DisplayObject(QGraphicsTextItem):
+@canvas_type("displayobject")
+class DisplayObject(RegistreerbaarObject, QGraphicsTextItem):
     def __init__(self, x=0, y=0, variabele="", kleur="black", lettertype="Arial", grootte=12, naam=""):
         super().__init__()
         self.x = x
@@ -16,6 +20,8 @@ class DisplayObject(QGraphicsTextItem):
         self.lettertype = lettertype
         self.grootte = grootte
         self.naam = naam
+        self._koppeling = Koppeling()
+        self._kwaliteit_goed = True
 
         self.setFont(QFont(self.lettertype, self.grootte))
         self.setDefaultTextColor(QColor(self.kleur))
@@ -26,15 +32,26 @@ class DisplayObject(QGraphicsTextItem):
             QGraphicsTextItem.ItemIsSelectable
         )
         self.setAcceptHoverEvents(True)
+        # Tekstopmaak is duur: tekenen vanuit een cache tot de waarde wijzigt
+        self.setCacheMode(QGraphicsTextItem.DeviceCoordinateCache)
 
         self.update_display()
 
+    def gekoppelde_variabele(self):
+        return self._koppeling.variabele(project_context.variabelen_lijst, self.variabele)
+
     def update_display(self):
-        var = next((v for v in project_context.variabelen_lijst if v.naam == self.variabele), None)
-        if var:
-            self.setPlainText(str(var.waarde))
-        else:
-            self.setPlainText("??")
+        var = self.gekoppelde_variabele()
+        tekst = str(var.waarde) if var and var.waarde is not None else "??"
+        if tekst != self.toPlainText():  # setPlainText maakt het document altijd opnieuw op
+            self.setPlainText(tekst)
+
+    def toon_kwaliteit(self, goed):
+        """Toont de tekst grijs bij een waarde met slechte kwaliteit (alleen bij een wissel)."""
+        if goed == self._kwaliteit_goed:
+            return
+        self._kwaliteit_goed = goed
+        self.setDefaultTextColor(QColor(self.kleur if goed else "gray"))
 
     def to_dict(self):
         return {
@@ -65,6 +82,7 @@ class DisplayObject(QGraphicsTextItem):
         dialoog = InstellingenDialoog(self, project_context.variabelen_lijst)
         if dialoog.exec():
             dialoog.apply_changes()
+            self.koppeling_gewijzigd()
             self.update_display()
 
     def wheelEvent(self, event):
@@ -80,10 +98,12 @@ class DisplayObject(QGraphicsTextItem):
         nieuwe_font = QFont(huidige_font)
         nieuwe_font.setPointSize(grootte)
         self.setFont(nieuwe_font)
+        self.markeer_gewijzigd()
 
     def update_runtime(self):
         #if self._gebruikersinput:  # Dan geen update
         #    return
-        for var in project_context.variabelen_lijst:
-            if var.naam == self.variabele:
-                self.update_display()
+        var = self.gekoppelde_variabele()
+        if var:
+            self.toon_kwaliteit(var.is_goed)
+            self.update_display()
@@ -1,11 +1,16 @@
 from PySide6.QtCore import QPointF
-from PySide6.QtGui import QPixmap, Qt
+from PySide6.QtGui import Qt
 from PySide6.QtWidgets import QGraphicsItemGroup, QGraphicsPixmapItem, QGraphicsItem
 
 from core import project_context
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
+from core.pixmap_cache import pixmap_cache
+from core.variabele_object import Koppeling
 
 
-class ScadaImageObject(QGraphicsItemGroup):
+@canvas_type("scadaimageobject")
+class ScadaImageObject(RegistreerbaarObject, QGraphicsItemGroup):
     def __init__(self, x=0, y=0, pad_aan="", pad_uit="", status=False,
                  breedte=100, hoogte=100, schaal=1.0, variabele="", naam=""):
         super().__init__()
@@ -19,6 +24,8 @@ class ScadaImageObject(QGraphicsItemGroup):
         self.hoogte = hoogte
         self.variabele = variabele  # Dit kan later een object zijn
         self.naam = naam
+        self._koppeling = Koppeling()
+        self._kwaliteit_goed = True
 
         # Afbeelding
         self.pixmap_item = QGraphicsPixmapItem()
@@ -38,13 +45,29 @@ class ScadaImageObject(QGraphicsItemGroup):
     def update_pixmap(self):
         pad = self.pad_aan if self.status else self.pad_uit
         if pad:
-            pixmap = QPixmap(pad).scaled(self.breedte, self.hoogte, Qt.KeepAspectRatio)
-            self.pixmap_item.setPixmap(pixmap)
+            self.pixmap_item.setPixmap(pixmap_cache.pixmap(pad, self.breedte, self.hoogte, Qt.KeepAspectRatio))
+
+    @staticmethod
+    def pixmap_sleutels(data):
+        """Cachesleutels van de afbeeldingen die een object uit `data` (to_dict) nodig heeft."""
+        breedte, hoogte = data.get("breedte", 100), data.get("hoogte", 100)
+        return [(pad, breedte, hoogte, Qt.KeepAspectRatio)
+                for pad in (data.get("pad_aan"), data.get("pad_uit")) if pad]
 
     def set_status(self, status: bool):
+        if status == self.status:
+            return  # zelfde beeld: geen pixmap opnieuw laden
         self.status = status
+        self.markeer_gewijzigd()
         self.update_pixmap()
 
+    def toon_kwaliteit(self, goed):
+        """Toont het beeld half doorzichtig bij een waarde met slechte kwaliteit."""
+        if goed == self._kwaliteit_goed:
+            return
+        self._kwaliteit_goed = goed
+        self.setOpacity(1.0 if goed else 0.4)
+
     def to_dict(self):
         return {
             "type": "scadaimageobject",
@@ -85,17 +108,24 @@ class ScadaImageObject(QGraphicsItemGroup):
         dialoog = InstellingenDialoog(self, project_context.variabelen_lijst)
         if dialoog.exec():
             dialoog.apply_changes()
+            self.koppeling_gewijzigd()
 
     def mousePressEvent(self, event):
         # Wissel status bij klikken
         self.set_status(not self.status)
 
 
+    def gekoppelde_variabele(self):
+        return self._koppeling.variabele(project_context.variabelen_lijst, self.variabele)
+
     def update_runtime(self):
-        for var in project_context.variabelen_lijst:
-            if var.naam == self.variabele:
-                self.status = bool(int(var.waarde))
-                self.set_status(self.status)
+        var = self.gekoppelde_variabele()
+        if var:
+            waarde = var.waarde
+            numeriek = isinstance(waarde, (int, float))
+            self.toon_kwaliteit(numeriek and var.is_goed)
+            if numeriek:
+                self.set_status(bool(int(waarde)))
 
 
 #   Instellingen dialoog klasse:
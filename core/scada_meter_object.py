@@ -3,10 +3,14 @@ from PySide6.QtGui import QColor
 from PySide6.QtCore import QPointF
 
 from core import project_context
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
 from core.installingen_dialoog import InstellingenDialoog
+from core.variabele_object import Koppeling
 
 
-class ScadaMeterObject(QGraphicsItemGroup):
+@canvas_type("scadameter")
+class ScadaMeterObject(RegistreerbaarObject, QGraphicsItemGroup):
     def __init__(self, x=0, y=0, breedte=100, hoogte=100,
                  variabele="", min_waarde=0, max_waarde=100, schaal=1.0, naam=""):
         super().__init__()
@@ -20,6 +24,8 @@ class ScadaMeterObject(QGraphicsItemGroup):
         self.schaal = schaal
         self.waarde = 0
         self.naam = naam
+        self._koppeling = Koppeling()
+        self._kwaliteit_goed = True
 
         # Achtergrond
         self.rect_item = QGraphicsRectItem(0, 0, breedte, hoogte)
@@ -44,6 +50,13 @@ class ScadaMeterObject(QGraphicsItemGroup):
         bar_hoogte = norm * self.hoogte
         self.bar_item.setRect(0, self.hoogte - bar_hoogte, self.breedte, bar_hoogte)
 
+    def toon_kwaliteit(self, goed):
+        """Toont de balk grijs bij een waarde met slechte kwaliteit (alleen bij een wissel)."""
+        if goed == self._kwaliteit_goed:
+            return
+        self._kwaliteit_goed = goed
+        self.bar_item.setBrush(QColor("green" if goed else "gray"))
+
     def to_dict(self):
         return {
             "type": "scadameter",
@@ -77,13 +90,21 @@ class ScadaMeterObject(QGraphicsItemGroup):
         dialoog = InstellingenDialoog(self, project_context.variabelen_lijst)
         if dialoog.exec():
             dialoog.apply_changes()
+            self.koppeling_gewijzigd()
+
+    def gekoppelde_variabele(self):
+        return self._koppeling.variabele(project_context.variabelen_lijst, self.variabele)
 
     def update_runtime(self):
         #if self._gebruikersinput:  # Dan geen update
         #    return
-        for var in project_context.variabelen_lijst:
-            if var.naam == self.variabele:
-                self.waarde = float(var.waarde)
+        var = self.gekoppelde_variabele()
+        if var:
+            waarde = var.waarde
+            numeriek = isinstance(waarde, (int, float))
+            self.toon_kwaliteit(numeriek and var.is_goed)
+            if numeriek:  # anders de laatste stand laten staan
+                self.waarde = float(waarde)
                 self.update_from_var(self.waarde)
 
 
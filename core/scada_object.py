@@ -1,12 +1,16 @@
 from PySide6.QtWidgets import QGraphicsItemGroup, QGraphicsPixmapItem, QGraphicsTextItem, QGraphicsItem, QDialog, \
     QFormLayout, QLineEdit, QSpinBox, QCheckBox, QDialogButtonBox, QComboBox
-from PySide6.QtGui import QPixmap, QFont, QColor, Qt
+from PySide6.QtGui import QFont, QColor, Qt
 from PySide6.QtCore import QPointF, QRectF
 
 from core import project_context
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
+from core.pixmap_cache import pixmap_cache
 
 
-class ScadaObject(QGraphicsItemGroup):
+@canvas_type("scadaobject")
+class ScadaObject(RegistreerbaarObject, QGraphicsItemGroup):
     def __init__(self, x=0, y=0, tekst="", kleur="black", lettertype="Arial", grootte=12,
                  pad_aan="", pad_uit="", status=False, breedte=100, hoogte=100, adres="",
                  variabele="knop", schaal=1):
@@ -52,11 +56,20 @@ class ScadaObject(QGraphicsItemGroup):
     def update_pixmap(self):
         path = self.pad_aan if self.status else self.pad_uit
         if path:
-            pixmap = QPixmap(path).scaled(self.breedte, self.hoogte)
-            self.pixmap_item.setPixmap(pixmap)
+            self.pixmap_item.setPixmap(pixmap_cache.pixmap(path, self.breedte, self.hoogte))
+
+    @staticmethod
+    def pixmap_sleutels(data):
+        """Cachesleutels van de afbeeldingen die een object uit `data` (to_dict) nodig heeft."""
+        breedte, hoogte = data.get("breedte", 100), data.get("hoogte", 100)
+        return [(pad, breedte, hoogte, Qt.IgnoreAspectRatio)
+                for pad in (data.get("pad_aan"), data.get("pad_uit")) if pad]
 
     def set_status(self, status: bool):
+        if status == self.status:
+            return  # zelfde beeld: geen pixmap opnieuw laden
         self.status = status
+        self.markeer_gewijzigd()
         self.update_pixmap()
 
     def to_dict(self):
@@ -80,7 +93,24 @@ class ScadaObject(QGraphicsItemGroup):
 
     @classmethod
     def from_dict(cls, data):
-        return cls(**data)
+        obj = cls(
+            x=float(data.get("x", 0)),
+            y=float(data.get("y", 0)),
+            tekst=data.get("tekst", ""),
+            kleur=data.get("kleur", "black"),
+            lettertype=data.get("lettertype", "Arial"),
+            grootte=data.get("grootte", 12),
+            pad_aan=data.get("pad_aan", ""),
+            pad_uit=data.get("pad_uit", ""),
+            status=data.get("status", False),
+            breedte=data.get("breedte", 100),
+            hoogte=data.get("hoogte", 100),
+            adres=data.get("adres", ""),
+            variabele=data.get("variabele", "knop"),
+            schaal=data.get("schaal", 1)
+        )
+        obj.setScale(obj.schaal)
+        return obj
 
     def wheelEvent(self, event):
         factor = 1.1 if event.delta() > 0 else 0.9
@@ -91,6 +121,7 @@ class ScadaObject(QGraphicsItemGroup):
         dialoog = InstellingenDialoog(self, project_context.variabelen_lijst)
         if dialoog.exec():
             dialoog.apply_changes()
+            self.koppeling_gewijzigd()
 
     def mousePressEvent(self, event):
         print("Knop state is:", self.status)
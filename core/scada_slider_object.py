@@ -3,10 +3,14 @@ from PySide6.QtGui import QColor
 from PySide6.QtCore import QPointF
 
 from core import project_context
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
 from core.installingen_dialoog import InstellingenDialoog
+from core.variabele_object import Koppeling
 
 
-class ScadaSliderObject(QGraphicsItemGroup):
+@canvas_type("scadaslider")
+class ScadaSliderObject(RegistreerbaarObject, QGraphicsItemGroup):
     def __init__(self, x=0, y=0, breedte=40, hoogte=150,
                  variabele="", min_waarde=0, max_waarde=100, schaal=1.0, naam=""):
         super().__init__()
@@ -20,6 +24,8 @@ class ScadaSliderObject(QGraphicsItemGroup):
         self.schaal = schaal
         self.waarde = min_waarde
         self.naam = naam
+        self._koppeling = Koppeling()
+        self._kwaliteit_goed = True
 
         # Achtergrond
         self.achtergrond = QGraphicsRectItem(0, 0, breedte, hoogte)
@@ -45,6 +51,13 @@ class ScadaSliderObject(QGraphicsItemGroup):
         y_pos = self.hoogte - verhouding * self.hoogte
         self.slider_knop.setRect(0, y_pos, self.breedte, 10)
 
+    def toon_kwaliteit(self, goed):
+        """Toont de knop grijs bij een waarde met slechte kwaliteit (alleen bij een wissel)."""
+        if goed == self._kwaliteit_goed:
+            return
+        self._kwaliteit_goed = goed
+        self.slider_knop.setBrush(QColor("blue" if goed else "gray"))
+
     def mousePressEvent(self, event):
         if project_context.running:
             self.update_slider(event.pos().y())
@@ -66,6 +79,7 @@ class ScadaSliderObject(QGraphicsItemGroup):
         dialoog = InstellingenDialoog(self, project_context.variabelen_lijst)
         if dialoog.exec():
             dialoog.apply_changes()
+            self.koppeling_gewijzigd()
 
     def to_dict(self):
         return {
@@ -96,10 +110,17 @@ class ScadaSliderObject(QGraphicsItemGroup):
         )
         return obj
 
+    def gekoppelde_variabele(self):
+        return self._koppeling.variabele(project_context.variabelen_lijst, self.variabele)
+
     def update_runtime(self):
-        for var in project_context.variabelen_lijst:
-            if var.naam == self.variabele:
-                self.waarde = float(var.waarde)
+        var = self.gekoppelde_variabele()
+        if var:
+            waarde = var.waarde
+            numeriek = isinstance(waarde, (int, float))
+            self.toon_kwaliteit(numeriek and var.is_goed)
+            if numeriek:
+                self.waarde = float(waarde)
                 self.set_waarde(self.waarde)
 
 
@@ -0,0 +1,302 @@
+from PySide6.QtWidgets import QGraphicsItem
+from PySide6.QtGui import QPixmap, QPainter, QPen, QColor, QPolygonF
+from PySide6.QtCore import QPointF, QRectF, QRect, Qt
+
+from core import project_context
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
+from core.historian import RingBuffer
+from core.variabele_object import Koppeling
+
+STANDAARD_KLEUREN = ["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b", "#e377c2", "#17becf"]
+MAX_PENNEN = 8
+ACHTERGROND = QColor("white")
+
+
+class TrendPen:
+    """Eén lijn in een trend: de gekoppelde variabele, haar kleur en een begrensde samplebuffer."""
+
+    def __init__(self, variabele="", kleur="#1f77b4", max_punten=10000):
+        self.variabele = variabele
+        self.kleur = kleur
+        self.buffer = RingBuffer(max_punten)
+        self.koppeling = Koppeling()
+        self.laatste_bron_tijd = 0.0
+        self.laatste_punt = None  # (x, y) van het laatst getekende punt in de pixmap
+
+    def to_dict(self):
+        return {"variabele": self.variabele, "kleur": self.kleur}
+
+
+@canvas_type("scadatrend")
+class ScadaTrendObject(RegistreerbaarObject, QGraphicsItem):
+    """
+    Lopende trend van één of meer variabelen.
+
+    De lijnen staan in een gecachete pixmap. Bij elke tik schuift die pixmap een
+    aantal pixels op en worden alleen de nieuwe samples in de vrijgekomen strook
+    getekend; de kosten per tik hangen dus niet af van het aantal punten in het
+    venster. Alleen bij een wijziging van grootte, venster of pennen wordt de
+    pixmap in één keer opnieuw uit de buffers opgebouwd.
+    """
+
+    def __init__(self, x=0, y=0, breedte=300, hoogte=150, pennen=None, venster_s=60.0,
+                 min_waarde=0, max_waarde=100, max_punten=10000, schaal=1.0, naam=""):
+        super().__init__()
+        self.x = x
+        self.y = y
+        self.breedte = breedte
+        self.hoogte = hoogte
+        self.venster_s = venster_s
+        self.min_waarde = min_waarde
+        self.max_waarde = max_waarde
+        self.max_punten = max_punten
+        self.schaal = schaal
+        self.naam = naam
+        self.pennen = []
+        self.zet_pennen(pennen or [])
+
+        self._pixmap = None
+        self._pixmap_tijd = None  # tijd die bij de rechterrand van de pixmap hoort
+
+        self.setPos(QPointF(x, y))
+        self.setScale(schaal)
+        self.setFlags(
+            QGraphicsItem.ItemIsMovable |
+            QGraphicsItem.ItemIsSelectable
+        )
+
+    # --- pennen en buffers ---
+
+    def zet_pennen(self, pennen):
+        """Stelt de pennen in vanuit een lijst van dicts ({"variabele", "kleur"})."""
+        self.pennen = [TrendPen(p.get("variabele", ""), p.get("kleur") or STANDAARD_KLEUREN[i % len(STANDAARD_KLEUREN)],
+                                self.max_punten)
+                       for i, p in enumerate(pennen[:MAX_PENNEN])]
+        self._pixmap = None
+
+    @property
+    def variabele(self):
+        """Naam van de eerste pen, voor code die één variabele per object verwacht."""
+        return self.pennen[0].variabele if self.pennen else ""
+
+    def gekoppelde_variabelen(self):
+        lijst = project_context.variabelen_lijst
+        return [pen.koppeling.variabele(lijst, pen.variabele) for pen in self.pennen]
+
+    def _neem_samples(self):
+        """Voegt per pen de sinds de vorige tik gelezen waarde toe; geeft de nieuwe samples terug."""
+        nieuw = []
+        for pen, var in zip(self.pennen, self.gekoppelde_variabelen()):
+            if var is None or not var.is_goed:
+                continue
+            bron_tijd = var.bron_tijd
+            waarde = var.waarde
+            if bron_tijd is None or bron_tijd <= pen.laatste_bron_tijd or not isinstance(waarde, (int, float)):
+                continue
+            pen.laatste_bron_tijd = bron_tijd
+            pen.buffer.voeg_toe(bron_tijd, waarde)
+            nieuw.append((pen, bron_tijd, float(waarde)))
+        return nieuw
+
+    # --- tekenen ---
+
+    def _x(self, tijd):
+        return self.breedte - (self._pixmap_tijd - tijd) * self.breedte / self.venster_s
+
+    def _y(self, waarde):
+        bereik = (self.max_waarde - self.min_waarde) or 1.0
+        norm = max(0.0, min(1.0, (waarde - self.min_waarde) / bereik))
+        return (1.0 - norm) * (self.hoogte - 1)
+
+    def _maak_pen(self, pen):
+        qpen = QPen(QColor(pen.kleur))
+        qpen.setWidthF(1.5)
+        return qpen
+
+    def herteken(self, nu):
+        """Bouwt de pixmap volledig opnieuw op uit de buffers (alleen bij wijzigingen)."""
+        self._pixmap = QPixmap(int(self.breedte), int(self.hoogte))
+        self._pixmap.fill(ACHTERGROND)
+        self._pixmap_tijd = nu
+        painter = QPainter(self._pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        for pen in self.pennen:
+            pen.laatste_punt = None
+            lijn = QPolygonF()
+            for tijden, waarden in pen.buffer.bereik(nu - self.venster_s, nu):
+                for tijd, waarde in zip(tijden, waarden):
+                    lijn.append(QPointF(self._x(tijd), self._y(waarde)))
+            if not lijn.isEmpty():
+                painter.setPen(self._maak_pen(pen))
+                painter.drawPolyline(lijn)
+                laatste = lijn.last()
+                pen.laatste_punt = (laatste.x(), laatste.y())
+        painter.end()
+
+    def tik(self, nu):
+        """Neemt nieuwe samples op en schuift de pixmap op tot `nu`; tekent alleen de nieuwe strook."""
+        nieuw = self._neem_samples()
+        if self._pixmap is None:
+            self.herteken(nu)
+            self.update()
+            return
+
+        px_per_s = self.breedte / self.venster_s
+        dx = int((nu - self._pixmap_tijd) * px_per_s)
+        if dx <= 0 and not nieuw:
+            return
+        if dx >= self.breedte:
+            self.herteken(nu)  # hele venster voorbij: niets om te hergebruiken
+            self.update()
+            return
+
+        if dx > 0:
+            # Pixel-uitgelijnd opschuiven; het restant blijft voor de volgende tik
+            self._pixmap_tijd += dx / px_per_s
+            self._pixmap.scroll(-dx, 0, self._pixmap.rect())
+            painter = QPainter(self._pixmap)
+            painter.fillRect(QRect(int(self.breedte) - dx, 0, dx, int(self.hoogte)), ACHTERGROND)
+            for pen in self.pennen:
+                if pen.laatste_punt is not None:
+                    pen.laatste_punt = (pen.laatste_punt[0] - dx, pen.laatste_punt[1])
+        else:
+            painter = QPainter(self._pixmap)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        for pen, tijd, waarde in nieuw:
+            punt = (min(self._x(tijd), self.breedte - 1), self._y(waarde))
+            if pen.laatste_punt is not None:
+                painter.setPen(self._maak_pen(pen))
+                painter.drawLine(QPointF(*pen.laatste_punt), QPointF(*punt))
+            pen.laatste_punt = punt
+        painter.end()
+        self.update()
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.breedte, self.hoogte)
+
+    def paint(self, painter, option, widget=None):
+        if self._pixmap is not None:
+            painter.drawPixmap(0, 0, self._pixmap)
+        else:
+            painter.fillRect(self.boundingRect(), ACHTERGROND)
+        painter.setPen(QPen(QColor("gray")))
+        painter.drawRect(self.boundingRect())
+        painter.drawText(QRectF(2, 0, self.breedte - 4, 14), Qt.AlignLeft, str(self.max_waarde))
+        painter.drawText(QRectF(2, self.hoogte - 14, self.breedte - 4, 14), Qt.AlignLeft, str(self.min_waarde))
+        if self.isSelected():
+            painter.setPen(QPen(QColor("blue"), 1, Qt.DashLine))
+            painter.drawRect(self.boundingRect())
+
+    # --- opslaan / laden ---
+
+    def to_dict(self):
+        return {
+            "type": "scadatrend",
+            "x": self.pos().x(),
+            "y": self.pos().y(),
+            "breedte": self.breedte,
+            "hoogte": self.hoogte,
+            "pennen": [pen.to_dict() for pen in self.pennen],
+            "venster_s": self.venster_s,
+            "min_waarde": self.min_waarde,
+            "max_waarde": self.max_waarde,
+            "max_punten": self.max_punten,
+            "schaal": self.scale(),
+            "naam": self.naam
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(
+            x=data.get("x", 0),
+            y=data.get("y", 0),
+            breedte=data.get("breedte", 300),
+            hoogte=data.get("hoogte", 150),
+            pennen=data.get("pennen", []),
+            venster_s=data.get("venster_s", 60.0),
+            min_waarde=data.get("min_waarde", 0),
+            max_waarde=data.get("max_waarde", 100),
+            max_punten=data.get("max_punten", 10000),
+            schaal=data.get("schaal", 1.0),
+            naam=data.get("naam", "")
+        )
+        return obj
+
+    def mouseDoubleClickEvent(self, event):
+        dialoog = InstellingenTrendDialoog(self, project_context.variabelen_lijst)
+        if dialoog.exec():
+            dialoog.apply_changes()
+            self.koppeling_gewijzigd()
+
+
+#   Instellingen trend dialoog klasse
+
+from PySide6.QtWidgets import (
+    QDialog, QFormLayout, QDialogButtonBox, QLineEdit, QSpinBox, QDoubleSpinBox, QComboBox, QHBoxLayout
+)
+
+
+class InstellingenTrendDialoog(QDialog):
+    def __init__(self, trend: "ScadaTrendObject", variabelen_lijst):
+        super().__init__()
+        self.setWindowTitle("Trend Instellingen")
+        self.trend = trend
+
+        layout = QFormLayout()
+
+        self.naam_edit = QLineEdit(trend.naam)
+        layout.addRow("Naam", self.naam_edit)
+
+        self.venster_spin = QDoubleSpinBox()
+        self.venster_spin.setRange(1, 86400)
+        self.venster_spin.setValue(trend.venster_s)
+        layout.addRow("Venster (s)", self.venster_spin)
+
+        self.min_spin = QDoubleSpinBox()
+        self.min_spin.setRange(-1e6, 1e6)
+        self.min_spin.setValue(trend.min_waarde)
+        layout.addRow("Min waarde", self.min_spin)
+
+        self.max_spin = QDoubleSpinBox()
+        self.max_spin.setRange(-1e6, 1e6)
+        self.max_spin.setValue(trend.max_waarde)
+        layout.addRow("Max waarde", self.max_spin)
+
+        self.punten_spin = QSpinBox()
+        self.punten_spin.setRange(100, 1000000)
+        self.punten_spin.setValue(trend.max_punten)
+        layout.addRow("Max punten per pen", self.punten_spin)
+
+        namen = [""] + [var.naam for var in variabelen_lijst]
+        self.pen_velden = []
+        for i in range(MAX_PENNEN):
+            pen = trend.pennen[i] if i < len(trend.pennen) else None
+            combo = QComboBox()
+            combo.addItems(namen)
+            kleur = QLineEdit(pen.kleur if pen else STANDAARD_KLEUREN[i])
+            if pen:
+                combo.setCurrentText(pen.variabele)
+            rij = QHBoxLayout()
+            rij.addWidget(combo)
+            rij.addWidget(kleur)
+            layout.addRow(f"Pen {i + 1}", rij)
+            self.pen_velden.append((combo, kleur))
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+
+        layout.addWidget(self.buttons)
+        self.setLayout(layout)
+
+    def apply_changes(self):
+        self.trend.naam = self.naam_edit.text()
+        self.trend.venster_s = self.venster_spin.value()
+        self.trend.min_waarde = self.min_spin.value()
+        self.trend.max_waarde = self.max_spin.value()
+        self.trend.max_punten = self.punten_spin.value()
+        self.trend.zet_pennen([{"variabele": combo.currentText(), "kleur": kleur.text()}
+                               for combo, kleur in self.pen_velden if combo.currentText()])
+        self.trend.update()
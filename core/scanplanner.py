@@ -0,0 +1,122 @@
+#   Scanklassen en deadline-planner voor de acquisitie
+
+import threading
+import time
+
+from core.communicatie import maak_leesplan, apparaten_uit_instellingen, STANDAARD_MAX_GAT
+
+# Periode per scanklasse in seconden; None = alleen op aanvraag
+SCANKLASSEN = {
+    "50ms": 0.05,
+    "100ms": 0.1,
+    "250ms": 0.25,
+    "1s": 1.0,
+    "10s": 10.0,
+    "op_aanvraag": None,
+}
+STANDAARD_SCANKLASSE = "100ms"
+
+
+def max_leeftijden(factor=3, minimum=1.0):
+    """Maximale leeftijd per scanklasse voordat een waarde als verouderd telt (zie controleer_verouderd)."""
+    return {klasse: max(factor * periode, minimum) for klasse, periode in SCANKLASSEN.items()
+            if periode is not None}
+
+
+class ScanStatistiek:
+    """Houdt per scanklasse bij hoe laat de scans starten ten opzichte van hun deadline."""
+
+    def __init__(self):
+        self.aantal = 0
+        self.overruns = 0  # aantal keer dat een hele periode gemist is
+        self.jitter_som = 0.0
+        self.jitter_max = 0.0
+
+    def registreer(self, te_laat, overrun):
+        self.aantal += 1
+        self.jitter_som += te_laat
+        self.jitter_max = max(self.jitter_max, te_laat)
+        if overrun:
+            self.overruns += 1
+
+    def to_dict(self):
+        return {
+            "aantal": self.aantal,
+            "overruns": self.overruns,
+            "jitter_gem_ms": 1000 * self.jitter_som / self.aantal if self.aantal else 0.0,
+            "jitter_max_ms": 1000 * self.jitter_max
+        }
+
+
+class ScanPlanner:
+    """
+    Plant per scanklasse de blokleesopdrachten op basis van monotone deadlines.
+
+    Elke scanklasse heeft een eigen leesplan en een volgende deadline. Bij elke
+    aanroep van `verschuldigde_blokken` komen alleen de blokken mee waarvan de
+    deadline verstreken is. Een klasse die een hele periode achterloopt telt als
+    overrun en slaat de gemiste scans over in plaats van ze in te halen.
+    """
+
+    def __init__(self, instellingen):
+        self.instellingen = instellingen
+        self._lock = threading.Lock()
+        self._plannen = {}  # scanklasse -> list[LeesBlok]
+        self._deadlines = {}  # scanklasse -> time.monotonic()-tijdstip
+        self._aanvraag = False
+        self.statistiek = {}  # scanklasse -> ScanStatistiek
+
+    def zet_variabelen(self, variabelen):
+        """Bouwt per scanklasse een leesplan; mag vanuit de GUI-thread worden aangeroepen."""
+        per_klasse = {}
+        for var in variabelen:
+            klasse = var.scanklasse if var.scanklasse in SCANKLASSEN else STANDAARD_SCANKLASSE
+            per_klasse.setdefault(klasse, []).append(var)
+
+        cfg = (self.instellingen or {}).get("leesplan", {})
+        apparaten = apparaten_uit_instellingen(self.instellingen)
+        plannen = {klasse: maak_leesplan(leden, apparaten, max_gat=cfg.get("max_gat", STANDAARD_MAX_GAT))
+                   for klasse, leden in per_klasse.items()}
+
+        nu = time.monotonic()
+        with self._lock:
+            self._plannen = plannen
+            # Bestaande deadlines blijven staan; nieuwe klassen zijn direct aan de beurt
+            self._deadlines = {klasse: self._deadlines.get(klasse, nu) for klasse in plannen
+                               if SCANKLASSEN[klasse] is not None}
+            for klasse in self._deadlines:
+                self.statistiek.setdefault(klasse, ScanStatistiek())
+
+    def vraag_aan(self):
+        """Laat de variabelen met scanklasse "op_aanvraag" bij de volgende cyclus één keer lezen."""
+        self._aanvraag = True
+
+    def verschuldigde_blokken(self, nu=None):
+        """Geeft de blokken terug waarvan de deadline verstreken is en schuift die deadlines op."""
+        nu = time.monotonic() if nu is None else nu
+        blokken = []
+        with self._lock:
+            for klasse, deadline in self._deadlines.items():
+                if deadline > nu:
+                    continue
+                periode = SCANKLASSEN[klasse]
+                volgende = deadline + periode
+                overrun = volgende <= nu
+                if overrun:
+                    volgende = nu + periode
+                self._deadlines[klasse] = volgende
+                self.statistiek[klasse].registreer(nu - deadline, overrun)
+                blokken.extend(self._plannen[klasse])
+
+            if self._aanvraag:
+                self._aanvraag = False
+                blokken.extend(self._plannen.get("op_aanvraag", []))
+        return blokken
+
+    def tijd_tot_volgende(self, nu=None):
+        """Seconden tot de eerstvolgende deadline (None als er geen periodieke klassen zijn)."""
+        nu = time.monotonic() if nu is None else nu
+        with self._lock:
+            if not self._deadlines:
+                return None
+            return max(0.0, min(self._deadlines.values()) - nu)
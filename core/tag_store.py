@@ -0,0 +1,109 @@
+#   Kolomsgewijze waardeopslag voor grote aantallen variabelen
+
+import time
+from array import array
+
+# Soort waarde per slot, zodat het origineel type bij het lezen terugkomt
+GEEN = 0
+BOOL = 1
+INT = 2
+FLOAT = 3
+OBJECT = 4  # tekst of andere niet-numerieke waarde, apart bewaard
+
+# Kwaliteitscodes
+KWALITEIT_GOED = 0
+KWALITEIT_SLECHT_COMM = 1  # laatste leesopdracht mislukt; de waarde is de laatst bekende
+KWALITEIT_VEROUDERD = 2  # al te lang geen nieuwe waarde ontvangen
+KWALITEIT_ONZEKER = 3  # nog nooit gelezen (bv. waarde uit het projectbestand)
+
+
+class TagStore:
+    """
+    Slaat de waarden van alle variabelen op in getypeerde arrays, geïndexeerd op tag-ID.
+
+    Per tag zijn er vaste kolommen voor waarde, brontijd (moment van de leesopdracht),
+    ontvangsttijd (moment van verwerking in de GUI), soort, kwaliteit en een
+    wijzigingsteller. Dat kost een paar tientallen bytes per tag in plaats van een
+    Python-object per waarde, en de garbage collector hoeft er niet doorheen.
+    Alleen niet-numerieke waarden (zoals tekst) staan in een aparte dict.
+    """
+
+    def __init__(self, capaciteit=256):
+        self.capaciteit = 0
+        self.waarden = array("d")
+        self.bron_tijden = array("d")
+        self.ontvangst_tijden = array("d")
+        self.soorten = array("B")
+        self.kwaliteit = array("B")
+        self.wijzigingen = array("L")
+        self.objecten = {}  # tag_id -> niet-numerieke waarde
+        self.zorg_voor(capaciteit - 1)
+
+    def zorg_voor(self, tag_id):
+        """Vergroot de kolommen (verdubbelen) zodat `tag_id` een geldige index is."""
+        if tag_id < self.capaciteit:
+            return
+        nieuw = max(tag_id + 1, 2 * self.capaciteit, 16)
+        extra = nieuw - self.capaciteit
+        self.waarden.extend(array("d", bytes(8 * extra)))
+        self.bron_tijden.extend(array("d", bytes(8 * extra)))
+        self.ontvangst_tijden.extend(array("d", bytes(8 * extra)))
+        self.soorten.extend(bytes(extra))
+        self.kwaliteit.extend(bytes(extra))
+        self.wijzigingen.extend(array("L", bytes(self.wijzigingen.itemsize * extra)))
+        self.capaciteit = nieuw
+
+    def lees(self, tag_id):
+        soort = self.soorten[tag_id]
+        if soort == FLOAT:
+            return self.waarden[tag_id]
+        if soort == INT:
+            return int(self.waarden[tag_id])
+        if soort == BOOL:
+            return self.waarden[tag_id] != 0.0
+        if soort == OBJECT:
+            return self.objecten[tag_id]
+        return None
+
+    def schrijf(self, tag_id, waarde, bron_tijd=None, ontvangst_tijd=None, kwaliteit=KWALITEIT_GOED):
+        """Schrijft een waarde met tijden en kwaliteit en hoogt de wijzigingsteller op."""
+        if self.soorten[tag_id] == OBJECT:
+            del self.objecten[tag_id]
+
+        if waarde is None:
+            soort = GEEN
+        elif isinstance(waarde, bool):
+            soort = BOOL
+        elif isinstance(waarde, int) and abs(waarde) < 2 ** 53:
+            soort = INT
+        elif isinstance(waarde, float):
+            soort = FLOAT
+        else:
+            soort = OBJECT
+
+        if soort == OBJECT:
+            self.objecten[tag_id] = waarde
+        elif soort != GEEN:
+            self.waarden[tag_id] = waarde
+        self.soorten[tag_id] = soort
+        nu = time.time()
+        self.bron_tijden[tag_id] = nu if bron_tijd is None else bron_tijd
+        self.ontvangst_tijden[tag_id] = nu if ontvangst_tijd is None else ontvangst_tijd
+        self.kwaliteit[tag_id] = kwaliteit
+        self.wijzigingen[tag_id] += 1
+
+    def zet_kwaliteit(self, tag_ids, kwaliteit, ontvangst_tijd=None):
+        """
+        Zet de kwaliteit van meerdere tags tegelijk; de waarden blijven staan.
+
+        Returns:
+            list[int]: De tag-ID's waarvan de kwaliteit echt veranderd is.
+        """
+        nu = time.time() if ontvangst_tijd is None else ontvangst_tijd
+        veranderd = []
+        for tag_id in tag_ids:
+            self.ontvangst_tijden[tag_id] = nu
+            if self.kwaliteit[tag_id] != kwaliteit:
+                self.kwaliteit[tag_id] = kwaliteit
+                veranderd.append(tag_id)
+        return veranderd
@@ -2,6 +2,9 @@ from PySide6.QtGui import QColor, QFont, QPixmap
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QDialogButtonBox, QPushButton, QColorDialog, \
     QGraphicsTextItem, QGraphicsPixmapItem
 
+from core.runtime_register import RegistreerbaarObject
+from core.object_fabriek import canvas_type
+
 
 class EenvoudigeTekstDialoog(QDialog):
     def __init__(self, starttekst="", parent=None):
@@ -33,7 +36,8 @@ class EenvoudigeTekstDialoog(QDialog):
             self.kleur = gekozen
 
 
-class TekstObject(QGraphicsTextItem):
+@canvas_type("tekst")
+class TekstObject(RegistreerbaarObject, QGraphicsTextItem):
     def __init__(self, tekst):
         super().__init__(tekst)
         self.setFlags(
@@ -43,6 +47,8 @@ class TekstObject(QGraphicsTextItem):
         )
         self.setAcceptHoverEvents(True)
         self.setAcceptDrops(True)
+        # Tekstopmaak is duur: tekenen vanuit een cache tot de tekst wijzigt
+        self.setCacheMode(QGraphicsTextItem.DeviceCoordinateCache)
 
     def wheelEvent(self, event):
         delta = event.delta()
@@ -57,6 +63,7 @@ class TekstObject(QGraphicsTextItem):
         nieuwe_font = QFont(huidige_font)
         nieuwe_font.setPointSize(grootte)
         self.setFont(nieuwe_font)
+        self.markeer_gewijzigd()
 
     def mouseDoubleClickEvent(self, event):
         dialoog = EenvoudigeTekstDialoog(self.toPlainText())
@@ -65,6 +72,7 @@ class TekstObject(QGraphicsTextItem):
             self.setPlainText(nieuwe_tekst)
             nieuwe_kleur = dialoog.kleur
             self.setDefaultTextColor(nieuwe_kleur)
+            self.markeer_gewijzigd()
 
     def to_dict(self):
         return {
@@ -79,4 +87,8 @@ class TekstObject(QGraphicsTextItem):
 
     @classmethod
     def from_dict(cls, data):
-        return cls(**data)
+        obj = cls(str(data.get("tekst", "")))
+        obj.setPos(data.get("x", 0), data.get("y", 0))
+        obj.setFont(QFont(data.get("lettertype", "Arial"), data.get("grootte", 16)))
+        obj.setDefaultTextColor(QColor(data.get("kleur", "blue")))
+        return obj
@@ -1,13 +1,118 @@
+import time
 from functools import partial
 
+from core.invoer import lees_getal
+from core.tag_store import TagStore, KWALITEIT_GOED, KWALITEIT_SLECHT_COMM, KWALITEIT_VEROUDERD, \
+    KWALITEIT_ONZEKER
+
 
 class Variabele:
-    def __init__(self, naam, type, adres, waarde, beschrijving=""):
-        self.naam = naam  # Unieke naam van de variabele
+    """
+    Eén variabele (tag).
+
+    Zolang de variabele in een VariabelenLijst staat, is ze een dunne view: de
+    waarde staat in de TagStore van die lijst op index `tag_id`. Een losse
+    variabele (nog niet toegevoegd) bewaart haar waarde zelf.
+    """
+    __slots__ = ("_lijst", "tag_id", "_naam", "type", "adres", "_losse_waarde", "beschrijving",
+                 "apparaat", "unit_id", "scanklasse", "deadband")
+
+    def __init__(self, naam, type, adres, waarde, beschrijving="", apparaat="", unit_id=None,
+                 scanklasse="100ms", deadband=0.0):
+        self._lijst = None  # VariabelenLijst waar deze variabele in staat (voor de naamindex)
+        self.tag_id = None  # Stabiel geheel getal, toegekend door de VariabelenLijst
+        self._losse_waarde = None
+        self._naam = naam  # Unieke naam van de variabele
         self.type = type  # "bit", "int", "float", "string", ...
         self.adres = adres  # Bijv. "HR0", "%QX0.0", enz.
         self.waarde = waarde
         self.beschrijving = beschrijving  # Optioneel
+        self.apparaat = apparaat  # Naam uit de apparatentabel; leeg = eerste apparaat
+        self.unit_id = unit_id  # None = unit ID van het apparaat
+        self.scanklasse = scanklasse  # "50ms", "250ms", "1s", "10s", "op_aanvraag", ...
+        self.deadband = deadband  # Minimale verandering voordat een analoge waarde als gewijzigd telt
+
+    @property
+    def naam(self):
+        return self._naam
+
+    @naam.setter
+    def naam(self, nieuwe_naam):
+        oude_naam = self._naam
+        self._naam = nieuwe_naam
+        if self._lijst is not None and nieuwe_naam != oude_naam:
+            self._lijst._hernoemd(self, oude_naam)
+
+    @property
+    def waarde(self):
+        if self._lijst is None:
+            return self._losse_waarde
+        return self._lijst.store.lees(self.tag_id)
+
+    @waarde.setter
+    def waarde(self, waarde):
+        if self._lijst is None:
+            self._losse_waarde = waarde
+        else:
+            self._lijst.store.schrijf(self.tag_id, waarde)
+
+    @property
+    def kwaliteit(self):
+        """Kwaliteitscode uit core.tag_store (KWALITEIT_GOED, KWALITEIT_SLECHT_COMM, ...)."""
+        if self._lijst is None:
+            return KWALITEIT_ONZEKER
+        return self._lijst.store.kwaliteit[self.tag_id]
+
+    @property
+    def is_goed(self):
+        return self.kwaliteit == KWALITEIT_GOED
+
+    @property
+    def bron_tijd(self):
+        """Tijdstip (time.time()) waarop de waarde bij het apparaat gelezen is."""
+        if self._lijst is None:
+            return None
+        return self._lijst.store.bron_tijden[self.tag_id]
+
+    @property
+    def ontvangst_tijd(self):
+        """Tijdstip (time.time()) waarop de waarde in de GUI verwerkt is."""
+        if self._lijst is None:
+            return None
+        return self._lijst.store.ontvangst_tijden[self.tag_id]
+
+    def zet_waarde(self, waarde, bron_tijd=None, ontvangst_tijd=None):
+        """
+        Zet een nieuw gelezen (goede) waarde en geeft True als die als gewijzigd telt.
+
+        Bij een deadband > 0 worden kleine schommelingen van numerieke waarden
+        genegeerd: de variabele houdt dan de laatst doorgegeven waarde. De tijden
+        worden wel altijd bijgewerkt, zodat de waarde niet als verouderd telt.
+        Een variabele die niet goed was, telt altijd als gewijzigd.
+        """
+        if self._lijst is None:
+            oud_goed = False
+            oud = self._losse_waarde
+        else:
+            store = self._lijst.store
+            oud_goed = store.kwaliteit[self.tag_id] == KWALITEIT_GOED
+            oud = store.lees(self.tag_id)
+
+        if oud_goed:
+            gelijk = waarde == oud or (
+                self.deadband and isinstance(waarde, (int, float)) and isinstance(oud, (int, float))
+                and abs(waarde - oud) < self.deadband)
+            if gelijk:
+                nu = time.time()
+                store.bron_tijden[self.tag_id] = nu if bron_tijd is None else bron_tijd
+                store.ontvangst_tijden[self.tag_id] = nu if ontvangst_tijd is None else ontvangst_tijd
+                return False
+
+        if self._lijst is None:
+            self._losse_waarde = waarde
+        else:
+            store.schrijf(self.tag_id, waarde, bron_tijd, ontvangst_tijd)
+        return True
 
     def to_dict(self):
         return {
@@ -15,7 +120,11 @@ class Variabele:
             "type": self.type,
             "adres": self.adres,
             "waarde": self.waarde,
-            "beschrijving": self.beschrijving
+            "beschrijving": self.beschrijving,
+            "apparaat": self.apparaat,
+            "unit_id": self.unit_id,
+            "scanklasse": self.scanklasse,
+            "deadband": self.deadband
         }
 
     @classmethod
@@ -25,7 +134,11 @@ class Variabele:
             type=data["type"],
             adres=data["adres"],
             waarde=data["waarde"],
-            beschrijving=data.get("beschrijving", "")
+            beschrijving=data.get("beschrijving", ""),
+            apparaat=data.get("apparaat", ""),
+            unit_id=lees_getal(data, "unit_id", int),
+            scanklasse=data.get("scanklasse") or "100ms",
+            deadband=lees_getal(data, "deadband", float, 0.0)
         )
 
 
@@ -194,9 +307,211 @@ class VariabeleBewerkenDialoog(QDialog):
 # Variabelen lijst klasse
 
 class VariabelenLijst(list):
+    """
+    Lijst van variabelen met een naamindex en stabiele tag-ID's.
+
+    Elke variabele krijgt bij het toevoegen een geheel getal als tag-ID; onder dat
+    ID staat haar waarde in de kolomsgewijze TagStore van de lijst. Een naam
+    houdt binnen een sessie hetzelfde ID, ook als de variabele wordt verwijderd en
+    opnieuw toegevoegd (zoals de tabeldialoog doet). De index naam -> variabele en
+    ID -> variabele blijft bij toevoegen, hernoemen en verwijderen bijgewerkt.
+    `versie` loopt op bij elke structurele wijziging, zodat gekoppelde widgets
+    weten wanneer ze hun koppeling opnieuw moeten opzoeken.
+    """
+
+    def __init__(self, *args):
+        super().__init__()
+        self.store = TagStore()  # waarden van alle variabelen, geïndexeerd op tag-ID
+        self._per_naam = {}  # naam -> variabele
+        self._per_id = [None]  # tag_id -> variabele (index 0 wordt niet gebruikt)
+        self._vrije_ids = {}  # naam -> tag_id van verwijderde variabelen, voor hergebruik
+        self._volgende_id = 1
+        self.versie = 0
+        self.gewijzigd = set()  # tag-ID's van variabelen die sinds de laatste runtime-update veranderd zijn
+        if args:
+            self.extend(*args)
+
+    # --- index bijhouden ---
+
+    def _registreer(self, var):
+        tag_id = self._vrije_ids.pop(var.naam, None)
+        if tag_id is None or self._per_id[tag_id] is not None:
+            tag_id = self._volgende_id
+            self._volgende_id += 1
+            self._per_id.append(None)
+        var.tag_id = tag_id
+        self.store.zorg_voor(tag_id)
+        # Een waarde uit het project of de dialoog is (nog) niet gelezen
+        self.store.schrijf(tag_id, var._losse_waarde, kwaliteit=KWALITEIT_ONZEKER)
+        var._lijst = self
+        self._per_id[tag_id] = var
+        self._per_naam.setdefault(var.naam, var)
+        self.versie += 1
+
+    def _maak_los(self, var):
+        var._losse_waarde = self.store.lees(var.tag_id)
+        var._lijst = None
+        self._per_id[var.tag_id] = None
+        self._vrije_ids[var.naam] = var.tag_id
+
+    def _afmelden(self, var):
+        self._maak_los(var)
+        if self._per_naam.get(var.naam) is var:
+            del self._per_naam[var.naam]
+            # Bij dubbele namen neemt de volgende variabele met die naam het over
+            vervanger = next((v for v in self if v.naam == var.naam and v is not var), None)
+            if vervanger is not None:
+                self._per_naam[var.naam] = vervanger
+        self.versie += 1
+
+    def _hernoemd(self, var, oude_naam):
+        if self._per_naam.get(oude_naam) is var:
+            del self._per_naam[oude_naam]
+        self._per_naam.setdefault(var.naam, var)
+        self.versie += 1
+
+    def _herindexeer(self, oude_leden):
+        for var in oude_leden:
+            self._maak_los(var)
+        self._per_naam.clear()
+        for var in self:
+            self._registreer(var)
+
+    # --- list-methodes die de index bijwerken ---
+
+    def append(self, var):
+        super().append(var)
+        self._registreer(var)
+
+    def insert(self, index, var):
+        super().insert(index, var)
+        self._registreer(var)
+
+    def extend(self, variabelen):
+        for var in variabelen:
+            self.append(var)
+
+    def __iadd__(self, variabelen):
+        self.extend(variabelen)
+        return self
+
+    def remove(self, var):
+        super().remove(var)
+        self._afmelden(var)
+
+    def pop(self, index=-1):
+        var = super().pop(index)
+        self._afmelden(var)
+        return var
+
+    def clear(self):
+        for var in self:
+            self._maak_los(var)
+        super().clear()
+        self._per_naam.clear()
+        self.versie += 1
+
+    def __setitem__(self, index, waarde):
+        if isinstance(index, slice):
+            oude_leden = list(self)
+            super().__setitem__(index, waarde)
+            self._herindexeer(oude_leden)
+            return
+        oud = self[index]
+        super().__setitem__(index, waarde)
+        self._afmelden(oud)
+        self._registreer(waarde)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            oude_leden = list(self)
+            super().__delitem__(index)
+            self._herindexeer(oude_leden)
+            return
+        var = self[index]
+        super().__delitem__(index)
+        self._afmelden(var)
+
+    # --- opzoeken ---
+
+    def zoek(self, naam):
+        """Variabele met deze naam, of None (O(1))."""
+        return self._per_naam.get(naam)
+
+    def zoek_id(self, tag_id):
+        """Variabele met dit tag-ID, of None (O(1))."""
+        return self._per_id[tag_id] if 0 < tag_id < len(self._per_id) else None
+
+    def zet_waarden(self, batch):
+        """
+        Verwerkt een batch blokresultaten en houdt de gewijzigde tag-ID's bij.
+
+        De batch bestaat uit (koppelingen, data, bron_tijd)-tupels, één per gelezen
+        blok (zie LeesBlok). Bij data None is het blok niet gelezen: de variabelen
+        houden hun laatste waarde en krijgen in één keer kwaliteit "slecht (comm)".
+        """
+        ontvangst_tijd = time.time()
+        for koppelingen, data, bron_tijd in batch:
+            if data is None:
+                ids = [var.tag_id for _, var in koppelingen if var._lijst is self]
+                self.gewijzigd.update(self.store.zet_kwaliteit(ids, KWALITEIT_SLECHT_COMM, ontvangst_tijd))
+                continue
+            for offset, var in koppelingen:
+                if var.zet_waarde(data[offset], bron_tijd, ontvangst_tijd) and var._lijst is self:
+                    self.gewijzigd.add(var.tag_id)
+
+    def controleer_verouderd(self, max_leeftijd, nu=None):
+        """
+        Markeert goede waarden die te lang niet vernieuwd zijn als verouderd.
+
+        Args:
+            max_leeftijd (dict): scanklasse -> maximale leeftijd in seconden; klassen
+                die ontbreken (of None zijn) worden niet gecontroleerd.
+        """
+        nu = time.time() if nu is None else nu
+        store = self.store
+        verouderd = []
+        for var in self:
+            grens = max_leeftijd.get(var.scanklasse)
+            if (grens is not None and store.kwaliteit[var.tag_id] == KWALITEIT_GOED
+                    and nu - store.bron_tijden[var.tag_id] > grens):
+                verouderd.append(var.tag_id)
+        self.gewijzigd.update(self.store.zet_kwaliteit(verouderd, KWALITEIT_VEROUDERD, nu))
+
+    def markeer_alles_gewijzigd(self):
+        self.gewijzigd.update(var.tag_id for var in self)
+
+    def neem_gewijzigd(self):
+        """Geeft de gewijzigde tag-ID's terug en begint een nieuwe (lege) set."""
+        gewijzigd, self.gewijzigd = self.gewijzigd, set()
+        return gewijzigd
+
     def to_list(self):
         return [v.to_dict() for v in self]
 
     @classmethod
     def from_list(cls, data_list):
         return cls([Variabele.from_dict(data) for data in data_list])
+
+
+class Koppeling:
+    """
+    Onthoudt aan welke variabele een widget gekoppeld is.
+
+    Er wordt alleen opnieuw gezocht als de lijst, de naam of de versie van de
+    lijst veranderd is; per runtime-tick kost het opvragen dus O(1).
+    """
+
+    def __init__(self):
+        self._lijst = None
+        self._versie = -1
+        self._naam = None
+        self._var = None
+
+    def variabele(self, lijst, naam):
+        if lijst is not self._lijst or naam != self._naam or (lijst is not None and lijst.versie != self._versie):
+            self._lijst = lijst
+            self._naam = naam
+            self._versie = lijst.versie if lijst is not None else -1
+            self._var = lijst.zoek(naam) if lijst is not None else None
+        return self._var
@@ -0,0 +1,259 @@
+#   Gecomprimeerde blokken voor de historian (Gorilla-achtig)
+
+import struct
+
+# Kop van een blok: soort, aantal samples, eerste tijd, laatste tijd, lengte tijdstroom
+BLOK_KOP = struct.Struct("<BIddI")
+SOORT_FLOAT = 0  # waarden XOR-gecodeerd
+SOORT_BITS = 1  # waarden 0/1, run-length gecodeerd
+STANDAARD_RESOLUTIE = 1000  # tijdstappen per seconde (1 ms)
+
+_DOUBLE = struct.Struct("<d")
+_QWORD = struct.Struct("<Q")
+
+# Delta-of-delta-klassen: (prefix, aantal prefixbits, aantal databits)
+_DOD_KLASSEN = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+)
+
+
+def _float_bits(waarde):
+    return _QWORD.unpack(_DOUBLE.pack(waarde))[0]
+
+
+def _bits_float(bits):
+    return _DOUBLE.unpack(_QWORD.pack(bits))[0]
+
+
+class BitSchrijver:
+    """Schrijft losse bits en bitvelden achter elkaar in een bytearray."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._acc = 0
+        self._n = 0  # aantal bits in _acc
+
+    def schrijf(self, waarde, aantal):
+        self._acc = (self._acc << aantal) | (waarde & ((1 << aantal) - 1))
+        self._n += aantal
+        while self._n >= 8:
+            self._n -= 8
+            self.data.append((self._acc >> self._n) & 0xFF)
+        self._acc &= (1 << self._n) - 1
+
+    def bytes(self):
+        """De geschreven bits, aangevuld tot een hele byte."""
+        if self._n:
+            return bytes(self.data) + bytes([(self._acc << (8 - self._n)) & 0xFF])
+        return bytes(self.data)
+
+
+class BitLezer:
+    def __init__(self, data, begin=0, einde=None):
+        self.data = data
+        self.positie = begin * 8  # in bits
+        self.einde = (len(data) if einde is None else einde) * 8
+
+    def lees(self, aantal):
+        waarde = 0
+        data = self.data
+        positie = self.positie
+        while aantal:
+            byte = data[positie >> 3]
+            vrij = 8 - (positie & 7)
+            neem = min(vrij, aantal)
+            waarde = (waarde << neem) | ((byte >> (vrij - neem)) & ((1 << neem) - 1))
+            positie += neem
+            aantal -= neem
+        self.positie = positie
+        return waarde
+
+    def lees_bit(self):
+        positie = self.positie
+        self.positie = positie + 1
+        return (self.data[positie >> 3] >> (7 - (positie & 7))) & 1
+
+
+def _schrijf_varint(schrijver, waarde):
+    # 7 bits per groep, hoogste bit = er volgt nog een groep
+    while waarde >= 0x80:
+        schrijver.schrijf(0x80 | (waarde & 0x7F), 8)
+        waarde >>= 7
+    schrijver.schrijf(waarde, 8)
+
+
+def _lees_varint(lezer):
+    waarde = schuif = 0
+    while True:
+        byte = lezer.lees(8)
+        waarde |= (byte & 0x7F) << schuif
+        if byte < 0x80:
+            return waarde
+        schuif += 7
+
+
+class BlokEncoder:
+    """
+    Codeert een reeks (tijd, waarde)-samples stap voor stap tot één blok.
+
+    Tijden worden afgerond op 1/`resolutie` seconde en als delta-of-delta
+    opgeslagen: bij een vaste scanperiode kost een sample dan één bit. Waarden
+    worden XOR'd met de vorige (een gelijke waarde kost één bit) of, bij
+    `bits=True`, als runs van gelijke bits opgeslagen. Waarden zijn verliesvrij.
+    """
+
+    def __init__(self, bits=False, resolutie=STANDAARD_RESOLUTIE):
+        self.bits = bits
+        self.resolutie = resolutie
+        self.aantal = 0
+        self.eerste_tijd = 0.0
+        self.laatste_tijd = 0.0
+        self._tijden = BitSchrijver()
+        self._waarden = BitSchrijver()
+        self._vorige_t = 0
+        self._vorige_delta = 0
+        self._vorige_bits = 0
+        self._voorloop = -1  # huidig venster van de XOR-codering (voorloopnullen, lengte)
+        self._lengte = 0
+        self._run_bit = 0
+        self._run = 0
+
+    def voeg_toe(self, tijd, waarde):
+        t = round(tijd * self.resolutie)
+        if self.aantal == 0:
+            self.eerste_tijd = tijd
+            self._tijden.schrijf(t, 64)
+        else:
+            delta = t - self._vorige_t
+            self._schrijf_dod(delta - self._vorige_delta)
+            self._vorige_delta = delta
+        self._vorige_t = t
+        self.laatste_tijd = tijd
+
+        if self.bits:
+            self._voeg_bit_toe(1 if waarde else 0)
+        else:
+            self._voeg_float_toe(float(waarde))
+        self.aantal += 1
+
+    def _schrijf_dod(self, dod):
+        schrijver = self._tijden
+        if dod == 0:
+            schrijver.schrijf(0, 1)
+            return
+        for prefix, prefix_bits, data_bits in _DOD_KLASSEN:
+            grens = 1 << (data_bits - 1)
+            if -grens < dod <= grens:
+                schrijver.schrijf(prefix, prefix_bits)
+                schrijver.schrijf(dod + grens - 1, data_bits)
+                return
+        schrijver.schrijf(0b1111, 4)
+        schrijver.schrijf(dod, 64)
+
+    def _voeg_float_toe(self, waarde):
+        bits = _float_bits(waarde)
+        schrijver = self._waarden
+        if self.aantal == 0:
+            schrijver.schrijf(bits, 64)
+            self._vorige_bits = bits
+            return
+
+        xor = bits ^ self._vorige_bits
+        self._vorige_bits = bits
+        if xor == 0:
+            schrijver.schrijf(0, 1)
+            return
+        voorloop = min(64 - xor.bit_length(), 31)
+        naloop = (xor & -xor).bit_length() - 1
+        if (self._voorloop >= 0 and voorloop >= self._voorloop
+                and naloop >= 64 - self._voorloop - self._lengte):
+            # Past in het vorige venster: alleen de betekenisvolle bits
+            schrijver.schrijf(0b10, 2)
+            schrijver.schrijf(xor >> (64 - self._voorloop - self._lengte), self._lengte)
+            return
+        lengte = 64 - voorloop - naloop
+        self._voorloop, self._lengte = voorloop, lengte
+        schrijver.schrijf(0b11, 2)
+        schrijver.schrijf(voorloop, 5)
+        schrijver.schrijf(lengte & 63, 6)  # 64 wordt als 0 opgeslagen
+        schrijver.schrijf(xor >> naloop, lengte)
+
+    def _voeg_bit_toe(self, bit):
+        if self.aantal == 0:
+            self._waarden.schrijf(bit, 1)
+        elif bit != self._run_bit:
+            _schrijf_varint(self._waarden, self._run)
+            self._run = 0
+        self._run_bit = bit
+        self._run += 1
+
+    def bytes(self):
+        """Sluit het blok af en geeft het als bytes terug."""
+        waarden = self._waarden
+        if self.bits and self.aantal:
+            rest = BitSchrijver()
+            rest.data = bytearray(waarden.data)
+            rest._acc, rest._n = waarden._acc, waarden._n
+            _schrijf_varint(rest, self._run)
+            waarden = rest
+        tijden = self._tijden.bytes()
+        kop = BLOK_KOP.pack(SOORT_BITS if self.bits else SOORT_FLOAT, self.aantal,
+                            self.eerste_tijd, self.laatste_tijd, len(tijden))
+        return kop + tijden + waarden.bytes()
+
+
+def blok_kop(data):
+    """(soort, aantal, eerste_tijd, laatste_tijd) van een blok, zonder het te decoderen."""
+    return BLOK_KOP.unpack_from(data)[:4]
+
+
+def decodeer_blok(data, resolutie=STANDAARD_RESOLUTIE):
+    """Decodeert een blok stap voor stap; levert (tijd, waarde)-paren op."""
+    soort, aantal, _, _, tijd_lengte = BLOK_KOP.unpack_from(data)
+    begin = BLOK_KOP.size
+    tijden = BitLezer(data, begin, begin + tijd_lengte)
+    waarden = BitLezer(data, begin + tijd_lengte)
+
+    t = delta = 0
+    vorige_bits = voorloop = lengte = 0
+    run_bit = run = 0
+    for i in range(aantal):
+        if i == 0:
+            t = tijden.lees(64)
+            if t >= 1 << 63:
+                t -= 1 << 64
+        else:
+            delta += _lees_dod(tijden)
+            t += delta
+
+        if soort == SOORT_BITS:
+            if i == 0:
+                run_bit = waarden.lees_bit()
+                run = _lees_varint(waarden)
+            elif run == 0:
+                run_bit ^= 1
+                run = _lees_varint(waarden)
+            run -= 1
+            waarde = float(run_bit)
+        else:
+            if i == 0:
+                vorige_bits = waarden.lees(64)
+            elif waarden.lees_bit():
+                if waarden.lees_bit():
+                    voorloop = waarden.lees(5)
+                    lengte = waarden.lees(6) or 64
+                vorige_bits ^= waarden.lees(lengte) << (64 - voorloop - lengte)
+            waarde = _bits_float(vorige_bits)
+        yield t / resolutie, waarde
+
+
+def _lees_dod(lezer):
+    if not lezer.lees_bit():
+        return 0
+    for _, prefix_bits, data_bits in _DOD_KLASSEN:
+        if not lezer.lees_bit():
+            return lezer.lees(data_bits) - (1 << (data_bits - 1)) + 1
+    dod = lezer.lees(64)
+    return dod - (1 << 64) if dod >= 1 << 63 else dod
@@ -0,0 +1,328 @@
+#   Historian op schijf: append-only chunkbestanden met vaste records
+
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+
+from project.historian_codec import STANDAARD_RESOLUTIE, BlokEncoder, blok_kop, decodeer_blok
+
+# Eén record: tijd (float64), waarde (float64)
+RECORD = struct.Struct("<dd")
+STANDAARD_PARTITIE = 3600  # seconden per chunkbestand
+STANDAARD_FLUSH_INTERVAL = 1.0  # seconden
+MAX_BUFFER = 50000  # samples; bij meer wordt eerder weggeschreven
+
+
+def historie_map(project_pad):
+    """Map met de historie van een project: naast het projectbestand, met "_historie" erachter."""
+    return os.path.splitext(project_pad)[0] + "_historie"
+
+
+class HistorianOpslag:
+    """
+    Duurzame, append-only opslag van gelezen waarden.
+
+    Per tag is de tijdlijn opgedeeld in partities van `partitie` seconden; elke
+    partitie is één chunkbestand met records van vaste lengte (zie RECORD), in
+    een eigen map per tag. De GUI-thread zet samples alleen in een wachtrij
+    (`verwerk`); een achtergrondthread sorteert ze per flush op tijd en schrijft
+    ze per chunk in één keer weg, zodat de scan nooit op de schijf wacht.
+
+    Lezen gaat via mmap. Omdat de records vast zijn en binnen een chunk op tijd
+    oplopen, is de chunk zelf de tijdindex: begin en einde van een bereik worden
+    binair gezocht en dat stuk wordt in één keer gekopieerd. Chunks buiten het
+    bereik worden op naam overgeslagen. Komt er toch een sample vóór het laatst
+    geschreven record binnen (klok teruggezet), dan zet de schrijfthread eerst een
+    markeerbestand (".ongesorteerd") naast de chunk; die chunk wordt dan lineair
+    gelezen tot ze gecomprimeerd is.
+
+    Zodra een partitie voorbij is, zet de schrijfthread haar chunks om naar een
+    gecomprimeerd blok (zie historian_codec, extensie ".blok"). Alleen de lopende
+    partitie staat dus nog als vaste records op schijf. Late samples voor een al
+    gecomprimeerde partitie gaan direct het blok in; een chunk naast een blok is
+    daarom een restant van een onderbroken compressie en wordt bij het lezen
+    genegeerd.
+
+    Een fout bij het schrijven of comprimeren stopt de schrijfthread niet: de
+    flush wordt overgeslagen, de fout geprint en geteld (`fouten`, `laatste_fout`),
+    zodat de GUI haar kan tonen.
+
+    Tag-nummers zijn eigen nummers van de opslag (bewaard in tags.json), zodat ze
+    ook over sessies heen bij dezelfde variabelenaam horen.
+    """
+
+    def __init__(self, map_pad, partitie=STANDAARD_PARTITIE, flush_interval=STANDAARD_FLUSH_INTERVAL,
+                 comprimeren=True):
+        self.map_pad = map_pad
+        self.partitie = partitie
+        self.flush_interval = flush_interval
+        self.comprimeren = comprimeren
+        self._huidige_partitie = None
+        self._laatste_tijd = {}  # (tag-nummer, partitie) -> laatst geschreven tijd, None = al een blok
+        self.fouten = 0  # aantal mislukte flushes/compressies sinds de start
+        self.laatste_fout = None
+        os.makedirs(map_pad, exist_ok=True)
+
+        self._tags_pad = os.path.join(map_pad, "tags.json")
+        self.tags = {}  # variabelenaam -> tag-nummer
+        if os.path.exists(self._tags_pad):
+            with open(self._tags_pad, "r", encoding="utf-8") as f:
+                self.tags = json.load(f)
+
+        self._wachtrij = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._schrijf_lus, name="historian-opslag", daemon=True)
+        self._thread.start()
+
+    # --- schrijven ---
+
+    def tag_nummer(self, naam):
+        nummer = self.tags.get(naam)
+        if nummer is None:
+            nummer = self.tags[naam] = len(self.tags) + 1
+            with open(self._tags_pad, "w", encoding="utf-8") as f:
+                json.dump(self.tags, f, indent=4)
+        return nummer
+
+    def verwerk(self, batch):
+        """Zet de goed gelezen waarden uit een batch blokresultaten in de schrijfwachtrij."""
+        samples = []
+        for koppelingen, data, bron_tijd in batch:
+            if data is None:
+                continue
+            for offset, var in koppelingen:
+                waarde = data[offset]
+                if isinstance(waarde, (int, float)):
+                    samples.append((bron_tijd, self.tag_nummer(var.naam), waarde))
+        if samples:
+            self._wachtrij.put(samples)
+
+    def _schrijf_lus(self):
+        buffer = []
+        volgende_flush = time.monotonic() + self.flush_interval
+        while not self._stop.is_set() or not self._wachtrij.empty():
+            try:
+                buffer.extend(self._wachtrij.get(timeout=max(0.0, volgende_flush - time.monotonic())))
+                if len(buffer) < MAX_BUFFER and time.monotonic() < volgende_flush:
+                    continue  # verzamelen tot het flushinterval om is of de buffer vol
+            except queue.Empty:
+                pass
+            if buffer:
+                self._flush(buffer)
+                buffer = []
+            volgende_flush = time.monotonic() + self.flush_interval
+        if buffer:
+            self._flush(buffer)
+
+    def _flush(self, samples):
+        try:
+            self._schrijf(samples)
+        except Exception as e:
+            self._meld_fout(f"{len(samples)} samples niet opgeslagen", e)
+
+    def _meld_fout(self, melding, fout):
+        self.fouten += 1
+        self.laatste_fout = f"{melding}: {fout}"
+        print(f"Historian-opslag: {self.laatste_fout}")
+
+    def _schrijf(self, samples):
+        samples.sort(key=lambda s: s[0])
+        per_chunk = {}  # (tag-nummer, partitie) -> bytearray
+        for tijd, nummer, waarde in samples:
+            sleutel = (nummer, int(tijd // self.partitie))
+            data = per_chunk.get(sleutel)
+            if data is None:
+                data = per_chunk[sleutel] = bytearray()
+            data += RECORD.pack(tijd, waarde)
+
+        for sleutel, data in per_chunk.items():
+            pad = self._chunk_pad(*sleutel)
+            if sleutel not in self._laatste_tijd:
+                self._laatste_tijd[sleutel] = self._lees_laatste_tijd(pad)
+            laatste = self._laatste_tijd[sleutel]
+            if laatste is None:
+                # Partitie is al gecomprimeerd: late samples direct in het blok
+                self._schrijf_blok(pad[:-6] + ".blok", data)
+                continue
+            if RECORD.unpack_from(data)[0] < laatste:
+                # Eerst markeren, zodat een lezer nooit ongemarkeerd ongesorteerde records ziet
+                open(pad[:-6] + ".ongesorteerd", "wb").close()
+            try:
+                with open(pad, "ab") as f:
+                    f.write(data)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(pad), exist_ok=True)
+                with open(pad, "ab") as f:
+                    f.write(data)
+            self._laatste_tijd[sleutel] = max(laatste, RECORD.unpack_from(data, len(data) - RECORD.size)[0])
+
+        nieuwste = int(samples[-1][0] // self.partitie)
+        if self.comprimeren and (self._huidige_partitie is None or nieuwste > self._huidige_partitie):
+            self._huidige_partitie = nieuwste
+            try:
+                self._comprimeer_oud(nieuwste)
+            except Exception as e:
+                # De samples staan al in de chunks; bij de volgende partitie wordt het opnieuw geprobeerd
+                self._meld_fout("comprimeren mislukt", e)
+
+    @staticmethod
+    def _lees_laatste_tijd(pad):
+        """Tijd van het laatste record in een bestaande chunk; None als de partitie al een blok heeft."""
+        if os.path.exists(pad[:-6] + ".blok"):
+            return None
+        try:
+            with open(pad, "rb") as f:
+                grootte = os.fstat(f.fileno()).st_size
+                grootte -= grootte % RECORD.size
+                if not grootte:
+                    return float("-inf")
+                f.seek(grootte - RECORD.size)
+                return RECORD.unpack(f.read(RECORD.size))[0]
+        except FileNotFoundError:
+            return float("-inf")
+
+    def _comprimeer_oud(self, grens):
+        """Zet alle ruwe chunks van partities vóór `grens` om naar gecomprimeerde blokken."""
+        self._laatste_tijd = {sleutel: tijd for sleutel, tijd in self._laatste_tijd.items()
+                              if sleutel[1] >= grens}
+        for tag_map in os.listdir(self.map_pad):
+            tag_pad = os.path.join(self.map_pad, tag_map)
+            if not os.path.isdir(tag_pad):
+                continue
+            for bestand in os.listdir(tag_pad):
+                if bestand.endswith(".chunk") and int(bestand[:-6]) < grens:
+                    try:
+                        self._comprimeer(os.path.join(tag_pad, bestand))
+                    except Exception as e:
+                        self._meld_fout(f"comprimeren van {tag_map}/{bestand} mislukt", e)
+
+    def _comprimeer(self, pad):
+        with open(pad, "rb") as f:
+            data = f.read()
+        self._schrijf_blok(pad[:-6] + ".blok", data)
+        os.remove(pad)
+        try:
+            os.remove(pad[:-6] + ".ongesorteerd")
+        except FileNotFoundError:
+            pass
+
+    def _schrijf_blok(self, blok_pad, data):
+        """Voegt ruwe records (bytes) samen met een eventueel bestaand blok en vervangt het blok atomisch."""
+        paren = array("d")
+        if os.path.exists(blok_pad):
+            self._lees_blok(blok_pad, float("-inf"), float("inf"), paren)
+        paren.frombytes(data[:len(data) - len(data) % RECORD.size])
+        # Records die al in het blok staan (chunk bleef na een onderbroken compressie staan) vallen weg.
+        # Het blok bewaart tijden op de resolutie van de codec, de chunk ruwe floats: vergelijk afgerond.
+        uniek = {}
+        for tijd, waarde in zip(paren[0::2], paren[1::2]):
+            uniek.setdefault((round(tijd * STANDAARD_RESOLUTIE), waarde), (tijd, waarde))
+        samples = sorted(uniek.values(), key=lambda s: s[0])
+        encoder = BlokEncoder(bits=all(w == 0.0 or w == 1.0 for _, w in samples))
+        for tijd, waarde in samples:
+            encoder.voeg_toe(tijd, waarde)
+
+        with open(blok_pad + ".tmp", "wb") as f:
+            f.write(encoder.bytes())
+        os.replace(blok_pad + ".tmp", blok_pad)
+
+    def stop(self):
+        """Schrijft de wachtrij leeg en stopt de schrijfthread."""
+        self._stop.set()
+        self._thread.join()
+
+    # --- lezen ---
+
+    def _tag_map(self, nummer):
+        return os.path.join(self.map_pad, f"tag{nummer}")
+
+    def _chunk_pad(self, nummer, partitie, extensie=".chunk"):
+        return os.path.join(self._tag_map(nummer), f"{partitie:010d}{extensie}")
+
+    def chunks(self, naam):
+        """Partitienummers van de chunkbestanden van variabele `naam`, oplopend."""
+        nummer = self.tags.get(naam)
+        if nummer is None or not os.path.isdir(self._tag_map(nummer)):
+            return []
+        return sorted({int(bestand.split(".")[0]) for bestand in os.listdir(self._tag_map(nummer))
+                       if bestand.endswith((".chunk", ".blok"))})
+
+    @staticmethod
+    def _zoek(mm, aantal, tijd, rechts=False):
+        """Index van het eerste record met tijd >= `tijd` (> bij `rechts`)."""
+        lo, hi = 0, aantal
+        while lo < hi:
+            midden = (lo + hi) // 2
+            t = RECORD.unpack_from(mm, midden * RECORD.size)[0]
+            if t < tijd or (rechts and t == tijd):
+                lo = midden + 1
+            else:
+                hi = midden
+        return lo
+
+    def bereik(self, naam, t0, t1):
+        """
+        Alle opgeslagen samples van variabele `naam` met t0 <= tijd <= t1.
+
+        Returns:
+            tuple[array, array]: tijden en waarden (array("d")).
+        """
+        paren = array("d")  # tijd, waarde, tijd, waarde, ...
+        eerste, laatste = int(t0 // self.partitie), int(t1 // self.partitie)
+        for partitie in self.chunks(naam):
+            if partitie < eerste or partitie > laatste:
+                continue
+            # Een gecomprimeerde partitie staat volledig in het blok; anders de ruwe chunk
+            try:
+                self._lees_blok(self._chunk_pad(self.tags[naam], partitie, ".blok"), t0, t1, paren)
+                continue
+            except FileNotFoundError:
+                pass
+            try:
+                self._lees_chunk(self._chunk_pad(self.tags[naam], partitie), t0, t1, paren)
+            except FileNotFoundError:
+                # De schrijfthread kan de chunk net tussen beide pogingen tot blok hebben gecomprimeerd
+                try:
+                    self._lees_blok(self._chunk_pad(self.tags[naam], partitie, ".blok"), t0, t1, paren)
+                except FileNotFoundError:
+                    pass
+        return paren[0::2], paren[1::2]
+
+    def _lees_chunk(self, pad, t0, t1, paren):
+        with open(pad, "rb") as f:
+            # Een record dat nog half geschreven wordt, telt niet mee
+            aantal = os.fstat(f.fileno()).st_size // RECORD.size
+            if not aantal:
+                return
+            if os.path.exists(pad[:-6] + ".ongesorteerd"):
+                # Niet op tijd gesorteerd: geen binair zoeken, maar alles lezen en filteren
+                alles = array("d")
+                alles.frombytes(f.read(aantal * RECORD.size))
+                for tijd, waarde in sorted(zip(alles[0::2], alles[1::2]), key=lambda s: s[0]):
+                    if t0 <= tijd <= t1:
+                        paren.append(tijd)
+                        paren.append(waarde)
+                return
+            with mmap.mmap(f.fileno(), aantal * RECORD.size, access=mmap.ACCESS_READ) as mm:
+                van = self._zoek(mm, aantal, t0)
+                tot = self._zoek(mm, aantal, t1, rechts=True)
+                paren.frombytes(mm[van * RECORD.size:tot * RECORD.size])
+
+    @staticmethod
+    def _lees_blok(pad, t0, t1, paren):
+        with open(pad, "rb") as f:
+            data = f.read()
+        _, aantal, eerste, laatste = blok_kop(data)
+        if not aantal or laatste < t0 or eerste > t1:
+            return
+        for tijd, waarde in decodeer_blok(data):
+            if tijd > t1:
+                break
+            if tijd >= t0:
+                paren.append(tijd)
+                paren.append(waarde)
@@ -0,0 +1,162 @@
+#   Binair projectformaat: secties met inhoudsopgave, lui te laden
+
+"""
+Opbouw van een binair .scada-bestand (alle getallen little-endian):
+
+    kop            MAGIC (8 bytes), versie (uint16), aantal secties (uint16)
+    inhoud         per sectie: naamlengte (uint8), codering (uint8),
+                   offset (uint64), lengte (uint64), naam (utf-8)
+    secties        de gecodeerde inhoud, achter elkaar
+
+Elke sleutel op het hoogste niveau van het projectdict (metadata, canvas,
+objecten, variabelen, communicatie, ...) is een eigen sectie, in dezelfde
+volgorde. Lijsten van dicts (objecten, variabelen) worden als tabel gecodeerd:
+per set sleutels (schema) de waarden kolom voor kolom, plus de volgorde van de
+rijen en het aantal rijen per schema (een lege dict heeft geen kolommen), alles
+als compacte JSON en daarna met zlib gecomprimeerd. Gelijksoortige
+waarden staan zo naast elkaar, wat goed comprimeert. Andere secties zijn compacte
+JSON. Via de inhoudsopgave kan één sectie gelezen worden zonder de rest te
+decoderen, bijv. alleen variabelen en communicatie zonder de objecten.
+"""
+
+import json
+import struct
+import zlib
+
+MAGIC = b"SCADABIN"
+VERSIE = 1
+KOP = struct.Struct("<8sHH")
+INHOUD_REGEL = struct.Struct("<BBQQ")
+
+JSON = 0
+TABEL = 1
+
+
+def is_binair(pad):
+    with open(pad, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _json_bytes(waarde):
+    return json.dumps(waarde, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def codeer_tabel(rijen):
+    """Lijst van dicts -> zlib(JSON) met per schema de kolommen en het aantal rijen, plus de volgorde."""
+    schema_index = {}
+    schemas = []  # [[sleutels], [kolom, kolom, ...], aantal rijen]
+    volgorde = []
+    for rij in rijen:
+        sleutels = tuple(rij)
+        i = schema_index.get(sleutels)
+        if i is None:
+            i = schema_index[sleutels] = len(schemas)
+            schemas.append([list(sleutels), [[] for _ in sleutels], 0])
+        schema = schemas[i]
+        for kolom, waarde in zip(schema[1], rij.values()):
+            kolom.append(waarde)
+        schema[2] += 1
+        volgorde.append(i)
+    return zlib.compress(_json_bytes({"schemas": schemas, "volgorde": volgorde}), 6)
+
+
+def decodeer_tabel(data):
+    tabel = json.loads(zlib.decompress(data))
+    # Per schema alle rijen in één keer (zip over de kolommen), daarna in de oorspronkelijke volgorde.
+    # Een schema zonder sleutels (lege dicts) heeft geen kolommen; dan telt alleen het aantal.
+    per_schema = []
+    for schema in tabel["schemas"]:
+        sleutels, kolommen = schema[0], schema[1]
+        if sleutels:
+            per_schema.append([dict(zip(sleutels, waarden)) for waarden in zip(*kolommen)])
+        else:
+            # Bestanden van vóór de rijtelling hebben geen schema[2]
+            per_schema.append([{} for _ in range(schema[2] if len(schema) > 2 else 0)])
+    if len(per_schema) == 1:
+        return per_schema[0]
+    iteratoren = [iter(rijen).__next__ for rijen in per_schema]
+    return [iteratoren[i]() for i in tabel["volgorde"]]
+
+
+def _codeer_sectie(waarde):
+    if isinstance(waarde, list) and waarde and all(isinstance(rij, dict) for rij in waarde):
+        return TABEL, codeer_tabel(waarde)
+    return JSON, _json_bytes(waarde)
+
+
+def _decodeer_sectie(codering, data):
+    if codering == TABEL:
+        return decodeer_tabel(data)
+    if codering == JSON:
+        return json.loads(data)
+    raise ValueError(f"Onbekende sectiecodering: {codering}")
+
+
+def project_naar_bytes(project_data):
+    secties = []
+    for naam, waarde in project_data.items():
+        codering, data = _codeer_sectie(waarde)
+        secties.append((naam.encode("utf-8"), codering, data))
+
+    offset = KOP.size + sum(INHOUD_REGEL.size + len(naam) for naam, _, _ in secties)
+    delen = [KOP.pack(MAGIC, VERSIE, len(secties))]
+    for naam, codering, data in secties:
+        delen.append(INHOUD_REGEL.pack(len(naam), codering, offset, len(data)))
+        delen.append(naam)
+        offset += len(data)
+    delen.extend(data for _, _, data in secties)
+    return b"".join(delen)
+
+
+class BinairProject:
+    """
+    Leest een binair projectbestand sectie voor sectie.
+
+    Bij het openen wordt alleen de inhoudsopgave gelezen; `sectie` leest en
+    decodeert één sectie pas als ze gevraagd wordt en onthoudt het resultaat.
+    """
+
+    def __init__(self, pad):
+        self.pad = pad
+        self.inhoud = {}  # naam -> (codering, offset, lengte), in bestandsvolgorde
+        self._geladen = {}
+        with open(pad, "rb") as f:
+            magic, versie, aantal = KOP.unpack(f.read(KOP.size))
+            if magic != MAGIC:
+                raise ValueError(f"Geen binair projectbestand: {pad}")
+            if versie > VERSIE:
+                raise ValueError(f"Binair projectformaat versie {versie} wordt niet ondersteund")
+            for _ in range(aantal):
+                naam_lengte, codering, offset, lengte = INHOUD_REGEL.unpack(f.read(INHOUD_REGEL.size))
+                naam = f.read(naam_lengte).decode("utf-8")
+                self.inhoud[naam] = (codering, offset, lengte)
+
+    def namen(self):
+        return list(self.inhoud)
+
+    def sectie(self, naam, standaard=None):
+        if naam in self._geladen:
+            return self._geladen[naam]
+        if naam not in self.inhoud:
+            return standaard
+        codering, offset, lengte = self.inhoud[naam]
+        with open(self.pad, "rb") as f:
+            f.seek(offset)
+            data = f.read(lengte)
+        waarde = self._geladen[naam] = _decodeer_sectie(codering, data)
+        return waarde
+
+    def to_dict(self):
+        return {naam: self.sectie(naam) for naam in self.inhoud}
+
+
+def json_naar_binair(json_pad, binair_pad):
+    with open(json_pad, "r", encoding="utf-8") as f:
+        project_data = json.load(f)
+    with open(binair_pad, "wb") as f:
+        f.write(project_naar_bytes(project_data))
+
+
+def binair_naar_json(binair_pad, json_pad):
+    with open(json_pad, "w", encoding="utf-8") as f:
+        json.dump(BinairProject(binair_pad).to_dict(), f, indent=4)
@@ -1,7 +1,16 @@
+import copy
+import os
 import pickle
 import json
+import tempfile
 from datetime import datetime
 
+from project.project_binair import BinairProject, is_binair, project_naar_bytes
+
+# Seconden tussen twee autosaves. Het journaal legt elke bewerking al direct vast;
+# de autosave compacteert het journaal in het projectbestand.
+STANDAARD_AUTOSAVE_S = 300
+
 
 def nieuw_project(naam="Naamloos project"):
     nu = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -16,36 +25,114 @@ def nieuw_project(naam="Naamloos project"):
             "grootte": [800, 600],
             "achtergrond_kleur": "#FFFFFF",
             "raster": True,
-            "raster_grootte": 20
+            "raster_grootte": 20,
+            "max_fps": 10
         },
         "objecten": [],
         "variabelen": [],
         "communicatie": {
-            "Modbus TCP": {
-                "actief": True,
-                "instellingen": {
-                    "ip": "127.0.0.1",
+            "apparaten": [
+                {
+                    "naam": "PLC1",
+                    "protocol": "tcp",
+                    "host": "127.0.0.1",
                     "poort": 502,
-                    "timeout": 2
-                }
-            },
-            "Modbus RTU": {
-                "actief": False,
-                "instellingen": {
                     "com_port": "COM1",
                     "baudrate": 9600,
-                    "timeout": 2
+                    "unit_id": 1,
+                    "timeout": 2,
+                    "max_registers": 125,
+                    "max_bits": 2000
                 }
+            ],
+            "leesplan": {
+                "max_gat": 8
+            },
+            "acquisitie": {
+                "modus": "sync",
+                "max_gelijktijdig": 4
             }
+        },
+        "historian": {
+            "diepte": 3600,
+            "rollups": [[1, 3600], [60, 1440], [3600, 720]],
+            "opslag": True,
+            "partitie_s": 3600
+        },
+        "opslaan": {
+            "autosave_s": STANDAARD_AUTOSAVE_S,
+            "formaat": "json"  # of "binair"
         }
     }
 
 
+def maak_snapshot(project_data):
+    """
+    Kopie van het project die los van de GUI-thread geserialiseerd kan worden.
+
+    De objectdicts komen uit de cache van de canvasobjecten en worden daar nooit
+    aangepast, alleen vervangen; die hoeven dus niet gekopieerd te worden.
+    """
+    snapshot = copy.deepcopy({sleutel: waarde for sleutel, waarde in project_data.items() if sleutel != "objecten"})
+    snapshot["objecten"] = list(project_data.get("objecten", []))
+    return snapshot
+
+
+def project_bytes(project_data):
+    """Het bestand zoals het opgeslagen wordt, in het formaat uit project_data["opslaan"]["formaat"]."""
+    if project_data.get("opslaan", {}).get("formaat") == "binair":
+        return project_naar_bytes(project_data)
+    return json.dumps(project_data, indent=4).encode("utf-8")
+
+
+def schrijf_atomisch(pad, data):
+    """
+    Schrijft `data` naar een tijdelijk bestand naast `pad` en zet dat daarna op zijn plaats.
+
+    Na fsync en os.replace staat er altijd óf het oude óf het nieuwe bestand,
+    ook als het programma of de computer halverwege uitvalt.
+    """
+    map_pad = os.path.dirname(os.path.abspath(pad))
+    fd, tmp_pad = tempfile.mkstemp(prefix=os.path.basename(pad) + ".", suffix=".tmp", dir=map_pad)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pad, pad)
+    except BaseException:
+        if os.path.exists(tmp_pad):
+            os.remove(tmp_pad)
+        raise
+    if hasattr(os, "O_DIRECTORY"):  # ook de hernoeming zelf vastleggen (niet op Windows)
+        map_fd = os.open(map_pad, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(map_fd)
+        finally:
+            os.close(map_fd)
+
+
 def opslaan_project(project_data, pad):
-    with open(pad, "w", encoding="utf-8") as f:
-        json.dump(project_data, f, indent=4)
+    schrijf_atomisch(pad, project_bytes(project_data))
 
 
 def openen_project(pad):
+    """Leest een project in JSON of in het binaire formaat (herkend aan de kop)."""
+    if is_binair(pad):
+        return BinairProject(pad).to_dict()
     with open(pad, "r", encoding="utf-8") as f:
         return json.load(f)
+
+
+def lees_secties(pad, namen):
+    """
+    Alleen de gevraagde secties van een project, bijv. ("variabelen", "communicatie").
+
+    Bij het binaire formaat worden de andere secties (zoals de objecten) niet
+    gedecodeerd; een JSON-bestand moet wel helemaal ingelezen worden.
+    """
+    if is_binair(pad):
+        project = BinairProject(pad)
+        return {naam: project.sectie(naam) for naam in namen if naam in project.inhoud}
+    project_data = openen_project(pad)
+    return {naam: project_data[naam] for naam in namen if naam in project_data}
@@ -0,0 +1,201 @@
+#   Bewerkingsjournaal naast het projectbestand
+
+import json
+import os
+import time
+
+from project.project_data import schrijf_atomisch
+
+JOURNAAL_EXTENSIE = ".journaal"
+FSYNC_INTERVAL = 1.0  # seconden; hoogstens zo lang staat een record alleen in de OS-cache
+
+TOEVOEGEN = "toevoegen"
+VERWIJDEREN = "verwijderen"
+VERPLAATSEN = "verplaatsen"
+WIJZIGEN = "wijzigen"
+SECTIE = "sectie"
+
+
+def journaal_pad(project_pad):
+    return project_pad + JOURNAAL_EXTENSIE
+
+
+def ken_ids_toe(objecten):
+    """
+    Geeft objecten zonder "id" (projecten van vóór het journaal) een ID op basis van
+    hun plaats in het bestand. Dat blijft gelijk tot het bestand opnieuw opgeslagen
+    wordt, en dan krijgen alle objecten hun eigen ID mee.
+    """
+    for i, data in enumerate(objecten):
+        data.setdefault("id", f"#{i}")
+
+
+def lees_journaal(pad):
+    """
+    Alle records uit een journaal (lege lijst als er geen is).
+
+    Een half geschreven laatste regel (na een crash midden in het schrijven) wordt
+    overgeslagen.
+    """
+    if not os.path.exists(pad):
+        return []
+    records = []
+    with open(pad, "rb") as f:
+        for regel in f:
+            try:
+                records.append(json.loads(regel))
+            except ValueError:
+                print(f"Onleesbare regel in journaal {pad} overgeslagen")
+    return records
+
+
+def speel_af(project_data, records):
+    """
+    Past journaalrecords toe op een ingelezen project (in de volgorde van schrijven).
+
+    Returns:
+        int: Het aantal toegepaste records.
+    """
+    objecten = project_data.setdefault("objecten", [])
+    per_id = {data.get("id"): data for data in objecten}
+    volgorde = [data.get("id") for data in objecten]
+    toegepast = 0
+    for record in records:
+        op = record.get("op")
+        object_id = record.get("id")
+        if op in (TOEVOEGEN, WIJZIGEN):
+            if object_id not in per_id:
+                volgorde.append(object_id)
+            per_id[object_id] = record["data"]
+        elif op == VERWIJDEREN:
+            if per_id.pop(object_id, None) is not None:
+                volgorde.remove(object_id)
+        elif op == VERPLAATSEN:
+            data = per_id.get(object_id)
+            if data is None:
+                continue
+            per_id[object_id] = dict(data, x=record["x"], y=record["y"])
+        elif op == SECTIE:
+            project_data[record["naam"]] = record["data"]
+        else:
+            print(f"Onbekend journaalrecord overgeslagen: {op!r}")
+            continue
+        toegepast += 1
+    project_data["objecten"] = [per_id[object_id] for object_id in volgorde]
+    return toegepast
+
+
+def _kap_halve_regel_af(pad):
+    """Haalt een half geschreven laatste regel weg, zodat nieuwe records er niet aan vast komen."""
+    if not os.path.exists(pad):
+        return
+    with open(pad, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+class ProjectJournaal:
+    """
+    Append-only journaal van bewerkingen op een opgeslagen project.
+
+    Elke bewerking is één JSON-regel: een toegevoegd, verwijderd, verplaatst of
+    gewijzigd object, of een vervangen projectsectie (bijv. de variabelen). Een
+    regel wordt direct naar het OS geschreven en hoogstens FSYNC_INTERVAL later
+    gefsynct, dus bewerken kost bijna niets en na een crash gaat er niets verloren:
+    bij het openen wordt het journaal over het project heen afgespeeld.
+
+    Bij compacteren (na een volledige opslag van het project) verdwijnen de records
+    tot de positie van die opslag; wat daarna nog bijkwam blijft staan.
+
+    `bekend` houdt per object-ID het laatst vastgelegde dict bij, zodat een
+    verplaatsing als klein record kan en ongewijzigde objecten niets opleveren.
+    """
+
+    def __init__(self, pad, objecten, leeg=False):
+        self.pad = pad
+        self.bekend = {data["id"]: data for data in objecten if "id" in data}
+        if not leeg:
+            _kap_halve_regel_af(pad)
+        self._bestand = open(pad, "wb" if leeg else "ab")
+        self._ongesynct = False
+        self._laatste_sync = time.monotonic()
+        # Posities tellen vanaf het begin van het journaal bij het openen, ook na compacteren
+        self._geschreven = 0 if leeg else len(lees_journaal(pad))
+        self._basis_bytes = 0  # weggecompacteerde bytes
+        self._basis_aantal = 0  # weggecompacteerde records
+
+    @property
+    def aantal(self):
+        """Aantal records sinds de laatste compactie."""
+        return self._geschreven - self._basis_aantal
+
+    def _schrijf(self, record):
+        self._bestand.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._bestand.flush()
+        self._ongesynct = True
+        self._geschreven += 1
+
+    def synchroniseer(self, altijd=False):
+        """Fsync als er ongesyncte records zijn en het interval voorbij is (of bij `altijd`)."""
+        if self._ongesynct and (altijd or time.monotonic() - self._laatste_sync >= FSYNC_INTERVAL):
+            os.fsync(self._bestand.fileno())
+            self._ongesynct = False
+            self._laatste_sync = time.monotonic()
+
+    def verwerk(self, gewijzigd, verwijderd):
+        """
+        Legt de wijzigingen uit RuntimeRegister.neem_wijzigingen vast.
+
+        Returns:
+            int: Het aantal geschreven records.
+        """
+        voor = self._geschreven
+        for object_id in verwijderd:
+            if self.bekend.pop(object_id, None) is not None:
+                self._schrijf({"op": VERWIJDEREN, "id": object_id})
+        for item in gewijzigd:
+            data = item.als_dict()
+            object_id = data["id"]
+            vorige = self.bekend.get(object_id)
+            if vorige is None:
+                self._schrijf({"op": TOEVOEGEN, "id": object_id, "data": data})
+            elif data == vorige:
+                continue
+            elif dict(vorige, x=data.get("x"), y=data.get("y")) == data:
+                self._schrijf({"op": VERPLAATSEN, "id": object_id, "x": data.get("x"), "y": data.get("y")})
+            else:
+                self._schrijf({"op": WIJZIGEN, "id": object_id, "data": data})
+            self.bekend[object_id] = data
+        self.synchroniseer()
+        return self._geschreven - voor
+
+    def sectie(self, naam, waarde):
+        """Legt een vervangen projectsectie vast (bijv. "variabelen" of "canvas")."""
+        self._schrijf({"op": SECTIE, "naam": naam, "data": waarde})
+        self.synchroniseer()
+
+    def positie(self):
+        """Huidige eindpositie; geef die na een geslaagde volledige opslag aan `compacteer`."""
+        self._bestand.flush()
+        return self._basis_bytes + self._bestand.tell(), self._geschreven
+
+    def compacteer(self, positie):
+        """Verwijdert de records tot `positie`, die nu in het projectbestand zelf staan."""
+        offset, geschreven = positie
+        if offset <= self._basis_bytes:
+            return  # al weggecompacteerd
+        self._bestand.flush()
+        self._bestand.close()
+        with open(self.pad, "rb") as f:
+            f.seek(offset - self._basis_bytes)
+            rest = f.read()
+        schrijf_atomisch(self.pad, rest)
+        self._bestand = open(self.pad, "ab")
+        self._ongesynct = False
+        self._basis_bytes = offset
+        self._basis_aantal = geschreven
+
+    def sluit(self):
+        self.synchroniseer(altijd=True)
+        self._bestand.close()
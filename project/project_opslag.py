@@ -0,0 +1,89 @@
+#   Project opslaan op een achtergrondthread
+
+import hashlib
+import os
+import threading
+
+from PySide6.QtCore import QThread, Signal
+
+from project.project_data import maak_snapshot, project_bytes, schrijf_atomisch
+
+
+class ProjectOpslagWorker(QThread):
+    """
+    Serialiseert en schrijft projecten buiten de GUI-thread.
+
+    `sla_op` maakt in de GUI-thread alleen een snapshot; JSON maken, fsync en het
+    atomisch vervangen van het bestand gebeuren hier. Komen er aanvragen bij terwijl
+    er nog geschreven wordt, dan wordt alleen de laatste per pad uitgevoerd. Is bij
+    een autosave de inhoud gelijk aan wat er het laatst naar dat pad geschreven is
+    en staat dat bestand nog ongewijzigd op schijf (zelfde grootte en mtime), dan
+    wordt er niets geschreven; daardoor kan autosave vaak lopen. Een handmatige
+    opslag schrijft altijd.
+
+    Na elke aanvraag volgt het signaal `opgeslagen(pad, gelukt, melding, handmatig, kenmerk)`;
+    `kenmerk` is wat de aanvrager bij `sla_op` meegaf (bij samengevoegde aanvragen
+    dat van de laatste), bijv. de journaalpositie die de snapshot dekt.
+    """
+    opgeslagen = Signal(str, bool, str, bool, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._wekker = threading.Event()
+        self._stop_event = threading.Event()
+        self._wachtend = {}  # pad -> (snapshot, handmatig, kenmerk)
+        self._laatst_geschreven = {}  # pad -> (digest, grootte, mtime_ns) van de laatste schrijfactie
+
+    def sla_op(self, pad, project_data, handmatig=False, kenmerk=None):
+        snapshot = maak_snapshot(project_data)
+        with self._lock:
+            vorige = self._wachtend.get(pad)
+            # Een handmatige opslag blijft handmatig, ook als er een autosave overheen komt
+            self._wachtend[pad] = (snapshot, handmatig or (vorige is not None and vorige[1]), kenmerk)
+        self._wekker.set()
+
+    def stop(self):
+        """Schrijft wat nog wacht en stopt daarna de thread."""
+        self._stop_event.set()
+        self._wekker.set()
+
+    def run(self):
+        while True:
+            self._wekker.wait()
+            self._wekker.clear()
+            with self._lock:
+                wachtend, self._wachtend = self._wachtend, {}
+            for pad, (snapshot, handmatig, kenmerk) in wachtend.items():
+                self._schrijf(pad, snapshot, handmatig, kenmerk)
+            if self._stop_event.is_set():
+                with self._lock:
+                    if not self._wachtend:
+                        return
+
+    def _schrijf(self, pad, snapshot, handmatig, kenmerk):
+        try:
+            data = project_bytes(snapshot)
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if not handmatig and self._staat_al_op_schijf(pad, digest):
+                self.opgeslagen.emit(pad, True, "ongewijzigd", handmatig, kenmerk)
+                return
+            self._laatst_geschreven.pop(pad, None)
+            schrijf_atomisch(pad, data)
+            stat = os.stat(pad)
+            self._laatst_geschreven[pad] = (digest, stat.st_size, stat.st_mtime_ns)
+            self.opgeslagen.emit(pad, True, "", handmatig, kenmerk)
+        except Exception as e:
+            print(f"Fout bij opslaan van {pad}: {e}")
+            self.opgeslagen.emit(pad, False, str(e), handmatig, kenmerk)
+
+    def _staat_al_op_schijf(self, pad, digest):
+        """True als `pad` nog precies het bestand is dat hier met deze inhoud geschreven is."""
+        vorige = self._laatst_geschreven.get(pad)
+        if vorige is None or vorige[0] != digest:
+            return False
+        try:
+            stat = os.stat(pad)
+        except OSError:
+            return False  # verwijderd of onbereikbaar: opnieuw schrijven
+        return (stat.st_size, stat.st_mtime_ns) == vorige[1:]
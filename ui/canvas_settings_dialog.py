@@ -39,6 +39,12 @@ class CanvasSettingsDialog(QDialog):
         layout.addWidget(QLabel("Rastergrootte:"))
         layout.addWidget(self.rastergrootte_input)
 
+        self.fps_input = QSpinBox()
+        self.fps_input.setRange(1, 60)
+        self.fps_input.setValue(huidige_settings.get("max_fps", 10))
+        layout.addWidget(QLabel("Maximale verversing runtime (frames/s):"))
+        layout.addWidget(self.fps_input)
+
         self.kleur_button = QPushButton("Achtergrondkleur kiezen")
         self.kleur_button.clicked.connect(self.kies_kleur)
         self.kleur = QColor(huidige_settings["achtergrond_kleur"])
@@ -65,5 +71,6 @@ class CanvasSettingsDialog(QDialog):
             "grootte": [self.breedte_input.value(), self.hoogte_input.value()],
             "achtergrond_kleur": self.kleur.name(),
             "raster": self.raster_checkbox.isChecked(),
-            "raster_grootte": self.rastergrootte_input.value()
+            "raster_grootte": self.rastergrootte_input.value(),
+            "max_fps": self.fps_input.value()
         }
@@ -1,17 +1,27 @@
 from PySide6.QtWidgets import QGraphicsView, QGraphicsScene
-from PySide6.QtGui import QPainter, QColor
+from PySide6.QtGui import QPainter, QColor, QPixmap, QBrush, QTransform
 from PySide6.QtCore import Qt, QRectF
 
+from core.runtime_register import runtime_register
+
+RASTER_KLEUR = "#cccccc"
+MIN_TEGEL = 64  # minimale tegelgrootte in pixels, zodat er niet per rastercel getekend wordt
+
 
 class CanvasView(QGraphicsView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.scene = QGraphicsScene()
         self.setScene(self.scene)
+        # Qt kiest per update zelf tussen de gewijzigde regio en één omhullende rechthoek,
+        # afhankelijk van hoe versnipperd de runtime-updates zijn
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
 
         self.raster = True
         self.raster_grootte = 20
         self.achtergrond_kleur = "#FFFFFF"
+        self._raster_brush = None
+        self._raster_sleutel = None  # (raster_grootte, kleur, zoom) waarvoor de brush gemaakt is
 
         #  self.setDragMode(QGraphicsView.ScrollHandDrag)
 
@@ -23,6 +33,7 @@ class CanvasView(QGraphicsView):
         self.achtergrond_kleur = settings.get("achtergrond_kleur", "#FFFFFF")
         self.raster = settings.get("raster", True)
         self.raster_grootte = settings.get("raster_grootte", 20)
+        self._raster_brush = None
 
         self.setStyleSheet(f"background-color: {self.achtergrond_kleur};")
         self.viewport().update()
@@ -30,19 +41,42 @@ class CanvasView(QGraphicsView):
     def drawBackground(self, painter: QPainter, rect: QRectF):
         super().drawBackground(painter, rect)
 
-        if self.raster:
-            kleur = QColor("#cccccc")
-            pen = painter.pen()
-            pen.setColor(kleur)
-            painter.setPen(pen)
+        if self.raster and self.raster_grootte > 0:
+            painter.fillRect(rect, self._raster_brush_voor(painter.transform().m11()))
+
+    def _raster_brush_voor(self, zoom):
+        """
+        Texture brush met het raster, één keer getekend per (raster_grootte, kleur, zoom).
+
+        De tegel beslaat een veelvoud van rastercellen op schermresolutie; de brush
+        schaalt terug naar scènecoördinaten, zodat het raster op (0, 0) uitlijnt en
+        de lijnen net als voorheen één pixel breed blijven.
+        """
+        sleutel = (self.raster_grootte, RASTER_KLEUR, zoom)
+        if self._raster_brush is not None and self._raster_sleutel == sleutel:
+            return self._raster_brush
 
-            links = int(rect.left()) - (int(rect.left()) % self.raster_grootte)
-            boven = int(rect.top()) - (int(rect.top()) % self.raster_grootte)
+        cel = self.raster_grootte * zoom
+        cellen = max(1, int(-(-MIN_TEGEL // cel)))
+        grootte = max(1, round(cel * cellen))
+        tegel = QPixmap(grootte, grootte)
+        tegel.fill(Qt.transparent)
+        tegel_painter = QPainter(tegel)
+        tegel_painter.setPen(QColor(RASTER_KLEUR))
+        for i in range(cellen):
+            positie = round(i * cel)
+            tegel_painter.drawLine(positie, 0, positie, grootte - 1)
+            tegel_painter.drawLine(0, positie, grootte - 1, positie)
+        tegel_painter.end()
 
-            for x in range(links, int(rect.right()), self.raster_grootte):
-                painter.drawLine(x, int(rect.top()), x, int(rect.bottom()))
-            for y in range(boven, int(rect.bottom()), self.raster_grootte):
-                painter.drawLine(int(rect.left()), y, int(rect.right()), y)
+        brush = QBrush(tegel)
+        # Exact raster_grootte * cellen scène-eenheden per tegel, ook als de zoom de tegel afrondt
+        factor = self.raster_grootte * cellen / grootte
+        brush.setTransform(QTransform.fromScale(factor, factor))
+        self._raster_brush = brush
+        self._raster_sleutel = sleutel
+        return brush
 
     def clear(self):
         self.scene.clear()
+        runtime_register.wis()  # scene.clear() verwijdert de items zonder itemChange
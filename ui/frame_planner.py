@@ -0,0 +1,84 @@
+#   Frameplanner: begrenst hoe vaak het canvas in runtime bijgewerkt wordt
+
+import time
+
+from PySide6.QtCore import QObject, QTimer
+
+STANDAARD_FPS = 10
+RUST_INTERVAL = 1.0  # seconden tussen frames als er niets gevraagd wordt
+
+
+class FramePlanner(QObject):
+    """
+    Voert de canvas-update (`frame_functie`) hoogstens `max_fps` keer per seconde uit.
+
+    Nieuwe waarden vragen een frame aan met `vraag_frame`; alle aanvragen tot het
+    volgende frame vallen samen, hoeveel scancycli er ook tussen zitten. Zo bepaalt
+    de snelste scanklasse niet meer hoe vaak er getekend wordt. Met `continu` (bijv.
+    als er trends op het canvas staan) loopt elk frame door tot de maximale snelheid;
+    anders komt er zonder aanvraag nog één frame per RUST_INTERVAL, zodat
+    verouderde waarden toch op tijd gemarkeerd worden.
+    """
+
+    def __init__(self, frame_functie, max_fps=STANDAARD_FPS, parent=None):
+        super().__init__(parent)
+        self.frame_functie = frame_functie
+        self.continu = False
+        self.interval = 1.0 / STANDAARD_FPS
+        self.zet_max_fps(max_fps)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._voer_frame_uit)
+        self._actief = False
+        self._vorig_frame = 0.0  # monotonic
+        self._gepland = None  # monotonic tijd waarop het volgende frame gepland staat
+
+        self.frames = 0
+        self.aanvragen = 0
+        self.frame_tijd = 0.0  # totaal, in seconden
+
+    def zet_max_fps(self, max_fps):
+        self.interval = 1.0 / max(1, max_fps)
+
+    def start(self):
+        self._actief = True
+        self._vorig_frame = 0.0
+        self._plan(time.monotonic())
+
+    def stop(self):
+        self._actief = False
+        self._timer.stop()
+        self._gepland = None
+
+    def vraag_frame(self):
+        """Vraagt een frame aan; valt samen met een al geplande aanvraag."""
+        if not self._actief:
+            return
+        self.aanvragen += 1
+        self._plan(max(time.monotonic(), self._vorig_frame + self.interval))
+
+    def _plan(self, moment):
+        if self._gepland is not None and self._gepland <= moment:
+            return  # er staat al een frame gepland dat minstens zo vroeg is
+        self._gepland = moment
+        self._timer.start(max(0, int((moment - time.monotonic()) * 1000)))
+
+    def _voer_frame_uit(self):
+        self._gepland = None
+        if not self._actief:
+            return
+        begin = time.monotonic()
+        self._vorig_frame = begin
+        self.frame_functie()
+        self.frames += 1
+        self.frame_tijd += time.monotonic() - begin
+        if self._actief:
+            self._plan(begin + (self.interval if self.continu else RUST_INTERVAL))
+
+    def statistiek(self):
+        return {
+            "frames": self.frames,
+            "aanvragen": self.aanvragen,
+            "gem_frame_ms": 1000 * self.frame_tijd / self.frames if self.frames else 0.0
+        }
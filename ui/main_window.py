@@ -1,24 +1,40 @@
 import os.path
+import time
 
 from PySide6.QtCore import QPointF, Qt, QTimer
 from PySide6.QtWidgets import QMainWindow, QFileDialog, QMessageBox, QGraphicsTextItem, QDialog
 from PySide6.QtGui import QAction, QFont, QColor
 
 from core import project_context, scada_display_object, communicatie
+from core.object_fabriek import laad_objecten
 from core.object_tabel_dialoog import ObjectTabelDialoog
 from core.project_context import variabelen_lijst
 from core.scada_display_object import DisplayObject
 from core.scada_image_object import ScadaImageObject
 from core.scada_meter_object import ScadaMeterObject
 from core.scada_slider_object import ScadaSliderObject
+from core.scada_trend_object import ScadaTrendObject
 from core.tekst_object import EenvoudigeTekstDialoog, TekstObject
-from core.communicatie import CommunicatieDialoog, CommunicatieInstellingen, CommunicatieManager
+from core.communicatie import CommunicatieDialoog, CommunicatieInstellingen, apparaten_uit_instellingen
+from core.acquisitie import AcquisitieWorker
+from core.pixmap_cache import pixmap_cache
+from core.runtime_register import runtime_register
+from core.historian import Historian, STANDAARD_DIEPTE, STANDAARD_ROLLUPS
+from core.scanplanner import SCANKLASSEN, max_leeftijden
 from core.scada_object import ScadaObject, InstellingenDialoog
 from core.variabele_object import VariabelenDialoog, Variabele, VariabelenLijst
 from core.variable_object import VariabeleBewerkenDialoog
-from project.project_data import nieuw_project, opslaan_project, openen_project
+from project.historian_opslag import HistorianOpslag, historie_map, STANDAARD_PARTITIE
+from project.project_data import nieuw_project, openen_project, STANDAARD_AUTOSAVE_S
+from project.project_journaal import ProjectJournaal, journaal_pad, ken_ids_toe, lees_journaal, speel_af
+from project.project_opslag import ProjectOpslagWorker
 from ui.canvas_settings_dialog import CanvasSettingsDialog
 from ui.canvas_view import CanvasView
+from ui.frame_planner import FramePlanner, STANDAARD_FPS
+
+FILTER_JSON = "SCADA Project (*.scada)"
+FILTER_BINAIR = "SCADA Project, binair (*.scada)"
+MAX_JOURNAAL_RECORDS = 5000  # daarboven niet wachten op de autosave, maar meteen compacteren
 
 
 class MainWindow(QMainWindow):
@@ -28,16 +44,31 @@ class MainWindow(QMainWindow):
         self.resize(800, 600)
 
         self.project_data = None
+        self.project_pad = None  # pad van het geopende/opgeslagen projectbestand
         self.canvas_view = CanvasView(self)
         self.setCentralWidget(self.canvas_view)
 
+        self.opslag = ProjectOpslagWorker(parent=self)
+        self.opslag.opgeslagen.connect(self.project_opgeslagen, Qt.QueuedConnection)
+        self.opslag.start()
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.journaal = None
+        self._compactie_gevraagd = False
+        self.journaal_timer = QTimer(self)
+        self.journaal_timer.timeout.connect(self.journaal_tik)
+        self.journaal_timer.start(1000)
+
         self._create_menubalk()
         self.nieuw_project_aanmaken()
 
-        self.runtime_timer = QTimer(self)
-        self.runtime_timer.timeout.connect(self.update_canvas_runtime)
+        self.frame_planner = FramePlanner(self.update_canvas_runtime, parent=self)
 
-        self.comm_manager = CommunicatieManager(project_context.instellingen)
+        self.acquisitie = None
+        self._scanstatistiek = {}  # van de lopende of laatste runtime, voor "Diagnostiek"
+        self._historian_fouten = 0  # al gemelde fouten van de historian-opslag
+        self._max_leeftijden = max_leeftijden()
+        self._volgende_verouderd_controle = 0.0
 
     def _create_menubalk(self):
         menu_bar = self.menuBar()
@@ -103,6 +134,10 @@ class MainWindow(QMainWindow):
         actie_display_object.triggered.connect(self.voeg_display_object_toe)
         tools_menu.addAction(actie_display_object)
 
+        actie_trend_object = QAction("Trend toevoegen", self)
+        actie_trend_object.triggered.connect(self.voeg_trend_object_toe)
+        tools_menu.addAction(actie_trend_object)
+
         # actie_nieuw_object = QAction("Nieuw Object", self)
         # actie_nieuw_object.triggered.connect(self.voeg_object_toe)
         # tools_menu.addAction(actie_nieuw_object)
@@ -111,82 +146,133 @@ class MainWindow(QMainWindow):
         actie_running.triggered.connect(self.running)
         tools_menu.addAction(actie_running)
 
+        actie_lees_op_aanvraag = QAction("Lees op aanvraag", self)
+        actie_lees_op_aanvraag.triggered.connect(self.lees_op_aanvraag)
+        tools_menu.addAction(actie_lees_op_aanvraag)
+
+        actie_diagnostiek = QAction("Diagnostiek", self)
+        actie_diagnostiek.triggered.connect(self.toon_diagnostiek)
+        tools_menu.addAction(actie_diagnostiek)
+
     def nieuw_project_aanmaken(self):
+        self.sluit_journaal()
         self.project_data = nieuw_project("Nieuw project")
+        self.project_pad = None
         self.canvas_view.setCanvasSettings(self.project_data["canvas"])
         self.canvas_view.clear()
         self.update_venstertitel()
         project_context.variabelen_lijst = VariabelenLijst()
         project_context.instellingen = self.project_data.get("communicatie")
+        self.maak_historian()
+        self.start_autosave()
         # QMessageBox.information(self, "Nieuw", "Nieuw SCADA-project gestart.")
 
+    def maak_historian(self):
+        cfg = self.project_data.get("historian", {})
+        project_context.historian = Historian(diepte=cfg.get("diepte", STANDAARD_DIEPTE),
+                                              rollups=cfg.get("rollups", STANDAARD_ROLLUPS))
+
     def openen_project(self):
         bestand, _ = QFileDialog.getOpenFileName(self, "Open project", "", "SCADA Project (*.scada)")
         if bestand:
+            self.sluit_journaal()
             self.project_data = openen_project(bestand)
+            ken_ids_toe(self.project_data.get("objecten", []))
+            # Bewerkingen die na de laatste volledige opslag in het journaal kwamen
+            hersteld = speel_af(self.project_data, lees_journaal(journaal_pad(bestand)))
+            self.project_pad = bestand
             self.canvas_view.setCanvasSettings(self.project_data["canvas"])
             self.canvas_view.clear()
             self.update_venstertitel()
             project_context.variabelen_lijst = VariabelenLijst.from_list(self.project_data.get("variabelen", []))
             # QMessageBox.information(self, "Geopend", f"Project geladen uit:\n{bestand}")
             project_context.instellingen = self.project_data.get("communicatie")
-
-        for obj in self.project_data.get("objecten", []):
-            if obj["type"] == "tekst":
-                self.voeg_tekstobject_toe(
-                    tekst=obj["tekst"],
-                    x=obj["x"],
-                    y=obj["y"],
-                    kleur=obj["kleur"],
-                    lettertype=obj["lettertype"],
-                    grootte=obj["grootte"]
-                )
-
-        for obj_data in self.project_data.get("objecten", []):
-            if obj_data["type"] == "scadaimageobject":
-                obj = ScadaImageObject.from_dict(obj_data)
-                self.canvas_view.scene.addItem(obj)
-
-        for obj_data in self.project_data.get("objecten", []):
-            if obj_data["type"] == "scadaslider":
-                obj = ScadaSliderObject.from_dict(obj_data)
-                self.canvas_view.scene.addItem(obj)
-            if obj_data["type"] == "displayobject":
-                obj = DisplayObject.from_dict(obj_data)
-                self.canvas_view.scene.addItem(obj)
-            if obj_data["type"] == "scadameter":
-                obj = ScadaMeterObject.from_dict(obj_data)
-                self.canvas_view.scene.addItem(obj)
-
-        for obj in self.project_data.get("objecten", []):
-            if obj["type"] == "scadaobject":
-                nieuw_obj = ScadaObject(
-                    tekst=obj["tekst"],
-                    pad_aan=obj["pad_aan"],
-                    pad_uit=obj["pad_uit"],
-                    adres=obj["adres"],
-                    status=obj["status"],
-                    breedte=obj["breedte"],
-                    hoogte=obj["hoogte"],
-                    variabele=obj["variabele"]
-                )
-                nieuw_obj.setPos(float(obj["x"]), float(obj["y"]))
-                nieuw_obj.setScale(obj["schaal"])
-                self.canvas_view.scene.addItem(nieuw_obj)
+            self.maak_historian()
+            laad_objecten(self.canvas_view.scene, self.project_data.get("objecten", []))
+            self.open_journaal(bestand)
+            self.start_autosave()
+            if hersteld:
+                self.statusBar().showMessage(f"{hersteld} bewerkingen uit het journaal hersteld", 5000)
 
     def opslaan_project(self):
         self.sla_objecten_op()
         if self.project_data:
-            bestand, _ = QFileDialog.getSaveFileName(self, "Opslaan project", "", "SCADA Project (*.scada)")
+            bestand, filter_ = QFileDialog.getSaveFileName(self, "Opslaan project", "",
+                                                           f"{FILTER_JSON};;{FILTER_BINAIR}")
             if bestand:
                 if not bestand.endswith(".scada"):
                     bestand += ".scada"
+                opslaan = self.project_data.setdefault("opslaan", {})
+                opslaan["formaat"] = "binair" if filter_ == FILTER_BINAIR else "json"
                 self.project_data["metadata"]["naam"] = os.path.basename(bestand)
-                opslaan_project(self.project_data, bestand)
-                QMessageBox.information(self, "Opgeslagen", f"Project opgeslagen als:\n{bestand}")
+                self.journaal_tik()
+                if self.journaal and self.journaal.pad != journaal_pad(bestand):
+                    self.sluit_journaal()  # opslaan als: het oude journaal hoort bij het oude bestand
+                if self.journaal is None:
+                    self.open_journaal(bestand, leeg=True)
+                self.opslag.sla_op(bestand, self.project_data, handmatig=True, kenmerk=self.journaal.positie())
+                self.project_pad = bestand
         else:
             QMessageBox.warning(self, "Geen project", "Er is nog geen project om op te slaan.")
 
+    def start_autosave(self):
+        seconden = self.project_data.get("opslaan", {}).get("autosave_s", STANDAARD_AUTOSAVE_S)
+        if seconden > 0:
+            self.autosave_timer.start(int(seconden * 1000))
+        else:
+            self.autosave_timer.stop()
+
+    def autosave(self):
+        """Compacteert het journaal: slaat het project op de achtergrond volledig op als er bewerkingen zijn."""
+        if not (self.project_data and self.project_pad and self.journaal) or self._compactie_gevraagd:
+            return
+        self.journaal_tik()
+        if self.journaal.aantal == 0:
+            return  # alles staat al in het projectbestand
+        self.sla_objecten_op()
+        self._compactie_gevraagd = True
+        self.opslag.sla_op(self.project_pad, self.project_data, kenmerk=self.journaal.positie())
+
+    def open_journaal(self, pad, leeg=False):
+        self.journaal = ProjectJournaal(journaal_pad(pad), self.project_data.get("objecten", []), leeg=leeg)
+        runtime_register.neem_wijzigingen()  # het laden zelf hoort niet in het journaal
+
+    def sluit_journaal(self):
+        if self.journaal:
+            self.journaal_tik()
+            self.journaal.sluit()
+            self.journaal = None
+
+    def journaal_tik(self):
+        """Schrijft de bewerkingen op het canvas sinds de vorige tik naar het journaal."""
+        if self.journaal is None or project_context.running:
+            return
+        gewijzigd, verwijderd = runtime_register.neem_wijzigingen()
+        if gewijzigd or verwijderd:
+            self.journaal.verwerk(gewijzigd, verwijderd)
+        else:
+            self.journaal.synchroniseer()
+        if self.journaal.aantal >= MAX_JOURNAAL_RECORDS:
+            self.autosave()
+
+    def journaal_sectie(self, naam):
+        if self.journaal:
+            self.journaal.sectie(naam, self.project_data[naam])
+
+    def project_opgeslagen(self, pad, gelukt, melding, handmatig, kenmerk):
+        if gelukt and kenmerk is not None and self.journaal and self.journaal.pad == journaal_pad(pad):
+            self.journaal.compacteer(kenmerk)
+        self._compactie_gevraagd = False
+        if not gelukt:
+            if handmatig:
+                QMessageBox.warning(self, "Opslaan mislukt", f"Project niet opgeslagen:\n{pad}\n\n{melding}")
+            else:
+                self.statusBar().showMessage(f"Autosave mislukt: {melding}", 5000)
+        elif handmatig:
+            QMessageBox.information(self, "Opgeslagen", f"Project opgeslagen als:\n{pad}")
+        elif not melding:
+            self.statusBar().showMessage(f"Automatisch opgeslagen: {os.path.basename(pad)}", 3000)
+
     def update_venstertitel(self):
         if self.project_data:
             naam = self.project_data["metadata"]["naam"]
@@ -201,7 +287,9 @@ class MainWindow(QMainWindow):
         if dialog.exec():
             nieuwe_settings = dialog.opgehaalde_settings()
             self.project_data["canvas"] = nieuwe_settings
+            self.journaal_sectie("canvas")
             self.canvas_view.setCanvasSettings(nieuwe_settings)
+            self.frame_planner.zet_max_fps(nieuwe_settings["max_fps"])
             self.update_venstertitel()  # 👈 Venstertitel updaten
 
     def voeg_tekstobject_toe(self, tekst="Hoi wereld", x=100, y=100, kleur="blue", lettertype="Arial", grootte=16):
@@ -253,6 +341,12 @@ class MainWindow(QMainWindow):
         )
         self.canvas_view.scene.addItem(sliderobject)
 
+    def voeg_trend_object_toe(self):
+        trendobject = ScadaTrendObject(
+            x=100, y=100, breedte=300, hoogte=150
+        )
+        self.canvas_view.scene.addItem(trendobject)
+
     def voeg_display_object_toe(self):
         displayobject = DisplayObject(
             x=100, y=100
@@ -262,12 +356,17 @@ class MainWindow(QMainWindow):
     def running(self):
         if not project_context.running:
             project_context.running = True
-            self.comm_manager.start()
-            self.runtime_timer.start(100)  # elke 100 ms updaten
+            project_context.variabelen_lijst.markeer_alles_gewijzigd()
+            self.start_acquisitie()
+            self.frame_planner.zet_max_fps(self.project_data["canvas"].get("max_fps", STANDAARD_FPS))
+            self.frame_planner.start()
         else:
             project_context.running = False
-            self.comm_manager.stop()
-            self.runtime_timer.stop()
+            self.stop_acquisitie()
+            self.frame_planner.stop()
+            stat = self.frame_planner.statistiek()
+            self.statusBar().showMessage(
+                f"Runtime gestopt: {stat['frames']} frames, gem. {stat['gem_frame_ms']:.1f} ms per frame")
         print(project_context.running)
 
     def update_all_objects(self):
@@ -300,20 +399,9 @@ class MainWindow(QMainWindow):
             adres="Q0.0"
         )
         self.canvas_view.scene.addItem(nieuw_obj)
-        self.project_data["objecten"].append(nieuw_obj)
 
     def sla_objecten_op(self):
-        self.project_data["objecten"] = []
-
-        for item in self.canvas_view.scene.items():
-            if isinstance(item, DisplayObject | ScadaMeterObject | ScadaSliderObject):
-                self.project_data["objecten"].append(item.to_dict())
-        for item in self.canvas_view.scene.items():
-            if isinstance(item, TekstObject):
-                self.project_data["objecten"].append(item.to_dict())
-        for item in self.canvas_view.scene.items():
-            if isinstance(item, ScadaImageObject):
-                self.project_data["objecten"].append(item.to_dict())
+        self.project_data["objecten"] = runtime_register.als_dicts()
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Delete:
@@ -328,70 +416,122 @@ class MainWindow(QMainWindow):
         if dialoog.exec():
             self.project_data["communicatie"] = instellingen_obj
             project_context.instellingen = instellingen_obj
+            self.journaal_sectie("communicatie")
 
     def open_object_tabel_dialoog(self):
         var = project_context.variabelen_lijst
-        kolommen = ["naam", "type", "adres", "waarde", "beschrijving"]
+        kolommen = ["naam", "type", "adres", "waarde", "beschrijving", "apparaat", "unit_id", "scanklasse",
+                    "deadband"]
         dropdowns = {
             "type": ["coil", "discrete_input", "holding_register", "input_register"],
-            "adres": ["0", "1", "2", "3", "4", "5", "6", "7"]
+            "adres": ["0", "1", "2", "3", "4", "5", "6", "7"],
+            "apparaat": [""] + [a.naam for a in apparaten_uit_instellingen(project_context.instellingen)],
+            "scanklasse": list(SCANKLASSEN)
         }
         dialoog = ObjectTabelDialoog(var, kolommen, "variabelen beheren", dropdowns, object_klasse=Variabele)
         if dialoog.exec():
             self.project_data["variabelen"] = project_context.variabelen_lijst.to_list()
+            self.journaal_sectie("variabelen")
+            if self.acquisitie:
+                self.acquisitie.zet_leesplan(project_context.variabelen_lijst)
+            project_context.variabelen_lijst.markeer_alles_gewijzigd()
 
     def update_canvas_runtime(self):
-        self.update_modbus()
-        for item in self.canvas_view.scene.items():
-            if hasattr(item, "update_runtime"):
-                item.update_runtime()
+        nu = time.time()
+        if nu >= self._volgende_verouderd_controle:
+            project_context.variabelen_lijst.controleer_verouderd(self._max_leeftijden, nu)
+            self._volgende_verouderd_controle = nu + 1.0
+
+        # Trends lopen ook door als er niets veranderd is
+        for trend in list(runtime_register.trends):
+            trend.tik(nu)
+        self.frame_planner.continu = bool(runtime_register.trends)
+
+        gewijzigd = project_context.variabelen_lijst.neem_gewijzigd()
+        if not gewijzigd:
+            return  # niets veranderd: niets te tekenen
+
+        for item in runtime_register.objecten_voor(gewijzigd):
+            item.update_runtime()
             if hasattr(item, "update_status"):
                 item.update_status()
 
-    def update_modbus(self):
-        if self.comm_manager.running:
-            for var in project_context.variabelen_lijst:
-                if var.type == "holding_register":
-                    try:
-                        response = self.comm_manager.lees_holding_register(int(var.adres))
-                        if response.isError():
-                            print(f"Fout bij lezen van {var.naam} (adres {var.adres}): {response}")
-                            var.waarde = None
-                        else:
-                            var.waarde = response.registers[0]
-                    except Exception as e:
-                        print(f"Exceptie bij {var.naam}: {e}")
-                        var.waarde = None
-                if var.type == "input_register":
-                    try:
-                        response = self.comm_manager.lees_input_register(int(var.adres))
-                        if response.isError():
-                            print(f"Fout bij lezen van {var.naam} (adres {var.adres}): {response}")
-                            var.waarde = None
-                        else:
-                            var.waarde = response.registers[0]
-                    except Exception as e:
-                        print(f"Exceptie bij {var.naam}: {e}")
-                        var.waarde = None
-                if var.type == "coil":
-                    try:
-                        response = self.comm_manager.lees_coil(int(var.adres))
-                        if response.isError():
-                            print(f"Fout bij lezen van {var.naam} (adres {var.adres}): {response}")
-                            var.waarde = None
-                        else:
-                            var.waarde = response.bits[0]
-                    except Exception as e:
-                        print(f"Exceptie bij {var.naam}: {e}")
-                        var.waarde = None
-                if var.type == "discrete_input":
-                    try:
-                        response = self.comm_manager.lees_discrete_input(int(var.adres))
-                        if response.isError():
-                            print(f"Fout bij lezen van {var.naam} (adres {var.adres}): {response}")
-                            var.waarde = None
-                        else:
-                            var.waarde = response.bits[0]
-                    except Exception as e:
-                        print(f"Exceptie bij {var.naam}: {e}")
-                        var.waarde = None
+    def start_acquisitie(self):
+        self.acquisitie = AcquisitieWorker(project_context.instellingen, parent=self)
+        self.acquisitie.zet_leesplan(project_context.variabelen_lijst)
+        self.acquisitie.waarden_gelezen.connect(self.verwerk_waarden, Qt.QueuedConnection)
+        self.acquisitie.verbindingen_gewijzigd.connect(self.toon_verbindingen, Qt.QueuedConnection)
+        self.acquisitie.finished.connect(self.acquisitie.deleteLater)
+        self.acquisitie.vraag_aan()  # variabelen "op_aanvraag" bij de start één keer lezen
+        self.acquisitie.start()
+
+        cfg = self.project_data.get("historian", {})
+        if cfg.get("opslag", True) and self.project_pad:
+            self._historian_fouten = 0
+            project_context.historian_opslag = HistorianOpslag(
+                historie_map(self.project_pad), partitie=cfg.get("partitie_s", STANDAARD_PARTITIE))
+
+    def lees_op_aanvraag(self):
+        """Leest de variabelen met scanklasse "op_aanvraag" één keer (alleen in runtime)."""
+        if not self.acquisitie:
+            self.statusBar().showMessage("Lees op aanvraag: runtime is niet actief", 3000)
+            return
+        self.acquisitie.vraag_aan()
+
+    def toon_diagnostiek(self):
+        """Toont de scanstatistiek per scanklasse en de statistiek van de pixmap-cache."""
+        if self.acquisitie:
+            self._scanstatistiek = self.acquisitie.statistiek()
+        regels = ["Scanklassen:"]
+        for klasse, stat in self._scanstatistiek.items():
+            regels.append(f"  {klasse}: {stat['aantal']} scans, {stat['overruns']} overruns, "
+                          f"jitter gem. {stat['jitter_gem_ms']:.1f} ms, max. {stat['jitter_max_ms']:.1f} ms")
+        if not self._scanstatistiek:
+            regels.append("  (nog geen runtime gedraaid)")
+        cache = pixmap_cache.statistiek()
+        regels.append("")
+        regels.append(f"Pixmap-cache: {cache['aantal']} items, {cache['bytes'] / 1024:.0f} kB, "
+                      f"hit ratio {cache['hit_ratio']:.0%}, {cache['verwijderd']} verwijderd, "
+                      f"{cache['vooraf_geladen']} vooraf geladen")
+        opslag = project_context.historian_opslag
+        if opslag and opslag.fouten:
+            regels.append("")
+            regels.append(f"Historian-opslag: {opslag.fouten} fouten, laatste: {opslag.laatste_fout}")
+        QMessageBox.information(self, "Diagnostiek", "\n".join(regels))
+
+    def stop_acquisitie(self):
+        if self.acquisitie:
+            self._scanstatistiek = self.acquisitie.statistiek()
+            self.acquisitie.stop()
+            self.acquisitie = None
+        if project_context.historian_opslag:
+            project_context.historian_opslag.stop()
+            project_context.historian_opslag = None
+
+    def verwerk_waarden(self, batch):
+        """Zet een batch gelezen waarden uit de acquisitie-thread in de variabelen (GUI-thread)."""
+        project_context.variabelen_lijst.zet_waarden(batch)
+        project_context.historian.verwerk(batch)
+        opslag = project_context.historian_opslag
+        if opslag:
+            opslag.verwerk(batch)
+            if opslag.fouten != self._historian_fouten:
+                self._historian_fouten = opslag.fouten
+                self.statusBar().showMessage(f"Historian-opslag: {opslag.laatste_fout}")
+        self.frame_planner.vraag_frame()
+
+    def toon_verbindingen(self, gezondheid):
+        tekst = ", ".join(f"{naam}: {status}" for naam, status in gezondheid.items())
+        self.statusBar().showMessage(tekst)
+
+    def closeEvent(self, event):
+        if self.acquisitie:
+            acquisitie = self.acquisitie
+            self.stop_acquisitie()
+            acquisitie.wait()
+        self.autosave_timer.stop()
+        self.journaal_timer.stop()
+        self.sluit_journaal()
+        self.opslag.stop()
+        self.opslag.wait()  # wachtende opslag nog afmaken
+        super().closeEvent(event)